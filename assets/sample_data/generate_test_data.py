@@ -1,25 +1,29 @@
 """
 StockSight Test Data Generator
 Generates comprehensive synthetic datasets to test all application features.
+Vectorized over blocks of SKUs so 10k-200k SKU fixtures stream to disk in seconds.
 """
 
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
-import os
 
 # ============================================================================
 #                               CONFIGURATION
 # ============================================================================
 
 CONFIG = {
-    "num_skus": 500,           # Total items (keep < 2000 for Excel speed, higher for CSV)
+    "num_skus": 500,           # Total items (use parquet or csv for 10k-200k)
     "start_date": "2022-01-01",
     "duration_days": 730,      # 2 years of data
     "seed": 42,
+    "chunk_skus": 2000,        # SKUs generated and written per block
     "output_csv": "stocksight_test_data_large.csv",
-    "output_excel": "stocksight_test_data_multi_sheet.xlsx"
+    "output_parquet": "stocksight_test_data_large.parquet",
+    "output_excel": "stocksight_test_data_multi_sheet.xlsx",
+    "excel_max_rows": 100000   # Excel copy keeps only the first rows
 }
 
 # Distribution of Tiers (Pareto-ish)
@@ -29,6 +33,13 @@ TIER_DIST = {
     "C": 0.60   # 60% Low volume
 }
 
+# Base daily volume range per tier
+TIER_VOLUME = {
+    "A": (500, 2000),
+    "B": (50, 499),
+    "C": (5, 49)
+}
+
 # Categories mapped to likely patterns
 CATEGORIES = {
     "Seasonal_Decor": "seasonal",
@@ -38,6 +49,44 @@ CATEGORIES = {
     "Spare_Parts": "erratic"
 }
 
+PATTERNS = ["seasonal", "trend_seasonal", "steady", "erratic", "variable"]
+
+# Data health issues injected per block
+ISSUES = {
+    "missing_rate": 0.01,     # sales_qty set to NaN
+    "negative_rate": 0.005,   # returns
+    "duplicate_rate": 0.005,  # repeated rows appended to each block
+    "spike_skus": 5,          # A-items that get 10x spikes
+    "spikes_per_sku": 3,
+    "gap_days": (100, 110)    # dates dropped for the first SKU
+}
+
+
+def _file_schema():
+    """Arrow schema shared by every written block; labels stay dictionary encoded."""
+    import pyarrow as pa
+    
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("trx_date", pa.timestamp("ns")),
+        ("product_id", labels),
+        ("category_group", labels),
+        ("sales_qty", pa.float64()),
+        ("unit_price", pa.float64()),
+        ("is_promo", pa.int8())
+    ])
+
+
+def _csv_schema():
+    """Plain CSV columns with dates written as YYYY-MM-DD."""
+    import pyarrow as pa
+    
+    return pa.schema([
+        pa.field(f.name, pa.date32() if f.name == "trx_date" else
+                 f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+        for f in _file_schema()
+    ])
+
 # ============================================================================
 #                               GENERATOR LOGIC
 # ============================================================================
@@ -45,188 +94,223 @@ CATEGORIES = {
 class DataGenerator:
     def __init__(self, config):
         self.config = config
-        np.random.seed(config["seed"])
-        random.seed(config["seed"])
         self.dates = pd.date_range(
-            start=config["start_date"], 
-            periods=config["duration_days"], 
+            start=config["start_date"],
+            periods=config["duration_days"],
             freq='D'
         )
         self.n_days = len(self.dates)
+        self.profiles = self.build_profiles()
 
-    def generate_wave(self, pattern_type, base_vol, noise_level):
-        """Generates a time series wave based on pattern type."""
+    def build_profiles(self):
+        """Assigns tier, volume, category, pattern and price to every SKU at once."""
+        rng = np.random.default_rng(self.config["seed"])
+        n_skus = self.config["num_skus"]
+        
+        n_a = int(n_skus * TIER_DIST["A"])
+        n_b = int(n_skus * TIER_DIST["B"])
+        tiers = np.array(["A"] * n_a + ["B"] * n_b + ["C"] * (n_skus - n_a - n_b))
+        
+        volume = np.empty(n_skus, dtype=np.int64)
+        for tier, (low, high) in TIER_VOLUME.items():
+            rows = tiers == tier
+            volume[rows] = rng.integers(low, high, rows.sum())
+        
+        categories = np.array(list(CATEGORIES))
+        cat_code = rng.integers(0, len(categories), n_skus)
+        category = categories[cat_code]
+        pattern = pd.Series(category).map(CATEGORIES).to_numpy()
+        
+        # Override pattern for C-items to be intermittent/erratic often
+        erratic = (tiers == "C") & (rng.random(n_skus) > 0.5)
+        pattern = np.where(erratic, "erratic", pattern)
+        
+        width = max(4, len(str(n_skus)))
+        return pd.DataFrame({
+            "sku": [f"SKU_{i + 1:0{width}d}" for i in range(n_skus)],
+            "tier": tiers,
+            "vol": volume,
+            "cat": category,
+            "cat_code": cat_code,
+            "pattern": pattern,
+            "base_price": rng.uniform(10, 200, n_skus)
+        })
+    
+    def generate_waves(self, pattern, base_vol, noise_level, rng):
+        """Generates one time series per row of a block based on its pattern type."""
         x = np.arange(self.n_days)
         
-        # Base components
-        seasonality = np.sin(x * 2 * np.pi / 365) # Annual cycle
-        weekly = np.sin(x * 2 * np.pi / 7)        # Weekly cycle
-        trend = np.linspace(0, 0.5, self.n_days)  # Slight upward trend
+        # Base components shared by every SKU
+        seasonality = np.sin(x * 2 * np.pi / 365)  # Annual cycle
+        weekly = np.sin(x * 2 * np.pi / 7)         # Weekly cycle
+        trend = np.linspace(0, 0.5, self.n_days)   # Slight upward trend
+        q4_spike = np.exp(-((x % 365 - 320) ** 2) / (2 * 20 ** 2)) * 3
         
-        if pattern_type == "seasonal":
-            # Strong Q4 peak (Oct-Dec)
-            q4_spike = np.exp(-((x % 365 - 320)**2) / (2 * 20**2)) * 3
-            y = base_vol + (base_vol * 0.5 * seasonality) + (base_vol * q4_spike)
-            
-        elif pattern_type == "trend_seasonal":
-            # Growing trend + seasonality
-            y = base_vol * (1 + trend) + (base_vol * 0.3 * seasonality)
-            
-        elif pattern_type == "steady":
-            # Very consistent, slight weekly pattern
-            y = base_vol + (base_vol * 0.05 * weekly)
-            
-        elif pattern_type == "erratic":
-            # High random noise, occasional spikes
-            random_spikes = np.random.exponential(scale=base_vol, size=self.n_days) * 0.5
-            y = base_vol + random_spikes
-            noise_level *= 2.0 # Double noise
+        vol = base_vol[:, None].astype(float)
+        y = np.empty((len(vol), self.n_days))
+        noise_scale = np.full(len(vol), noise_level)
+        
+        for name in PATTERNS:
+            rows = pattern == name
+            if not rows.any():
+                continue
+            v = vol[rows]
             
-        else: # Variable
-            y = base_vol + (base_vol * 0.2 * seasonality) + (base_vol * 0.1 * weekly)
+            if name == "seasonal":
+                # Strong Q4 peak (Oct-Dec)
+                y[rows] = v + (v * 0.5 * seasonality) + (v * q4_spike)
+            elif name == "trend_seasonal":
+                # Growing trend + seasonality
+                y[rows] = v * (1 + trend) + (v * 0.3 * seasonality)
+            elif name == "steady":
+                # Very consistent, slight weekly pattern
+                y[rows] = v + (v * 0.05 * weekly)
+            elif name == "erratic":
+                # High random noise, occasional spikes
+                y[rows] = v + rng.exponential(scale=1.0, size=(len(v), self.n_days)) * v * 0.5
+                noise_scale[rows] *= 2.0  # Double noise
+            else:  # Variable
+                y[rows] = v + (v * 0.2 * seasonality) + (v * 0.1 * weekly)
 
         # Add noise
-        noise = np.random.normal(0, base_vol * noise_level, self.n_days)
-        y = y + noise
+        y += rng.standard_normal(y.shape) * (vol * noise_scale[:, None])
         
         # Ensure non-negative (initially)
-        y = np.maximum(0, y)
-        return y
+        return np.maximum(0, y)
+    
+    def generate_pricing_promo(self, base_price, demand, rng):
+        """Generates price and promo matrices correlated with demand."""
+        shape = demand.shape
 
-    def generate_pricing_promo(self, base_price, demand_series):
-        """Generates price and promo columns correlated with demand."""
         # Base price with small random fluctuation
-        price = np.random.normal(base_price, base_price * 0.02, self.n_days)
+        price = base_price[:, None] * (1 + 0.02 * rng.standard_normal(shape))
         
-        # Create promotions (binary)
         # 5% chance of promo on any day
-        promo = np.random.choice([0, 1], size=self.n_days, p=[0.95, 0.05])
+        promo = (rng.random(shape) < 0.05).astype(np.int8)
         
         # Promo logic: Price drops 20%, Demand increases 30-50%
         price = np.where(promo == 1, price * 0.8, price)
+        lift = rng.uniform(1.3, 1.5, shape)
+        demand = np.where(promo == 1, demand * lift, demand)
         
-        # Adjust demand based on promo (injecting signal for Feature Engineering)
-        promo_lift = np.random.uniform(1.3, 1.5, self.n_days)
-        demand_series = np.where(promo == 1, demand_series * promo_lift, demand_series)
+        return price, promo, demand
+    
+    def generate_block(self, start, stop):
+        """Builds the rows of SKUs start..stop in SKU then date order with injected issues."""
+        rng = np.random.default_rng([self.config["seed"], start])
+        block = self.profiles.iloc[start:stop]
+        n_skus = len(block)
         
-        return price, promo, demand_series
-
-    def create_dataset(self):
-        print(f"🚀 Generating data for {self.config['num_skus']} SKUs over {self.config['duration_days']} days...")
+        qty = self.generate_waves(block["pattern"].to_numpy(), block["vol"].to_numpy(), 0.15, rng)
+        price, promo, qty = self.generate_pricing_promo(block["base_price"].to_numpy(), qty, rng)
         
-        all_data = []
+        # C-Item Specific: Intermittency (Zero inflation)
+        c_items = (block["tier"] == "C").to_numpy()
+        qty[c_items] *= rng.random((c_items.sum(), self.n_days)) < 0.6  # 40% zeros
         
-        # Calculate counts per tier
-        n_a = int(self.config["num_skus"] * TIER_DIST["A"])
-        n_b = int(self.config["num_skus"] * TIER_DIST["B"])
-        n_c = self.config["num_skus"] - n_a - n_b
+        sales = np.round(qty).ravel()
+        n_rows = len(sales)
         
-        sku_configs = []
+        # 1. Missing Values and 2. Negative Values (Returns)
+        missing = rng.choice(n_rows, int(n_rows * ISSUES["missing_rate"]), replace=False)
+        returns = rng.choice(n_rows, int(n_rows * ISSUES["negative_rate"]), replace=False)
+        sales[returns] *= -1
+        sales[missing] = np.nan
         
-        # Define SKU profiles
-        for i in range(self.config["num_skus"]):
-            if i < n_a:
-                tier, vol = "A", np.random.randint(500, 2000)
-            elif i < n_a + n_b:
-                tier, vol = "B", np.random.randint(50, 499)
-            else:
-                tier, vol = "C", np.random.randint(5, 49)
-            
-            cat_name = random.choice(list(CATEGORIES.keys()))
-            pattern = CATEGORIES[cat_name]
-            
-            # Override pattern for C-items to be intermittent/erratic often
-            if tier == "C" and random.random() > 0.5:
-                pattern = "erratic"
-                
-            sku_configs.append({
-                "sku": f"SKU_{i+1:04d}",
-                "tier": tier,
-                "vol": vol,
-                "cat": cat_name,
-                "pattern": pattern
-            })
-
-        # Generate Data
-        for conf in sku_configs:
-            # Generate base quantity
-            qty = self.generate_wave(conf['pattern'], conf['vol'], noise_level=0.15)
-            
-            # Generate Price/Promo
-            base_price = np.random.uniform(10, 200)
-            price, promo, qty = self.generate_pricing_promo(base_price, qty)
-            
-            # C-Item Specific: Intermittency (Zero inflation)
-            if conf['tier'] == "C":
-                mask = np.random.choice([0, 1], size=self.n_days, p=[0.4, 0.6]) # 40% zeros
-                qty = qty * mask
-            
-            # Create DataFrame for this SKU
-            df = pd.DataFrame({
-                'trx_date': self.dates, # Intentionally not just "date" to test detector
-                'product_id': conf['sku'], # Intentionally not just "sku"
-                'category_group': conf['cat'],
-                'sales_qty': np.round(qty).astype(int),
-                'unit_price': np.round(price, 2),
-                'is_promo': promo
-            })
-            
-            all_data.append(df)
-            
-        full_df = pd.concat(all_data, ignore_index=True)
+        # 4. Outliers (Anomalies) - Massive spikes on the first A-items
+        spike_skus = np.arange(start, stop)[
+            (block["tier"] == "A").to_numpy() & (np.arange(start, stop) < ISSUES["spike_skus"])
+        ] - start
+        for offset in spike_skus:
+            days = rng.choice(self.n_days, ISSUES["spikes_per_sku"], replace=False)
+            sales[offset * self.n_days + days] *= 10  # 10x spike
+        
+        df = pd.DataFrame({
+            'trx_date': np.tile(self.dates.to_numpy(), n_skus),  # Intentionally not just "date" to test detector
+            'product_id': pd.Categorical.from_codes(  # Intentionally not just "sku"
+                np.repeat(np.arange(n_skus), self.n_days), categories=block["sku"]
+            ),
+            'category_group': pd.Categorical.from_codes(
+                np.repeat(block["cat_code"].to_numpy(), self.n_days), categories=list(CATEGORIES)
+            ),
+            'sales_qty': sales,
+            'unit_price': np.round(price.ravel(), 2),
+            'is_promo': promo.ravel()
+        })
         
-        # ====================================================================
-        # INJECT DATA HEALTH ISSUES (Testing Data Tab)
-        # ====================================================================
-        print("💉 Injecting data health issues and anomalies...")
+        # 5. Gaps (Missing dates) for the first SKU
+        if start == 0 and n_skus and self.n_days > ISSUES["gap_days"][1]:
+            gap_start, gap_end = ISSUES["gap_days"]
+            df = df.drop(index=np.arange(gap_start, gap_end + 1))
         
-        n_rows = len(full_df)
+        # 3. Duplicates appended after the block
+        duplicates = df.iloc[np.sort(rng.choice(len(df), int(len(df) * ISSUES["duplicate_rate"]), replace=False))]
+        return pd.concat([df, duplicates], ignore_index=True)
+    
+    def iter_blocks(self):
+        """Yields generated blocks of chunk_skus SKUs."""
+        step = self.config["chunk_skus"]
+        for start in range(0, self.config["num_skus"], step):
+            yield self.generate_block(start, min(start + step, self.config["num_skus"]))
+
+    def create_dataset(self):
+        """Generates the whole dataset in memory for small fixtures."""
+        return pd.concat(list(self.iter_blocks()), ignore_index=True)
+    
+    def save_files(self, formats=("csv",), excel=True):
+        """Streams blocks to CSV and/or Parquet so memory stays at one block."""
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
         
-        # 1. Missing Values (random 1%)
-        indices = np.random.choice(full_df.index, int(n_rows * 0.01), replace=False)
-        full_df.loc[indices, 'sales_qty'] = np.nan
+        file_schema = _file_schema()
+        csv_schema = _csv_schema()
+        writers = {}
+        rows = 0
+        excel_parts = []
+        excel_rows = 0
         
-        # 2. Negative Values (Returns - random 0.5%)
-        indices = np.random.choice(full_df.index, int(n_rows * 0.005), replace=False)
-        full_df.loc[indices, 'sales_qty'] = full_df.loc[indices, 'sales_qty'] * -1
+        print(f"🚀 Generating data for {self.config['num_skus']:,} SKUs over {self.config['duration_days']} days...")
+        try:
+            for block in self.iter_blocks():
+                # one fixed schema so every block appends to the same file
+                table = pa.Table.from_pandas(block, schema=file_schema, preserve_index=False)
+                if "parquet" in formats:
+                    if "parquet" not in writers:
+                        writers["parquet"] = pq.ParquetWriter(self.config['output_parquet'], file_schema)
+                    writers["parquet"].write_table(table)
+                if "csv" in formats:
+                    if "csv" not in writers:
+                        writers["csv"] = pa_csv.CSVWriter(
+                            self.config['output_csv'], csv_schema,
+                            write_options=pa_csv.WriteOptions(quoting_style="none")
+                        )
+                    writers["csv"].write_table(table.cast(csv_schema))
+                if excel and excel_rows < self.config["excel_max_rows"]:
+                    excel_parts.append(block.head(self.config["excel_max_rows"] - excel_rows))
+                    excel_rows += len(excel_parts[-1])
+                rows += len(block)
+                print(f"   ... {rows:,} rows written")
+        finally:
+            for writer in writers.values():
+                writer.close()
         
-        # 3. Duplicates (Duplicate 0.5% of rows)
-        duplicates = full_df.sample(frac=0.005)
-        full_df = pd.concat([full_df, duplicates], ignore_index=True)
+        for fmt in formats:
+            print(f"💾 Saved {fmt.upper()} to {self.config['output_' + fmt]}")
         
-        # 4. Outliers (Anomalies) - Massive spikes
-        # Pick 5 A-tier items to give massive spikes
-        a_skus = [c['sku'] for c in sku_configs if c['tier'] == "A"][:5]
-        for sku in a_skus:
-            sku_indices = full_df[full_df['product_id'] == sku].index
-            spike_idx = np.random.choice(sku_indices, 3, replace=False)
-            full_df.loc[spike_idx, 'sales_qty'] = full_df.loc[spike_idx, 'sales_qty'] * 10 # 10x spike
-            
-        # 5. Gaps (Missing dates)
-        # Drop a chunk of dates for a specific SKU
-        gap_sku = sku_configs[0]['sku']
-        gap_start = self.dates[100]
-        gap_end = self.dates[110]
-        full_df = full_df[~((full_df['product_id'] == gap_sku) & 
-                            (full_df['trx_date'] >= gap_start) & 
-                            (full_df['trx_date'] <= gap_end))]
-
-        return full_df
-
-    def save_files(self, df):
-        # 1. Save Main CSV
-        print(f"💾 Saving CSV to {self.config['output_csv']}...")
-        df.to_csv(self.config['output_csv'], index=False)
+        if excel:
+            self.save_excel(pd.concat(excel_parts, ignore_index=True))
         
-        # 2. Save Multi-sheet Excel (to test sheet selection dialog)
+        print("✅ Done! Test datasets created.")
+        return rows
+    
+    def save_excel(self, df):
+        # Save Multi-sheet Excel (to test sheet selection dialog)
         # We will split data: Sheet 1 (Data), Sheet 2 (Reference/Junk)
         print(f"💾 Saving Excel to {self.config['output_excel']} (this might take a moment)...")
         
-        # Limit Excel rows to 100k to keep file size manageable for testing
-        excel_df = df.head(100000) 
-        
         with pd.ExcelWriter(self.config['output_excel']) as writer:
-            excel_df.to_excel(writer, sheet_name='Historical_Sales', index=False)
+            df.astype({'product_id': str, 'category_group': str}).to_excel(writer, sheet_name='Historical_Sales', index=False)
             
             # Create a reference sheet (metadata)
             ref_data = pd.DataFrame([
@@ -234,23 +318,40 @@ class DataGenerator:
                 {"Code": "B", "Desc": "Med Vol"}
             ])
             ref_data.to_excel(writer, sheet_name='Reference_Codes', index=False)
-            
-        print("✅ Done! Test datasets created.")
 
 # ============================================================================
 #                               MAIN
 # ============================================================================
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate StockSight test datasets")
+    parser.add_argument("--skus", type=int, default=CONFIG["num_skus"], help="number of SKUs (10k-200k for load tests)")
+    parser.add_argument("--days", type=int, default=CONFIG["duration_days"], help="days of history")
+    parser.add_argument("--seed", type=int, default=CONFIG["seed"], help="random seed")
+    parser.add_argument("--chunk-skus", type=int, default=CONFIG["chunk_skus"], help="SKUs per written block")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv", help="main output format")
+    parser.add_argument("--no-excel", action="store_true", help="skip the multi-sheet Excel copy")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    CONFIG.update({
+        "num_skus": args.skus,
+        "duration_days": args.days,
+        "seed": args.seed,
+        "chunk_skus": args.chunk_skus
+    })
+    formats = ("csv", "parquet") if args.format == "both" else (args.format,)
+    
     generator = DataGenerator(CONFIG)
-    dataset = generator.create_dataset()
-    generator.save_files(dataset)
+    generator.save_files(formats, excel=not args.no_excel)
     
     print("\n" + "="*60)
     print("TESTING INSTRUCTIONS FOR STOCKSIGHT")
     print("="*60)
     print("1. Open App -> Data Health Tab")
-    print(f"   - Upload '{CONFIG['output_csv']}'")
+    print(f"   - Upload '{CONFIG['output_' + formats[0]]}'")
     print(f"   - Upload '{CONFIG['output_excel']}' to test Sheet Selection Dialog.")
     print("   - Notice 'trx_date' and 'product_id' mapped automatically.")
     print("   - Check Data Quality: You should see ~1% missing, negatives, and duplicates.")
@@ -265,4 +366,4 @@ if __name__ == "__main__":
     print("\n4. Forecast Factory")
     print("   - Run 'Balanced' strategy.")
     print("   - Check A-items (SKU_0001 to SKU_0005) for outlier handling.")
-    print("="*60)
\ No newline at end of file
+    print("="*60)
@@ -50,7 +50,9 @@ DEFAULT_THEME = "light"
 SUPPORTED_FILE_TYPES = {
     "csv": "CSV Files (*.csv)",
     "excel": "Excel Files (*.xlsx *.xls)",
-    "parquet": "Parquet Files (*.parquet)"
+    "parquet": "Parquet Files (*.parquet)",
+    "compressed": "Compressed CSV (*.csv.gz *.csv.bz2 *.csv.zst *.zip)",
+    "database": "Database Files (*.db *.sqlite *.sqlite3 *.duckdb)"
 }
 
 MAX_FILE_SIZE_MB = 500
@@ -75,7 +77,10 @@ COLUMN_DETECTION = {
     "promo_keywords": [
         "promo", "promotion", "discount", "offer", "sale", "campaign"
     ],
-    "confidence_threshold": 0.7
+    "confidence_threshold": 0.7,
+    "sample_rows": 2000,  # random rows scored per detection
+    "sample_seed": 42,
+    "cache_entries": 50  # detections remembered per source fingerprint
 }
 
 # ---------- DATA QUALITY ----------
@@ -83,7 +88,8 @@ DATA_QUALITY = {
     "min_data_points": 7,
     "max_missing_pct": 30,
     "outlier_std_threshold": 3.0,
-    "duplicate_check": True
+    "duplicate_check": True,
+    "max_undo_steps": 20
 }
 
 # ============================================================================
@@ -311,10 +317,19 @@ ANOMALY_DETECTION = {
             "description": "Detects sudden changes",
             "window": 7,
             "threshold": 2.5
+        },
+        "seasonal": {
+            "name": "Seasonal Residual",
+            "description": "Detects values unusual for their weekday and season",
+            "trend_window": 21,
+            "threshold": 3.5,
+            "min_periods": 28,
+            "annual_min_days": 728
         }
     },
-    "default_method": "iqr",
-    "min_anomaly_score": 0.7
+    "default_method": "seasonal",
+    "min_anomaly_score": 0.7,
+    "zero_min_consecutive": 3
 }
 
 # ---------- ANOMALY TYPES ----------
@@ -334,11 +349,18 @@ ANOMALY_TYPES = {
 PERFORMANCE = {
     "max_skus_in_memory": 1000,
     "chunk_size": 1000,
+    "partial_result_interval": 0.5,  # seconds between partial results of streaming scans
     "sample_size_visualization": 20,
     "sample_size_heatmap": 100,
     "background_threads": 4,
     "cache_size_mb": 512,
-    "gc_threshold": 0.8  # trigger gc at 80% memory
+    "gc_threshold": 0.8,  # trigger gc at 80% memory
+    "release_raw_after_processing": True,  # drop raw frame once mapping is confirmed
+    "max_tracked_changes": 50,  # data change entries kept for incremental refresh
+    "optimize_dtypes": True,  # downcast processed columns when values stay exact
+    "int_headroom": 100,  # integer range multiple kept free for sums and differences
+    "float_max_decimals": 4,  # most decimals checked before keeping float64
+    "category_max_ratio": 0.5  # text columns below this unique share become categorical
 }
 
 # ---------- TIMING TARGETS ----------
@@ -4,19 +4,31 @@ contains all processing without ui dependencies
 """
 
 from .data_processor import DataProcessor
+from .quality_profiler import QualityProfiler
+from .tier_index import TierIndex
+from .dtype_optimizer import DtypeOptimizer
+from .shard_store import ShardStore
 from .column_detector import ColumnDetector
 from .rule_clustering import RuleClustering
 from .feature_engineer import FeatureEngineer
 from .forecaster import Forecaster
 from .anomaly_detector import AnomalyDetector
+from .anomaly_engine import AnomalyEngine
+from .anomaly_store import AnomalyStore
 from .performance_optimizer import PerformanceOptimizer
 
 __all__ = [
     "DataProcessor",
+    "QualityProfiler",
+    "TierIndex",
+    "DtypeOptimizer",
+    "ShardStore",
     "ColumnDetector",
     "RuleClustering",
     "FeatureEngineer",
     "Forecaster",
     "AnomalyDetector",
+    "AnomalyEngine",
+    "AnomalyStore",
     "PerformanceOptimizer"
 ]
\ No newline at end of file
@@ -4,28 +4,15 @@ identifies unusual values in time series
 uses statistical methods for detection
 """
 
+import time
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
 
 import config
-
-
-# ============================================================================
-#                               DATA CLASSES
-# ============================================================================
-
-@dataclass
-class Anomaly:
-    # single anomaly record
-    sku: str
-    date: str
-    value: float
-    expected_value: float
-    anomaly_type: str
-    severity: float
-    method: str
+from core.identifiers import iter_frames, iter_batches, group_count, select_groups
+from core.anomaly_engine import AnomalyEngine
+from core.anomaly_store import Anomaly, AnomalyStore, AnomalyView
 
 
 # ============================================================================
@@ -38,8 +25,14 @@ class AnomalyDetector:
     def __init__(self):
         # initialize with detection configuration
         self.config = config.ANOMALY_DETECTION
-        self.anomalies = []
+        self.engine = AnomalyEngine()
+        self.anomalies = AnomalyStore()
         self.flagged_for_review = []
+        
+        # data version each sku's results reflect
+        self.version = None
+        self.sku_versions: Dict[str, int] = {}
+        self._scan = None
     
     # ---------- MAIN DETECTION ----------
     
@@ -56,145 +49,31 @@ class AnomalyDetector:
             return self._detect_zscore(df, date_col, qty_col)
         elif method == "rolling":
             return self._detect_rolling(df, date_col, qty_col)
+        elif method == "seasonal":
+            return self._detect_seasonal(df, date_col, qty_col)
         else:
             return self._detect_iqr(df, date_col, qty_col)
     
     def _detect_iqr(self, df: pd.DataFrame, date_col: str, qty_col: str) -> List[Anomaly]:
         # detect anomalies using interquartile range
-        anomalies = []
-        multiplier = self.config["methods"]["iqr"]["multiplier"]
-        
-        values = df[qty_col].dropna()
-        
-        if len(values) < 4:
-            return anomalies
-        
-        q1 = values.quantile(0.25)
-        q3 = values.quantile(0.75)
-        iqr = q3 - q1
-        
-        lower_bound = q1 - multiplier * iqr
-        upper_bound = q3 + multiplier * iqr
-        median = values.median()
-        
-        for idx, row in df.iterrows():
-            value = row[qty_col]
-            date = row[date_col]
-            
-            if pd.isna(value):
-                continue
-            
-            if value < lower_bound:
-                severity = abs(value - lower_bound) / (iqr + 1)
-                anomalies.append(Anomaly(
-                    sku="",
-                    date=str(date),
-                    value=float(value),
-                    expected_value=float(median),
-                    anomaly_type="drop" if value >= 0 else "negative",
-                    severity=min(1.0, float(severity)),
-                    method="iqr"
-                ))
-            elif value > upper_bound:
-                severity = abs(value - upper_bound) / (iqr + 1)
-                anomalies.append(Anomaly(
-                    sku="",
-                    date=str(date),
-                    value=float(value),
-                    expected_value=float(median),
-                    anomaly_type="spike",
-                    severity=min(1.0, float(severity)),
-                    method="iqr"
-                ))
-        
-        return anomalies
+        return self._collect(df, date_col, qty_col, "iqr")
     
     def _detect_zscore(self, df: pd.DataFrame, date_col: str, qty_col: str) -> List[Anomaly]:
         # detect anomalies using z-score method
-        anomalies = []
-        threshold = self.config["methods"]["zscore"]["threshold"]
-        
-        values = df[qty_col].dropna()
-        
-        if len(values) < 3:
-            return anomalies
-        
-        mean = values.mean()
-        std = values.std()
-        
-        if std == 0:
-            return anomalies
-        
-        for idx, row in df.iterrows():
-            value = row[qty_col]
-            date = row[date_col]
-            
-            if pd.isna(value):
-                continue
-            
-            zscore = abs(value - mean) / std
-            
-            if zscore > threshold:
-                severity = min(1.0, zscore / (threshold * 2))
-                anomaly_type = "spike" if value > mean else "drop"
-                
-                anomalies.append(Anomaly(
-                    sku="",
-                    date=str(date),
-                    value=float(value),
-                    expected_value=float(mean),
-                    anomaly_type=anomaly_type,
-                    severity=float(severity),
-                    method="zscore"
-                ))
-        
-        return anomalies
+        return self._collect(df, date_col, qty_col, "zscore")
     
     def _detect_rolling(self, df: pd.DataFrame, date_col: str, qty_col: str) -> List[Anomaly]:
         # detect anomalies using rolling window
-        anomalies = []
-        window = self.config["methods"]["rolling"]["window"]
-        threshold = self.config["methods"]["rolling"]["threshold"]
-        
-        values = df[qty_col].copy()
-        
-        if len(values) < window + 1:
-            return anomalies
-        
-        # calculate rolling statistics
-        rolling_mean = values.rolling(window=window, center=True).mean()
-        rolling_std = values.rolling(window=window, center=True).std()
-        
-        for idx, row in df.iterrows():
-            value = row[qty_col]
-            date = row[date_col]
-            
-            if pd.isna(value):
-                continue
-            
-            rm = rolling_mean.get(idx)
-            rs = rolling_std.get(idx)
-            
-            if pd.isna(rm) or pd.isna(rs) or rs == 0:
-                continue
-            
-            zscore = abs(value - rm) / rs
-            
-            if zscore > threshold:
-                severity = min(1.0, zscore / (threshold * 2))
-                anomaly_type = "spike" if value > rm else "drop"
-                
-                anomalies.append(Anomaly(
-                    sku="",
-                    date=str(date),
-                    value=float(value),
-                    expected_value=float(rm),
-                    anomaly_type=anomaly_type,
-                    severity=float(severity),
-                    method="rolling"
-                ))
-        
-        return anomalies
+        return self._collect(df, date_col, qty_col, "rolling")
+    
+    def _detect_seasonal(self, df: pd.DataFrame, date_col: str, qty_col: str) -> List[Anomaly]:
+        # detect anomalies in residuals after trend and seasonality
+        return self._collect(df, date_col, qty_col, "seasonal")
+    
+    def _collect(self, df: pd.DataFrame, date_col: str, qty_col: str, method: str) -> List[Anomaly]:
+        # anomaly records for flagged rows of one series
+        result = self.engine.scan(df, qty_col, method, date_col=date_col)
+        return list(AnomalyStore.from_scan(df, result, None, date_col, qty_col, method).view())
     
     # ---------- BATCH DETECTION ----------
     
@@ -204,128 +83,201 @@ class AnomalyDetector:
                      date_col: str,
                      qty_col: str,
                      method: str = "iqr",
-                     progress_callback: Optional[callable] = None) -> Dict[str, List[Anomaly]]:
-        # detect anomalies for all skus
-        
-        all_anomalies = {}
-        skus = df[sku_col].unique()
-        total = len(skus)
-        
-        for i, sku in enumerate(skus):
-            sku_df = df[df[sku_col] == sku].copy()
-            anomalies = self.detect_anomalies(sku_df, date_col, qty_col, method)
-            
-            # set sku for each anomaly
-            for a in anomalies:
-                a.sku = sku
-            
-            if anomalies:
-                all_anomalies[sku] = anomalies
-            
-            # progress callback
-            if progress_callback and i % 100 == 0:
-                progress_callback((i + 1) / total * 100)
-        
-        self.anomalies = all_anomalies
-        return all_anomalies
+                     progress_callback: Optional[callable] = None,
+                     version: Optional[int] = None,
+                     partial_callback: Optional[callable] = None,
+                     include_runs: bool = False,
+                     gap_freq: Optional[str] = "D") -> AnomalyStore:
+        # detect anomalies for all skus with zero and gap runs when asked
+        
+        # shard stores carry the data version they were written from
+        self.version = getattr(df, "version", None) if version is None else version
+        self.sku_versions = {}
+        self._scan = {
+            "sku_col": sku_col, "date_col": date_col, "qty_col": qty_col, "method": method,
+            "include_runs": include_runs, "gap_freq": gap_freq
+        }
+        self.anomalies = AnomalyStore()
+        
+        parts = []
+        total = group_count(df, sku_col)
+        done = 0
+        complete = False
+        interval = config.PERFORMANCE["partial_result_interval"]
+        last_partial = time.monotonic()
+        
+        try:
+            # one scan per batch of skus so results arrive while the rest are scanned
+            for frame in iter_batches(df, sku_col, config.PERFORMANCE["chunk_size"]):
+                parts.append(self._scan_frame(frame, self._scan))
+                done += frame[sku_col].nunique()
+                
+                # partial results are stacked only as often as they are shown
+                if partial_callback and time.monotonic() - last_partial >= interval:
+                    self.anomalies = AnomalyStore.concat(parts)
+                    parts = [self.anomalies]
+                    partial_callback(self.anomalies)
+                    last_partial = time.monotonic()
+                
+                # progress callback
+                if progress_callback:
+                    progress_callback(done / max(total, 1) * 100, f"Scanned {done:,} of {total:,} items")
+            complete = True
+        finally:
+            # a cancelled scan keeps what it found but must be rerun in full
+            self.anomalies = AnomalyStore.concat(parts)
+            if not complete:
+                self.version = None
+        return self.anomalies
+    
+    def redetect(self, processor, progress_callback: Optional[callable] = None) -> AnomalyStore:
+        # rescan only skus whose series changed since the last detection
+        if self._scan is None:
+            return self.anomalies
+        
+        scan = self._scan
+        skus, df = [], None
+        
+        # changed rows are copied under the lock fixes hold so they match the journal
+        with processor.data_lock:
+            changes = processor.changes_since(self.version) if self.version is not None else {"full": True}
+            if not changes["full"]:
+                skus = sorted(changes["skus"], key=str)
+                if skus:
+                    df = select_groups(processor.processed_data, scan["sku_col"], skus)
+        
+        if changes["full"]:
+            # the store carries the version its snapshot was written at
+            store = processor.get_shard_store()
+            return self.detect_batch(
+                store, scan["sku_col"], scan["date_col"], scan["qty_col"],
+                scan["method"], progress_callback, store.version,
+                include_runs=scan["include_runs"], gap_freq=scan["gap_freq"]
+            )
+        
+        if skus:
+            self.anomalies = self.anomalies.replace(skus, self._scan_frame(df, scan))
+        
+        # unchanged skus are already current so the whole result moves forward
+        self.version = changes["version"]
+        self.sku_versions.update({sku: changes["version"] for sku in skus})
+        if progress_callback:
+            progress_callback(100)
+        return self.anomalies
+    
+    def _scan_frame(self, frame: pd.DataFrame, scan: Dict[str, Any]) -> AnomalyStore:
+        # anomalies of one batch of skus for the settings of the current scan
+        sku_col, date_col, qty_col = scan["sku_col"], scan["date_col"], scan["qty_col"]
+        result = self.engine.scan(frame, qty_col, scan["method"], sku_col, date_col)
+        store = AnomalyStore.from_scan(frame, result, sku_col, date_col, qty_col, scan["method"])
+        if not scan["include_runs"]:
+            return store
+        
+        parts = [store, self._zero_store(
+            frame, sku_col, date_col, qty_col, self.config.get("zero_min_consecutive", 3)
+        )]
+        if scan["gap_freq"]:
+            parts.append(self._gap_store(frame, sku_col, date_col, scan["gap_freq"]))
+        return AnomalyStore.merge(parts)
+    
+    def get_sku_version(self, sku: str) -> Optional[int]:
+        # data version the anomalies of a sku were detected at
+        return self.sku_versions.get(sku, self.version)
     
     # ---------- SPECIAL DETECTIONS ----------
     
     def detect_zeros(self, df: pd.DataFrame, date_col: str, qty_col: str, min_consecutive: int = 3) -> List[Anomaly]:
         # detect suspicious zero periods
-        anomalies = []
-        
-        values = df[qty_col].values
-        dates = df[date_col].values
-        
-        # find consecutive zeros
-        zero_start = None
-        zero_count = 0
-        
-        for i, (value, date) in enumerate(zip(values, dates)):
-            if value == 0:
-                if zero_start is None:
-                    zero_start = i
-                zero_count += 1
-            else:
-                if zero_count >= min_consecutive:
-                    anomalies.append(Anomaly(
-                        sku="",
-                        date=str(dates[zero_start]),
-                        value=0,
-                        expected_value=df[qty_col].mean(),
-                        anomaly_type="zero",
-                        severity=min(1.0, zero_count / 10),
-                        method="zero_detection"
-                    ))
-                zero_start = None
-                zero_count = 0
-        
-        # check final sequence
-        if zero_count >= min_consecutive:
-            anomalies.append(Anomaly(
-                sku="",
-                date=str(dates[zero_start]),
-                value=0,
-                expected_value=df[qty_col].mean(),
-                anomaly_type="zero",
-                severity=min(1.0, zero_count / 10),
-                method="zero_detection"
-            ))
-        
-        return anomalies
+        return list(self._zero_store(df, None, date_col, qty_col, min_consecutive).view())
     
     def detect_gaps(self, df: pd.DataFrame, date_col: str, expected_freq: str = "D") -> List[Anomaly]:
         # detect missing date gaps
-        anomalies = []
-        
-        dates = pd.to_datetime(df[date_col]).sort_values()
-        
-        if len(dates) < 2:
-            return anomalies
-        
-        # create expected date range
-        expected_dates = pd.date_range(start=dates.min(), end=dates.max(), freq=expected_freq)
-        missing_dates = expected_dates.difference(dates)
-        
-        # group consecutive missing dates
-        if len(missing_dates) == 0:
-            return anomalies
-        
-        gap_start = missing_dates[0]
-        gap_count = 1
-        
-        for i in range(1, len(missing_dates)):
-            diff = (missing_dates[i] - missing_dates[i-1]).days
-            if diff == 1:
-                gap_count += 1
-            else:
-                if gap_count >= 1:
-                    anomalies.append(Anomaly(
-                        sku="",
-                        date=str(gap_start),
-                        value=0,
-                        expected_value=0,
-                        anomaly_type="gap",
-                        severity=min(1.0, gap_count / 7),
-                        method="gap_detection"
-                    ))
-                gap_start = missing_dates[i]
-                gap_count = 1
-        
-        # check final gap
-        if gap_count >= 1:
-            anomalies.append(Anomaly(
-                sku="",
-                date=str(gap_start),
-                value=0,
-                expected_value=0,
-                anomaly_type="gap",
-                severity=min(1.0, gap_count / 7),
-                method="gap_detection"
-            ))
-        
-        return anomalies
+        return list(self._gap_store(df, None, date_col, expected_freq).view())
+    
+    def detect_zeros_batch(self,
+                           df: pd.DataFrame,
+                           sku_col: str,
+                           date_col: str,
+                           qty_col: str,
+                           min_consecutive: int = 3) -> AnomalyStore:
+        # zero runs of every sku in one pass per frame or shard
+        return AnomalyStore.concat([
+            self._zero_store(frame, sku_col, date_col, qty_col, min_consecutive)
+            for frame in iter_frames(df)
+        ])
+    
+    def detect_gaps_batch(self,
+                          df: pd.DataFrame,
+                          sku_col: str,
+                          date_col: str,
+                          expected_freq: str = "D") -> AnomalyStore:
+        # missing date runs of every sku in one pass per frame or shard
+        return AnomalyStore.concat([
+            self._gap_store(frame, sku_col, date_col, expected_freq)
+            for frame in iter_frames(df)
+        ])
+    
+    def _zero_store(self,
+                    df: pd.DataFrame,
+                    sku_col: Optional[str],
+                    date_col: str,
+                    qty_col: str,
+                    min_consecutive: int) -> AnomalyStore:
+        # zero runs as anomalies dated at the first zero
+        labels, codes = self._sku_codes(df, sku_col)
+        values = pd.to_numeric(df[qty_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        runs = self.engine.zero_runs(values, codes, min_consecutive)
+        
+        # expected value is the sku mean over all its rows
+        valid = ~np.isnan(values) & (codes >= 0)
+        n_groups = len(labels)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.bincount(codes[valid], weights=values[valid], minlength=n_groups) / np.bincount(
+                codes[valid], minlength=n_groups
+            )
+        
+        rows = runs["row"]
+        return AnomalyStore.from_events(
+            labels, codes[rows],
+            date=pd.to_datetime(df[date_col].iloc[rows]).to_numpy(),
+            value=np.zeros(len(rows)),
+            expected=means[codes[rows]],
+            severity=np.minimum(1.0, runs["length"] / 10),
+            anomaly_type="zero",
+            method="zero_detection"
+        )
+    
+    def _gap_store(self,
+                   df: pd.DataFrame,
+                   sku_col: Optional[str],
+                   date_col: str,
+                   expected_freq: str) -> AnomalyStore:
+        # missing date runs as anomalies dated at the first missing day
+        labels, codes = self._sku_codes(df, sku_col)
+        dates = pd.to_datetime(df[date_col]).to_numpy()
+        offset = pd.tseries.frequencies.to_offset(expected_freq)
+        if isinstance(offset, pd.offsets.Tick):
+            gaps = self.engine.date_gaps(dates, codes, pd.Timedelta(offset).to_timedelta64())
+        else:
+            # weeks and months have no fixed length so missing points come from their calendar
+            gaps = self.engine.calendar_gaps(dates, codes, expected_freq)
+        
+        return AnomalyStore.from_events(
+            labels, codes[gaps["row"]],
+            date=gaps["start"],
+            value=np.zeros(len(gaps["row"])),
+            expected=np.zeros(len(gaps["row"])),
+            severity=np.minimum(1.0, gaps["length"] / 7),
+            anomaly_type="gap",
+            method="gap_detection"
+        )
+    
+    def _sku_codes(self, df: pd.DataFrame, sku_col: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        # sku labels and row codes or one unnamed series
+        if sku_col is None:
+            return np.array([""], dtype=object), np.zeros(len(df), dtype=np.int64)
+        codes, labels = pd.factorize(df[sku_col])
+        return np.asarray(labels, dtype=object), codes.astype(np.int64)
     
     # ---------- ANOMALY MANAGEMENT ----------
     
@@ -333,55 +285,16 @@ class AnomalyDetector:
         # flag anomaly for user review
         self.flagged_for_review.append((sku, anomaly_idx))
     
-    def get_anomaly_playlist(self, min_severity: float = 0.5) -> List[Anomaly]:
+    def get_anomaly_playlist(self, min_severity: float = 0.5) -> AnomalyView:
         # get list of high severity anomalies for review
-        playlist = []
-        
-        for sku, anomalies in self.anomalies.items():
-            for anomaly in anomalies:
-                if anomaly.severity >= min_severity:
-                    playlist.append(anomaly)
-        
-        # sort by severity
-        playlist.sort(key=lambda x: x.severity, reverse=True)
-        
-        return playlist
+        return self.anomalies.view(self.anomalies.playlist(min_severity))
     
     def get_summary(self) -> Dict[str, Any]:
         # get anomaly detection summary
-        total_anomalies = sum(len(a) for a in self.anomalies.values())
-        
-        # count by type
-        type_counts = {}
-        severity_sum = 0
-        
-        for anomalies in self.anomalies.values():
-            for a in anomalies:
-                type_counts[a.anomaly_type] = type_counts.get(a.anomaly_type, 0) + 1
-                severity_sum += a.severity
-        
-        return {
-            "total_anomalies": total_anomalies,
-            "skus_with_anomalies": len(self.anomalies),
-            "by_type": type_counts,
-            "avg_severity": severity_sum / total_anomalies if total_anomalies > 0 else 0,
-            "flagged_count": len(self.flagged_for_review)
-        }
+        summary = self.anomalies.summary()
+        summary["flagged_count"] = len(self.flagged_for_review)
+        return summary
     
     def export_anomalies(self) -> pd.DataFrame:
         # export all anomalies as dataframe
-        data = []
-        
-        for sku, anomalies in self.anomalies.items():
-            for a in anomalies:
-                data.append({
-                    "sku": a.sku,
-                    "date": a.date,
-                    "value": a.value,
-                    "expected_value": a.expected_value,
-                    "type": a.anomaly_type,
-                    "severity": a.severity,
-                    "method": a.method
-                })
-        
-        return pd.DataFrame(data)
\ No newline at end of file
+        return self.anomalies.to_frame()
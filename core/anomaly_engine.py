@@ -0,0 +1,386 @@
+"""
+anomaly engine module
+vectorized anomaly scoring for a whole frame of skus at once
+per sku statistics come from sorted groups and sliding windows
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+import config
+from core.quality_profiler import item_stats
+
+
+# ============================================================================
+#                              ANOMALY ENGINE
+# ============================================================================
+
+class AnomalyEngine:
+    # batch statistical detection returning row masks instead of records
+    
+    TYPES = np.array(["spike", "drop", "negative"], dtype=object)
+    
+    def __init__(self):
+        # initialize with detection configuration
+        self.config = config.ANOMALY_DETECTION
+    
+    def scan(self,
+             df: pd.DataFrame,
+             qty_col: str,
+             method: str = "iqr",
+             sku_col: Optional[str] = None,
+             date_col: Optional[str] = None) -> Dict[str, np.ndarray]:
+        # flag rows of every sku with one method in one pass
+        values = pd.to_numeric(df[qty_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        if sku_col is None:
+            codes = np.zeros(len(values), dtype=np.int64)
+        else:
+            codes = pd.factorize(df[sku_col])[0].astype(np.int64)
+        
+        if method == "zscore":
+            return self._scan_zscore(values, codes)
+        elif method == "rolling":
+            return self._scan_rolling(values, codes)
+        elif method == "seasonal" and date_col is not None:
+            return self._scan_seasonal(values, codes, pd.DatetimeIndex(pd.to_datetime(df[date_col])))
+        return self._scan_iqr(values, codes)
+    
+    def _result(self, n_rows: int) -> Dict[str, np.ndarray]:
+        # empty per row result arrays
+        return {
+            "mask": np.zeros(n_rows, dtype=bool),
+            "expected": np.full(n_rows, np.nan),
+            "severity": np.zeros(n_rows),
+            "type": np.zeros(n_rows, dtype=np.int8)
+        }
+    
+    # ---------- METHODS ----------
+    
+    def _scan_iqr(self, values: np.ndarray, codes: np.ndarray) -> Dict[str, np.ndarray]:
+        # quartile fences per sku from one sort of valid values
+        result = self._result(len(values))
+        multiplier = self.config["methods"]["iqr"]["multiplier"]
+        
+        sorted_values, starts, counts = self._sorted_groups(values, codes)
+        eligible = counts >= 4
+        
+        q1 = self._group_quantile(sorted_values, starts, counts, 0.25)
+        q3 = self._group_quantile(sorted_values, starts, counts, 0.75)
+        median = self._group_median(sorted_values, starts, counts)
+        iqr = q3 - q1
+        lower = q1 - multiplier * iqr
+        upper = q3 + multiplier * iqr
+        
+        rows = (codes >= 0) & ~np.isnan(values)
+        rows[rows] = eligible[codes[rows]]
+        group = codes[rows]
+        v = values[rows]
+        
+        low = v < lower[group]
+        high = ~low & (v > upper[group])
+        bound = np.where(low, lower[group], upper[group])
+        
+        flagged = np.flatnonzero(rows)
+        hit = low | high
+        positions = flagged[hit]
+        result["mask"][positions] = True
+        result["expected"][positions] = median[group[hit]]
+        result["severity"][positions] = np.minimum(1.0, np.abs(v - bound) / (iqr[group] + 1))[hit]
+        result["type"][positions] = np.where(high, 0, np.where(v >= 0, 1, 2))[hit]
+        return result
+    
+    def _scan_zscore(self, values: np.ndarray, codes: np.ndarray) -> Dict[str, np.ndarray]:
+        # distance from each sku mean in sample standard deviations
+        result = self._result(len(values))
+        threshold = self.config["methods"]["zscore"]["threshold"]
+        
+        valid = (codes >= 0) & ~np.isnan(values)
+        counts = np.bincount(codes[valid], minlength=codes.max() + 1 if len(codes) else 0)
+        mean, std = item_stats(values, pd.Series(codes) if len(codes) else None)
+        
+        rows = valid.copy()
+        rows[valid] = counts[codes[valid]] >= 3
+        rows &= std != 0
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zscore = np.abs(values - mean) / std
+        hit = rows & (zscore > threshold)
+        
+        result["mask"] = hit
+        result["expected"][hit] = mean[hit]
+        result["severity"][hit] = np.minimum(1.0, zscore[hit] / (threshold * 2))
+        result["type"][hit] = np.where(values[hit] > mean[hit], 0, 1)
+        return result
+    
+    def _scan_rolling(self, values: np.ndarray, codes: np.ndarray) -> Dict[str, np.ndarray]:
+        # centered window mean and std that never cross sku boundaries
+        result = self._result(len(values))
+        window = self.config["methods"]["rolling"]["window"]
+        threshold = self.config["methods"]["rolling"]["threshold"]
+        if len(values) < window:
+            return result
+        
+        # rows of each sku side by side in their original order
+        order = np.argsort(codes, kind="stable")
+        ordered = values[order]
+        ordered_codes = codes[order]
+        
+        windows = sliding_window_view(ordered, window)
+        same_group = sliding_window_view(ordered_codes, window)
+        inside = (same_group[:, 0] == same_group[:, -1]) & (same_group[:, 0] >= 0)
+        
+        window_mean = windows.mean(axis=1)
+        deviation = windows - window_mean[:, None]
+        window_std = np.sqrt((deviation * deviation).sum(axis=1) / (window - 1))
+        window_mean[~inside] = np.nan
+        
+        # window starting at i is centered on row i plus half the window
+        rolling_mean = np.full(len(values), np.nan)
+        rolling_std = np.full(len(values), np.nan)
+        rolling_mean[window // 2:window // 2 + len(window_mean)] = window_mean
+        rolling_std[window // 2:window // 2 + len(window_std)] = window_std
+        
+        # short series are skipped like the per sku rule
+        group_rows = np.bincount(ordered_codes[ordered_codes >= 0], minlength=codes.max() + 1)
+        long_enough = np.append(group_rows >= window + 1, False)[ordered_codes]
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zscore = np.abs(ordered - rolling_mean) / rolling_std
+        hit = long_enough & ~np.isnan(ordered) & ~np.isnan(rolling_mean) & (rolling_std != 0) & (zscore > threshold)
+        
+        positions = order[hit]
+        result["mask"][positions] = True
+        result["expected"][positions] = rolling_mean[hit]
+        result["severity"][positions] = np.minimum(1.0, zscore[hit] / (threshold * 2))
+        result["type"][positions] = np.where(ordered[hit] > rolling_mean[hit], 0, 1)
+        return result
+    
+    def _scan_seasonal(self, values: np.ndarray, codes: np.ndarray, dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+        # residual after moving average trend and weekday and week of year indexes
+        result = self._result(len(values))
+        settings = self.config["methods"]["seasonal"]
+        threshold = settings["threshold"]
+        
+        # rows of each sku side by side in date order
+        rows = np.flatnonzero((codes >= 0) & ~dates.isna())
+        if not len(rows):
+            return result
+        ticks = dates.asi8
+        order = self._date_order(rows, codes, ticks)
+        v = values[order]
+        group = codes[order]
+        days = ticks[order] // 86_400_000_000_000
+        bounds = np.searchsorted(group, np.arange(codes.max() + 2))
+        
+        # a first trend finds outliers which are clipped before the final trend
+        window = settings["trend_window"]
+        trend = self._moving_average(v, group, bounds, window)
+        scale = np.sqrt(self._keyed_mean((v - trend) ** 2, group, len(bounds) - 1))
+        clipped = np.clip(v, trend - threshold * scale, trend + threshold * scale)
+        trend = self._moving_average(clipped, group, bounds, window)
+        
+        # demand seasonality scales with level so indexes are mean ratios to the trend
+        weekday = (days + 3) % 7
+        weekly = self._seasonal_index(clipped, trend, group * 7 + weekday)
+        
+        # week of year effects need two yearly cycles of history
+        present = bounds[1:] > bounds[:-1]
+        span = np.zeros(len(present))
+        span[present] = days[bounds[1:][present] - 1] - days[bounds[:-1][present]]
+        long_history = span[group] >= settings["annual_min_days"]
+        
+        week = (dates.dayofyear.to_numpy()[order] - 1) // 7
+        annual = np.where(long_history, self._seasonal_index(clipped, trend * weekly, group * 53 + week), 1.0)
+        expected = trend * weekly * annual
+        
+        # square root scaling evens out count noise between quiet and busy days
+        with np.errstate(invalid="ignore", divide="ignore"):
+            residual = (v - expected) / np.sqrt(np.maximum(np.abs(expected), 1.0))
+        
+        # mean and spread are taken again without the outliers they first reveal
+        n_groups = len(present)
+        center = self._keyed_mean(residual, group, n_groups)
+        spread = np.sqrt(self._keyed_mean((residual - center) ** 2, group, n_groups))
+        with np.errstate(invalid="ignore"):
+            inlier = np.where(np.abs(residual - center) <= threshold * spread, residual, np.nan)
+        center = self._keyed_mean(inlier, group, n_groups)
+        spread = np.sqrt(self._keyed_mean((inlier - center) ** 2, group, n_groups))
+        counts = np.bincount(group[~np.isnan(v)], minlength=n_groups)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zscore = np.abs(residual - center) / spread
+        hit = (counts[group] >= settings["min_periods"]) & (spread > 0) & ~np.isnan(residual) & (zscore > threshold)
+        
+        positions = order[hit]
+        result["mask"][positions] = True
+        result["expected"][positions] = expected[hit]
+        result["severity"][positions] = np.minimum(1.0, zscore[hit] / (threshold * 2))
+        result["type"][positions] = np.where(
+            residual[hit] > center[hit], 0, np.where(v[hit] >= 0, 1, 2)
+        )
+        return result
+    
+    def _date_order(self, rows: np.ndarray, codes: np.ndarray, ticks: np.ndarray) -> np.ndarray:
+        # rows in sku then date order skipping the sort when processed order already holds
+        kept_codes, kept_ticks = codes[rows], ticks[rows]
+        step = np.diff(kept_codes)
+        if np.all((step > 0) | ((step == 0) & (np.diff(kept_ticks) >= 0))):
+            return rows
+        return rows[np.lexsort((kept_ticks, kept_codes))]
+    
+    def _seasonal_index(self, values: np.ndarray, level: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        # mean ratio of values to level per key with neutral index where unknown
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(level > 0, values / level, np.nan)
+        index = self._keyed_mean(ratio, keys, keys.max() + 1)
+        return np.where(np.isnan(index), 1.0, index)
+    
+    # ---------- RUN LENGTH KERNELS ----------
+    
+    def zero_runs(self, values: np.ndarray, codes: np.ndarray, min_length: int = 3) -> Dict[str, np.ndarray]:
+        # runs of zero values inside each sku in row order
+        order = np.argsort(codes, kind="stable")
+        zero = (values[order] == 0) & (codes[order] >= 0)
+        ordered_codes = codes[order]
+        
+        # runs open after a non zero row or a sku change and close before one
+        same_group = ordered_codes[1:] == ordered_codes[:-1]
+        joined = zero[1:] & zero[:-1] & same_group
+        starts = np.flatnonzero(zero & ~np.concatenate([[False], joined]))
+        ends = np.flatnonzero(zero & ~np.concatenate([joined, [False]]))
+        lengths = ends - starts + 1
+        
+        keep = lengths >= min_length
+        return {"row": order[starts[keep]], "length": lengths[keep]}
+    
+    def date_gaps(self, dates: np.ndarray, codes: np.ndarray, step: np.timedelta64) -> Dict[str, np.ndarray]:
+        # missing date runs between consecutive dates of each sku
+        stamps = dates.astype("datetime64[ns]")
+        ticks = stamps.astype(np.int64)
+        valid = (codes >= 0) & ~np.isnat(stamps)
+        positions = np.flatnonzero(valid)
+        order = positions[np.lexsort((ticks[valid], codes[valid]))]
+        
+        ordered_ticks = ticks[order]
+        ordered_codes = codes[order]
+        step_ns = int(step / np.timedelta64(1, "ns"))
+        
+        # grid points strictly between two observed dates are missing
+        diff = np.diff(ordered_ticks)
+        missing = np.where(ordered_codes[1:] == ordered_codes[:-1], (diff - 1) // step_ns, 0)
+        gaps = np.flatnonzero(missing > 0)
+        
+        return {
+            "row": order[gaps],
+            "start": (ordered_ticks[gaps] + step_ns).astype("datetime64[ns]"),
+            "length": missing[gaps]
+        }
+    
+    def calendar_gaps(self, dates: np.ndarray, codes: np.ndarray, freq: str) -> Dict[str, np.ndarray]:
+        # missing runs on a calendar grid such as weeks or month ends for each sku
+        stamps = dates.astype("datetime64[ns]")
+        valid = (codes >= 0) & ~np.isnat(stamps)
+        positions = np.flatnonzero(valid)
+        order = positions[np.lexsort((stamps[valid], codes[valid]))]
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        
+        rows, starts, lengths = [], [], []
+        for group in np.split(order, bounds):
+            if len(group) < 2:
+                continue
+            observed = stamps[group]
+            grid = pd.date_range(observed[0], observed[-1], freq=freq).to_numpy()
+            missing = np.flatnonzero(~np.isin(grid, observed))
+            if not len(missing):
+                continue
+            
+            # consecutive grid points form one run dated at its first point
+            first = missing[np.concatenate([[True], np.diff(missing) > 1])]
+            last = missing[np.concatenate([np.diff(missing) > 1, [True]])]
+            before = np.searchsorted(observed, grid[first], side="right") - 1
+            rows.append(group[before])
+            starts.append(grid[first])
+            lengths.append(last - first + 1)
+        
+        if not rows:
+            return {
+                "row": np.array([], dtype=np.int64),
+                "start": np.array([], dtype="datetime64[ns]"),
+                "length": np.array([], dtype=np.int64)
+            }
+        return {
+            "row": np.concatenate(rows),
+            "start": np.concatenate(starts).astype("datetime64[ns]"),
+            "length": np.concatenate(lengths)
+        }
+    
+    # ---------- GROUP STATISTICS ----------
+    
+    def _sorted_groups(self, values: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # valid values sorted within each sku with group offsets
+        valid = (codes >= 0) & ~np.isnan(values)
+        n_groups = codes.max() + 1 if len(codes) else 0
+        kept, keys = values[valid], codes[valid].astype(np.int64)
+        # one integer sort on sku then value rank beats a two key lexsort
+        rank = np.empty(len(kept), dtype=np.int64)
+        rank[np.argsort(kept)] = np.arange(len(kept))
+        order = np.argsort(keys * len(kept) + rank)
+        sorted_values = kept[order]
+        counts = np.bincount(keys, minlength=n_groups)
+        starts = np.cumsum(counts) - counts
+        return sorted_values, starts, counts
+    
+    def _keyed_mean(self, values: np.ndarray, keys: np.ndarray, n_keys: int) -> np.ndarray:
+        # mean of valid values sharing a non negative integer key broadcast back to rows
+        valid = ~np.isnan(values)
+        sums = np.bincount(keys[valid], weights=values[valid], minlength=n_keys)
+        counts = np.bincount(keys[valid], minlength=n_keys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts)[keys]
+    
+    def _moving_average(self, values: np.ndarray, group: np.ndarray, bounds: np.ndarray, window: int) -> np.ndarray:
+        # centered mean over odd windows that shrink at sku edges from cumulative sums
+        half = window // 2
+        valid = ~np.isnan(values)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(valid)])
+        
+        position = np.arange(len(values))
+        low = np.maximum(position - half, bounds[group])
+        high = np.minimum(position + half + 1, bounds[group + 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums[high] - sums[low]) / (counts[high] - counts[low])
+    
+    def _group_quantile(self,
+                        sorted_values: np.ndarray,
+                        starts: np.ndarray,
+                        counts: np.ndarray,
+                        q: float) -> np.ndarray:
+        # linear interpolation quantile matching numpy percentile per group
+        result = np.full(len(counts), np.nan)
+        present = counts > 0
+        n = counts[present]
+        
+        virtual = n * q - q
+        previous = np.floor(virtual).astype(np.int64)
+        following = np.minimum(previous + 1, n - 1)
+        gamma = virtual - previous
+        
+        a = sorted_values[starts[present] + previous]
+        b = sorted_values[starts[present] + following]
+        diff = b - a
+        # numpy interpolates from the nearer side
+        result[present] = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+        return result
+    
+    def _group_median(self, sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        # middle value or mean of the two middle values per group
+        result = np.full(len(counts), np.nan)
+        present = counts > 0
+        n = counts[present]
+        lower = sorted_values[starts[present] + (n - 1) // 2]
+        upper = sorted_values[starts[present] + n // 2]
+        result[present] = (lower + upper) / 2
+        return result
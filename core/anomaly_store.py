@@ -0,0 +1,388 @@
+"""
+anomaly store module
+columnar table of detected anomalies with sku and severity indexes
+anomaly records are built lazily only when a caller reads them
+"""
+
+import pandas as pd
+import numpy as np
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional, Any, Iterable
+from dataclasses import dataclass
+
+
+# ============================================================================
+#                               DATA CLASSES
+# ============================================================================
+
+@dataclass
+class Anomaly:
+    # single anomaly record
+    sku: str
+    date: str
+    value: float
+    expected_value: float
+    anomaly_type: str
+    severity: float
+    method: str
+
+
+# ============================================================================
+#                               ANOMALY VIEW
+# ============================================================================
+
+class AnomalyView(Sequence):
+    # read only sequence of anomaly records over rows of a store
+    
+    def __init__(self, store: "AnomalyStore", rows: np.ndarray):
+        # initialize with owning store and row positions
+        self.store = store
+        self.rows = np.asarray(rows, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        # number of anomalies in view
+        return len(self.rows)
+    
+    def __getitem__(self, item):
+        # anomaly record or narrower view
+        if isinstance(item, slice):
+            return AnomalyView(self.store, self.rows[item])
+        return self.store.anomaly(int(self.rows[item]))
+    
+    def __eq__(self, other) -> bool:
+        # compare records with another view or list
+        if isinstance(other, (AnomalyView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def to_frame(self) -> pd.DataFrame:
+        # rows of the view as a dataframe
+        return self.store.to_frame(self.rows)
+
+
+# ============================================================================
+#                               ANOMALY STORE
+# ============================================================================
+
+class AnomalyStore(Mapping):
+    # anomalies held as numpy columns and read as sku -> anomalies mapping
+    
+    TYPES = ["spike", "drop", "negative", "zero", "gap"]
+    METHODS = ["iqr", "zscore", "rolling", "zero_detection", "gap_detection", "seasonal"]
+    
+    def __init__(self,
+                 skus: Optional[Iterable[Any]] = None,
+                 sku_code: Optional[np.ndarray] = None,
+                 date: Optional[np.ndarray] = None,
+                 value: Optional[np.ndarray] = None,
+                 expected: Optional[np.ndarray] = None,
+                 type_code: Optional[np.ndarray] = None,
+                 severity: Optional[np.ndarray] = None,
+                 method_code: Optional[np.ndarray] = None,
+                 types: Optional[List[str]] = None,
+                 methods: Optional[List[str]] = None):
+        # initialize from column arrays and label lists
+        self.skus = np.asarray(list(skus) if skus is not None else [], dtype=object)
+        self.types = np.asarray(types or self.TYPES, dtype=object)
+        self.methods = np.asarray(methods or self.METHODS, dtype=object)
+        
+        n_rows = 0 if sku_code is None else len(sku_code)
+        self.sku_code = self._column(sku_code, n_rows, np.int32)
+        self.date = self._column(date, n_rows, "datetime64[ns]")
+        self.value = self._column(value, n_rows, np.float64)
+        self.expected = self._column(expected, n_rows, np.float64)
+        self.type_code = self._column(type_code, n_rows, np.int8)
+        self.severity = self._column(severity, n_rows, np.float64)
+        self.method_code = self._column(method_code, n_rows, np.int8)
+        
+        self._build_indexes()
+    
+    @staticmethod
+    def _column(values: Optional[np.ndarray], n_rows: int, dtype) -> np.ndarray:
+        # column array of a fixed dtype
+        if values is None:
+            return np.zeros(n_rows, dtype=dtype)
+        return np.asarray(values).astype(dtype, copy=False)
+    
+    def _build_indexes(self) -> None:
+        # sku offsets and descending severity order
+        self._sku_order = np.argsort(self.sku_code, kind="stable")
+        self._sku_bounds = np.searchsorted(self.sku_code[self._sku_order], np.arange(len(self.skus) + 1))
+        self._sku_lookup = {sku: code for code, sku in enumerate(self.skus.tolist())}
+        
+        # stable sort keeps detection order among equal severities
+        self._severity_order = np.argsort(-self.severity, kind="stable")
+        self._severity_desc = self.severity[self._severity_order]
+    
+    # ---------- BUILDING ----------
+    
+    @classmethod
+    def from_scan(cls,
+                  frame: pd.DataFrame,
+                  result: Dict[str, np.ndarray],
+                  sku_col: Optional[str],
+                  date_col: str,
+                  qty_col: str,
+                  method: str,
+                  sku: Any = "") -> "AnomalyStore":
+        # flagged rows of an engine scan grouped by sku in appearance order
+        flagged = np.flatnonzero(result["mask"])
+        if sku_col is None:
+            labels = np.array([sku], dtype=object)
+            codes = np.zeros(len(frame), dtype=np.int64)
+        else:
+            codes, labels = pd.factorize(frame[sku_col])
+            labels = np.asarray(labels, dtype=object)
+        
+        flagged = flagged[np.argsort(codes[flagged], kind="stable")]
+        present, sku_code = np.unique(codes[flagged], return_inverse=True)
+        
+        return cls(
+            skus=labels[present],
+            sku_code=sku_code,
+            date=pd.to_datetime(frame[date_col].iloc[flagged]).to_numpy(),
+            value=frame[qty_col].iloc[flagged].to_numpy(dtype=float, na_value=np.nan),
+            expected=result["expected"][flagged],
+            type_code=result["type"][flagged],
+            severity=result["severity"][flagged],
+            method_code=np.full(len(flagged), cls.METHODS.index(method)),
+            types=cls.TYPES,
+            methods=cls.METHODS
+        )
+    
+    @classmethod
+    def from_events(cls,
+                    labels: np.ndarray,
+                    codes: np.ndarray,
+                    date: np.ndarray,
+                    value: np.ndarray,
+                    expected: np.ndarray,
+                    severity: np.ndarray,
+                    anomaly_type: str,
+                    method: str) -> "AnomalyStore":
+        # one anomaly type from kernel output grouped by sku code
+        order = np.argsort(codes, kind="stable")
+        present, sku_code = np.unique(codes[order], return_inverse=True)
+        return cls(
+            skus=np.asarray(labels, dtype=object)[present],
+            sku_code=sku_code,
+            date=np.asarray(date)[order],
+            value=np.asarray(value)[order],
+            expected=np.asarray(expected)[order],
+            type_code=np.full(len(order), cls.TYPES.index(anomaly_type)),
+            severity=np.asarray(severity)[order],
+            method_code=np.full(len(order), cls.METHODS.index(method))
+        )
+    
+    @classmethod
+    def from_records(cls, anomalies: Any) -> "AnomalyStore":
+        # store from sku -> anomaly lists or a flat anomaly list
+        if isinstance(anomalies, AnomalyStore):
+            return anomalies
+        if isinstance(anomalies, Mapping):
+            records = [(sku, a) for sku, items in anomalies.items() for a in items]
+        else:
+            records = [(a.sku, a) for a in anomalies]
+        
+        types = list(cls.TYPES)
+        methods = list(cls.METHODS)
+        for _, a in records:
+            if a.anomaly_type not in types:
+                types.append(a.anomaly_type)
+            if a.method not in methods:
+                methods.append(a.method)
+        
+        # record order is kept so playlists stay sorted
+        codes, skus = pd.factorize(pd.Series([sku for sku, _ in records], dtype=object))
+        return cls(
+            skus=np.asarray(skus, dtype=object),
+            sku_code=codes,
+            date=pd.to_datetime([a.date for _, a in records]).to_numpy(),
+            value=[a.value for _, a in records],
+            expected=[a.expected_value for _, a in records],
+            type_code=[types.index(a.anomaly_type) for _, a in records],
+            severity=[a.severity for _, a in records],
+            method_code=[methods.index(a.method) for _, a in records],
+            types=types,
+            methods=methods
+        )
+    
+    @classmethod
+    def concat(cls, stores: List["AnomalyStore"]) -> "AnomalyStore":
+        # stack stores of disjoint sku sets
+        stores = [s for s in stores if s.n_rows]
+        if not stores:
+            return cls()
+        if len(stores) == 1:
+            return stores[0]
+        
+        offsets = np.cumsum([0] + [len(s.skus) for s in stores[:-1]])
+        return cls(
+            skus=np.concatenate([s.skus for s in stores]),
+            sku_code=np.concatenate([s.sku_code + offset for s, offset in zip(stores, offsets)]),
+            date=np.concatenate([s.date for s in stores]),
+            value=np.concatenate([s.value for s in stores]),
+            expected=np.concatenate([s.expected for s in stores]),
+            type_code=np.concatenate([s.type_code for s in stores]),
+            severity=np.concatenate([s.severity for s in stores]),
+            method_code=np.concatenate([s.method_code for s in stores]),
+            # label lists only ever extend the defaults so the longest covers all codes
+            types=max((s.types.tolist() for s in stores), key=len),
+            methods=max((s.methods.tolist() for s in stores), key=len)
+        )
+    
+    @classmethod
+    def merge(cls, stores: List["AnomalyStore"]) -> "AnomalyStore":
+        # stack stores that may share skus keeping each sku's rows together
+        stores = [s for s in stores if s.n_rows]
+        if len(stores) <= 1:
+            return stores[0] if stores else cls()
+        
+        labels = np.concatenate([s.skus[s.sku_code] for s in stores])
+        codes, skus = pd.factorize(pd.Series(labels, dtype=object))
+        order = np.argsort(codes, kind="stable")
+        return cls(
+            skus=np.asarray(skus, dtype=object),
+            sku_code=codes[order],
+            date=np.concatenate([s.date for s in stores])[order],
+            value=np.concatenate([s.value for s in stores])[order],
+            expected=np.concatenate([s.expected for s in stores])[order],
+            type_code=np.concatenate([s.type_code for s in stores])[order],
+            severity=np.concatenate([s.severity for s in stores])[order],
+            method_code=np.concatenate([s.method_code for s in stores])[order],
+            types=max((s.types.tolist() for s in stores), key=len),
+            methods=max((s.methods.tolist() for s in stores), key=len)
+        )
+    
+    def take(self, rows: np.ndarray) -> "AnomalyStore":
+        # store holding only the given rows
+        present, sku_code = np.unique(self.sku_code[rows], return_inverse=True)
+        return AnomalyStore(
+            skus=self.skus[present],
+            sku_code=sku_code,
+            date=self.date[rows],
+            value=self.value[rows],
+            expected=self.expected[rows],
+            type_code=self.type_code[rows],
+            severity=self.severity[rows],
+            method_code=self.method_code[rows],
+            types=self.types.tolist(),
+            methods=self.methods.tolist()
+        )
+    
+    def replace(self, skus: Iterable[Any], other: "AnomalyStore") -> "AnomalyStore":
+        # swap the anomalies of some skus for a fresh scan of them
+        stale = np.isin(self.skus, np.asarray(list(skus), dtype=object))
+        kept = self.take(np.flatnonzero(~stale[self.sku_code]))
+        return AnomalyStore.concat([kept, other])
+    
+    # ---------- MAPPING ----------
+    
+    def __getitem__(self, sku: Any) -> AnomalyView:
+        # anomalies of one sku
+        code = self._sku_lookup[sku]
+        return AnomalyView(self, self._sku_order[self._sku_bounds[code]:self._sku_bounds[code + 1]])
+    
+    def __iter__(self):
+        # skus in detection order
+        return iter(self.skus.tolist())
+    
+    def __len__(self) -> int:
+        # number of skus with anomalies
+        return len(self.skus)
+    
+    @property
+    def n_rows(self) -> int:
+        # number of anomalies across all skus
+        return len(self.sku_code)
+    
+    def anomaly(self, row: int) -> Anomaly:
+        # build record for one row
+        return Anomaly(
+            sku=self.skus[self.sku_code[row]],
+            date=str(pd.Timestamp(self.date[row])),
+            value=float(self.value[row]),
+            expected_value=float(self.expected[row]),
+            anomaly_type=self.types[self.type_code[row]],
+            severity=float(self.severity[row]),
+            method=self.methods[self.method_code[row]]
+        )
+    
+    def view(self, rows: Optional[np.ndarray] = None) -> AnomalyView:
+        # lazy records for rows or the whole table
+        if rows is None:
+            rows = np.arange(self.n_rows)
+        return AnomalyView(self, rows)
+    
+    # ---------- QUERIES ----------
+    
+    def playlist(self, min_severity: float = 0.0) -> np.ndarray:
+        # rows at or above severity from highest to lowest
+        count = np.searchsorted(-self._severity_desc, -min_severity, side="right")
+        return self._severity_order[:count]
+    
+    def filter(self,
+               types: Optional[List[str]] = None,
+               min_severity: float = 0.0,
+               search: str = "",
+               rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # rows matching type severity and text filters
+        if rows is None:
+            rows = np.arange(self.n_rows)
+        keep = self.severity[rows] >= min_severity
+        
+        if types:
+            keep &= np.isin(self.types[self.type_code[rows]], types)
+        
+        search = search.lower().strip()
+        if search:
+            # labels are matched once per distinct value then broadcast to rows
+            sku_hit = pd.Index(self.skus.astype(str)).str.lower().str.contains(search, regex=False)
+            type_hit = pd.Index(self.types.astype(str)).str.lower().str.contains(search, regex=False)
+            dates = pd.DatetimeIndex(self.date[rows]).astype(str)
+            keep &= (
+                np.asarray(sku_hit)[self.sku_code[rows]]
+                | np.asarray(type_hit)[self.type_code[rows]]
+                | np.asarray(dates.str.contains(search, regex=False))
+            )
+        return rows[keep]
+    
+    def summary(self) -> Dict[str, Any]:
+        # totals by type and average severity
+        total = self.n_rows
+        counts = np.bincount(self.type_code, minlength=len(self.types))
+        return {
+            "total_anomalies": total,
+            "skus_with_anomalies": len(np.unique(self.sku_code)),
+            "by_type": {self.types[i]: int(c) for i, c in enumerate(counts) if c},
+            "avg_severity": float(self.severity.mean()) if total > 0 else 0
+        }
+    
+    def to_frame(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        # anomaly rows as a dataframe with categorical labels
+        if rows is None:
+            rows = np.arange(self.n_rows)
+        return pd.DataFrame({
+            "sku": self.skus[self.sku_code[rows]],
+            "date": self.date[rows],
+            "value": self.value[rows],
+            "expected_value": self.expected[rows],
+            "type": pd.Categorical.from_codes(self.type_code[rows], categories=self.types),
+            "severity": self.severity[rows],
+            "method": pd.Categorical.from_codes(self.method_code[rows], categories=self.methods)
+        })
+    
+    def points(self, sku: Any) -> List[Dict[str, Any]]:
+        # chart markers for one sku
+        if sku not in self._sku_lookup:
+            return []
+        rows = self[sku].rows
+        return [
+            {"date": date, "value": value, "type": anomaly_type}
+            for date, value, anomaly_type in zip(
+                pd.DatetimeIndex(self.date[rows]), self.value[rows].tolist(),
+                self.types[self.type_code[rows]].tolist()
+            )
+        ]
@@ -6,10 +6,14 @@ provides confidence scores for mappings
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-import re
+from typing import Dict, List, Tuple, Optional, Union
+from pathlib import Path
+import hashlib
+import json
+import copy
 
 import config
+from utils.date_utils import DateUtils
 
 
 # ============================================================================
@@ -19,30 +23,43 @@ import config
 class ColumnDetector:
     # automatic column type detection for uploaded data
     
+    # detections shared by every detector in the session
+    _cache: Dict[str, Dict[str, Dict]] = {}
+    
     def __init__(self):
         # initialize with detection keywords from config
         self.keywords = config.COLUMN_DETECTION
         self.confidence_threshold = self.keywords["confidence_threshold"]
+        self.sample_rows = self.keywords["sample_rows"]
+        self.cache_path = config.CACHE_DIR / "column_detection.json"
     
     # ---------- MAIN DETECTION ----------
     
-    def detect_columns(self, df: pd.DataFrame) -> Dict[str, Dict]:
+    def detect_columns(self, df: pd.DataFrame, fingerprint: Optional[str] = None) -> Dict[str, Dict]:
         # detect all column types and return with confidence scores
+        key = self._cache_key(fingerprint, df.columns) if fingerprint else None
+        cached = self._load_cached(key) if key else None
+        if cached is not None:
+            return cached
+        
+        # one bounded sample serves every column
+        sample = self.sample_frame(df, self.sample_rows)
+        stats = self._column_stats(sample)
         detections = {}
         
         for col in df.columns:
-            col_lower = col.lower().strip()
+            col_lower = str(col).lower().strip()
             dtype = str(df[col].dtype)
-            sample = df[col].dropna().head(100)
+            col_stats = stats[col]
             
             # check each column type
             scores = {
-                "date": self._score_date_column(col_lower, dtype, sample),
-                "sku": self._score_sku_column(col_lower, dtype, sample),
-                "quantity": self._score_quantity_column(col_lower, dtype, sample),
-                "category": self._score_category_column(col_lower, dtype, sample),
-                "price": self._score_price_column(col_lower, dtype, sample),
-                "promo": self._score_promo_column(col_lower, dtype, sample)
+                "date": self._score_date_column(col_lower, dtype, col_stats),
+                "sku": self._score_sku_column(col_lower, dtype, col_stats),
+                "quantity": self._score_quantity_column(col_lower, dtype, col_stats),
+                "category": self._score_category_column(col_lower, dtype, col_stats),
+                "price": self._score_price_column(col_lower, dtype, col_stats),
+                "promo": self._score_promo_column(col_lower, dtype, col_stats)
             }
             
             # get best match
@@ -54,11 +71,158 @@ class ColumnDetector:
                 "confidence": best_score,
                 "all_scores": scores,
                 "dtype": dtype,
-                "sample_values": sample.head(5).tolist()
+                "sample_values": col_stats["sample_values"]
             }
         
+        if key:
+            self._store_cached(key, detections)
+        
         return detections
     
+    # ---------- SAMPLING ----------
+    
+    def sample_frame(self, df: pd.DataFrame, n: int) -> pd.DataFrame:
+        # uniform random rows kept in file order without copying columns first
+        if len(df) <= n:
+            return df
+        
+        rng = np.random.default_rng(self.keywords["sample_seed"])
+        positions = np.sort(rng.choice(len(df), size=n, replace=False))
+        return df.take(positions)
+    
+    def _column_stats(self, sample: pd.DataFrame) -> Dict[str, Dict]:
+        # scoring statistics for every column computed frame wide
+        counts = sample.notna().sum()
+        n_unique = sample.nunique()
+        
+        # numeric checks over all numeric columns at once
+        numeric = sample.select_dtypes(include="number")
+        numeric_counts = numeric.notna().sum().replace(0, np.nan)
+        with np.errstate(invalid="ignore"):
+            cents = numeric * 100
+            tenths = numeric * 10
+            numeric_ratios = pd.DataFrame({
+                "nonneg_ratio": (numeric >= 0).sum() / numeric_counts,
+                "positive_ratio": (numeric > 0).sum() / numeric_counts,
+                "integer_ratio": (numeric == np.floor(numeric)).sum() / numeric_counts,
+                "two_decimal_ratio": (
+                    np.isclose(cents, cents.round()) & ~np.isclose(tenths, tenths.round())
+                ).sum() / numeric_counts
+            }).fillna(0.0)
+        
+        # text checks on one stacked series of all values
+        values = sample.stack()
+        text = values.astype(str)
+        column_level = values.index.get_level_values(-1)
+        binary = ["0", "1", "yes", "no", "true", "false", "y", "n"]
+        binary_ratio = text.str.lower().isin(binary).groupby(column_level).mean()
+        code_ratio = text.str.match(r"^[A-Za-z0-9\-_]+$").groupby(column_level).mean()
+        
+        stats = {}
+        for col in sample.columns:
+            non_null = sample[col].dropna()
+            count = int(counts[col])
+            col_stats = {
+                "count": count,
+                "n_unique": int(n_unique[col]),
+                "unique_ratio": n_unique[col] / count if count else 0.0,
+                "binary_ratio": float(binary_ratio.get(col, 0.0)),
+                "code_ratio": float(code_ratio.get(col, 0.0)),
+                "date_ratio": self._date_ratio(non_null) if non_null.dtype == object else 0.0,
+                "sample_values": non_null.head(5).tolist()
+            }
+            for name in numeric_ratios.columns:
+                col_stats[name] = float(numeric_ratios[name].get(col, 0.0))
+            stats[col] = col_stats
+        
+        return stats
+    
+    def _date_ratio(self, values: pd.Series) -> float:
+        # share of text values that parse as dates with one detected format
+        values = values.head(100)
+        if len(values) == 0:
+            return 0.0
+        
+        try:
+            text = values.astype(str).str.strip()
+            date_format = DateUtils.detect_date_format(text)
+            if date_format is not None:
+                parsed = pd.to_datetime(text, format=date_format, errors="coerce")
+            else:
+                # no common format so infer each of a few values
+                parsed = pd.to_datetime(text.head(20), format="mixed", errors="coerce")
+            return float(parsed.notna().mean())
+        except Exception:
+            return 0.0
+    
+    # ---------- DETECTION CACHE ----------
+    
+    @staticmethod
+    def source_fingerprint(source: Union[str, List[str]], extra: str = "") -> Optional[str]:
+        # identity of files from paths sizes and modification times
+        paths = source if isinstance(source, (list, tuple)) else [source]
+        entries = []
+        
+        try:
+            for path in paths:
+                path = Path(path)
+                files = sorted(f for f in path.rglob("*") if f.is_file()) if path.is_dir() else [path]
+                for f in files:
+                    stat = f.stat()
+                    entries.append(f"{f.resolve()}|{stat.st_size}|{stat.st_mtime_ns}")
+        except OSError:
+            return None
+        
+        if not entries:
+            return None
+        return hashlib.sha1("\n".join(entries + [extra]).encode("utf-8")).hexdigest()
+    
+    def _cache_key(self, fingerprint: str, columns) -> str:
+        # fingerprint joined with column names read
+        names = "|".join(str(c) for c in columns)
+        return f"{fingerprint}:{hashlib.sha1(names.encode('utf-8')).hexdigest()[:16]}"
+    
+    def _load_cached(self, key: str) -> Optional[Dict[str, Dict]]:
+        # detections from memory or the on disk cache
+        if key not in self._cache:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if key not in stored:
+                return None
+            self._cache[key] = stored[key]
+        
+        return copy.deepcopy(self._cache[key])
+    
+    def _store_cached(self, key: str, detections: Dict[str, Dict]) -> None:
+        # keep detections in memory and on disk
+        entry = {
+            str(col): {**info, "sample_values": [str(v) for v in info["sample_values"]]}
+            for col, info in detections.items()
+        }
+        self._cache[key] = entry
+        
+        try:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            
+            stored[key] = entry
+            
+            # oldest sources drop out first
+            keep = self.keywords["cache_entries"]
+            stored = dict(list(stored.items())[-keep:])
+            
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+        except (OSError, TypeError):
+            pass
+    
     def get_best_mapping(self, detections: Dict) -> Dict[str, str]:
         # get best column for each required type
         mapping = {}
@@ -88,7 +252,7 @@ class ColumnDetector:
     
     # ---------- SCORING METHODS ----------
     
-    def _score_date_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_date_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being date column
         score = 0.0
         
@@ -102,17 +266,12 @@ class ColumnDetector:
         if "datetime" in dtype:
             score += 0.5
         elif "object" in dtype:
-            # try parsing as date
-            try:
-                parsed = pd.to_datetime(sample.head(20), errors="coerce")
-                valid_pct = parsed.notna().sum() / len(parsed)
-                score += valid_pct * 0.4
-            except:
-                pass
+            # share of values parsed with the detected format
+            score += stats["date_ratio"] * 0.4
         
         return min(1.0, score)
     
-    def _score_sku_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_sku_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being sku column
         score = 0.0
         
@@ -123,8 +282,8 @@ class ColumnDetector:
                 break
         
         # check uniqueness ratio
-        if len(sample) > 0:
-            unique_ratio = sample.nunique() / len(sample)
+        if stats["count"] > 0:
+            unique_ratio = stats["unique_ratio"]
             if unique_ratio > 0.01 and unique_ratio < 0.5:
                 score += 0.3
         
@@ -133,13 +292,11 @@ class ColumnDetector:
             score += 0.2
             
             # check for code-like patterns
-            sample_str = sample.astype(str).head(20)
-            code_pattern = sample_str.str.match(r"^[A-Za-z0-9\-_]+$").mean()
-            score += code_pattern * 0.2
+            score += stats["code_ratio"] * 0.2
         
         return min(1.0, score)
     
-    def _score_quantity_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_quantity_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being quantity column
         score = 0.0
         
@@ -154,17 +311,12 @@ class ColumnDetector:
             score += 0.3
             
             # check if mostly positive integers
-            if len(sample) > 0:
-                numeric_sample = pd.to_numeric(sample, errors="coerce").dropna()
-                if len(numeric_sample) > 0:
-                    positive_ratio = (numeric_sample >= 0).mean()
-                    integer_ratio = (numeric_sample == numeric_sample.astype(int)).mean()
-                    score += positive_ratio * 0.15
-                    score += integer_ratio * 0.15
+            score += stats["nonneg_ratio"] * 0.15
+            score += stats["integer_ratio"] * 0.15
         
         return min(1.0, score)
     
-    def _score_category_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_category_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being category column
         score = 0.0
         
@@ -175,8 +327,8 @@ class ColumnDetector:
                 break
         
         # check for low cardinality
-        if len(sample) > 0:
-            unique_ratio = sample.nunique() / len(sample)
+        if stats["count"] > 0:
+            unique_ratio = stats["unique_ratio"]
             if unique_ratio < 0.1:
                 score += 0.3
             elif unique_ratio < 0.3:
@@ -188,7 +340,7 @@ class ColumnDetector:
         
         return min(1.0, score)
     
-    def _score_price_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_price_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being price column
         score = 0.0
         
@@ -202,20 +354,15 @@ class ColumnDetector:
         if "float" in dtype:
             score += 0.3
             
-            if len(sample) > 0:
-                numeric_sample = pd.to_numeric(sample, errors="coerce").dropna()
-                if len(numeric_sample) > 0:
-                    # prices are usually positive
-                    positive_ratio = (numeric_sample > 0).mean()
-                    score += positive_ratio * 0.2
-                    
-                    # prices often have 2 decimal places
-                    decimal_check = numeric_sample.apply(lambda x: len(str(x).split(".")[-1]) == 2 if "." in str(x) else False)
-                    score += decimal_check.mean() * 0.1
+            # prices are usually positive
+            score += stats["positive_ratio"] * 0.2
+            
+            # prices often have 2 decimal places
+            score += stats["two_decimal_ratio"] * 0.1
         
         return min(1.0, score)
     
-    def _score_promo_column(self, col_name: str, dtype: str, sample: pd.Series) -> float:
+    def _score_promo_column(self, col_name: str, dtype: str, stats: Dict) -> float:
         # score likelihood of being promo column
         score = 0.0
         
@@ -226,16 +373,12 @@ class ColumnDetector:
                 break
         
         # check for binary values
-        if len(sample) > 0:
-            unique_vals = sample.nunique()
-            if unique_vals <= 5:
+        if stats["count"] > 0:
+            if stats["n_unique"] <= 5:
                 score += 0.3
             
             # check for 0/1 or yes/no patterns
-            str_sample = sample.astype(str).str.lower()
-            binary_patterns = ["0", "1", "yes", "no", "true", "false", "y", "n"]
-            binary_match = str_sample.isin(binary_patterns).mean()
-            score += binary_match * 0.2
+            score += stats["binary_ratio"] * 0.2
         
         return min(1.0, score)
     
@@ -6,11 +6,23 @@ manages dataframe operations for large datasets
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import glob
 import gc
+import threading
 
 import config
+from utils.date_utils import DateUtils
+from utils.memory_manager import traced_peak
+from utils.compression import CompressionUtils, DecompressingReader
+from utils.database_source import DatabaseSource
+from core.quality_profiler import QualityProfiler, item_stats
+from core.tier_index import TierIndex
+from core.shard_store import ShardStore
+from core.dtype_optimizer import DtypeOptimizer
+from core.identifiers import encode_labels, prefix_labels, combine_labels, label_codes, drop_unused_labels
 
 
 # ============================================================================
@@ -20,6 +32,9 @@ import config
 class DataProcessor:
     # main data processing class for stocksight
     
+    # file types accepted by the loaders
+    SUPPORTED_SUFFIXES = [".csv", ".xlsx", ".xls", ".parquet"]
+    
     def __init__(self):
         # initialize processor with empty state
         self.raw_data = None
@@ -28,21 +43,52 @@ class DataProcessor:
         self.data_quality = {}
         self.sku_list = []
         self.category_list = []
+        self.date_format = None
+        self.load_report = {}
+        self.load_filters = {}
+        self.process_report = {}
+        self.dtype_report = {}
+        self.dtype_optimizer = DtypeOptimizer()
+        self.profiler = QualityProfiler()
+        self.fix_history = []
+        self.redo_history = []
+        self.data_version = 0
+        self.data_changes = []
+        self.delta_report = {}
+        self._tier_index = None
+        self._tier_key = None
+        self._shard_store = None
+        self._shard_key = None
+        self._shard_lock = threading.Lock()
+        
+        # held while processed data changes and while workers snapshot it
+        self.data_lock = threading.RLock()
+        self.database_options = {"table": None, "query": None, "aggregate": True}
         
     # ---------- FILE LOADING ----------
     
     def load_file(self, 
-                  file_path: str, 
+                  file_path: Union[str, List[str]], 
                   sheet_name: Optional[str] = None,
                   progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
         # load data file with appropriate reader
+        if DatabaseSource.is_database(file_path):
+            return self.load_database(file_path, table=sheet_name, progress_callback=progress_callback)
+        
+        if self.is_parquet_dataset(file_path):
+            return self.load_parquet_dataset(file_path, progress_callback)
+        
+        if self.is_multi_source(file_path):
+            return self.load_files(file_path, sheet_name, progress_callback)
+        
+        self.load_report = {}
         path = Path(file_path)
         
         if not path.exists():
             return False, "file not found"
         
         # check file size
-        size_mb = path.stat().st_size / (1024 * 1024)
+        size_mb = self._source_size_mb(path)
         if size_mb > config.MAX_FILE_SIZE_MB:
             return False, f"file too large: {size_mb:.0f}mb exceeds {config.MAX_FILE_SIZE_MB}mb limit"
         
@@ -51,8 +97,8 @@ class DataProcessor:
             if progress_callback:
                 progress_callback(10, "reading file")
             
-            # load based on extension
-            suffix = path.suffix.lower()
+            # load based on extension of the data inside any compression
+            suffix = CompressionUtils.data_suffix(path)
             
             if suffix == ".csv":
                 self.raw_data = self._load_csv(path, progress_callback)
@@ -67,6 +113,9 @@ class DataProcessor:
             if progress_callback:
                 progress_callback(80, "validating data")
             
+            # new source needs fresh date format detection
+            self.date_format = None
+            
             # basic validation
             if self.raw_data.empty:
                 return False, "file is empty"
@@ -79,8 +128,15 @@ class DataProcessor:
         except Exception as e:
             return False, f"error loading file: {str(e)}"
     
+    def _source_size_mb(self, path: Path) -> float:
+        # size used for limits with compressed files measured uncompressed
+        return CompressionUtils.estimate_uncompressed_size(path) / (1024 * 1024)
+    
     def _load_csv(self, path: Path, progress_callback: Optional[callable] = None) -> pd.DataFrame:
         # load csv with chunking for large files
+        if CompressionUtils.get_compression(path):
+            return self._load_compressed_csv(path, progress_callback)
+        
         size_mb = path.stat().st_size / (1024 * 1024)
         
         if size_mb > 100:
@@ -101,6 +157,29 @@ class DataProcessor:
                 progress_callback(50, "parsing csv")
             return pd.read_csv(path)
     
+    def _load_compressed_csv(self, path: Path, progress_callback: Optional[callable] = None) -> pd.DataFrame:
+        # stream compressed csv while a background thread decompresses
+        reader = DecompressingReader(path)
+        
+        try:
+            if progress_callback is None:
+                return pd.read_csv(reader)
+            
+            # chunks let progress follow compressed bytes consumed
+            chunks = []
+            chunk_size = config.PERFORMANCE["chunk_size"] * 100
+            
+            for i, chunk in enumerate(pd.read_csv(reader, chunksize=chunk_size)):
+                chunks.append(chunk)
+                pct = min(70, 10 + int(reader.progress * 60))
+                progress_callback(pct, f"reading chunk {i+1} ({reader.progress:.0%} of compressed file)")
+            
+            if not chunks:
+                return pd.DataFrame()
+            return pd.concat(chunks, ignore_index=True)
+        finally:
+            reader.close()
+    
     def _load_excel(self, 
                     path: Path, 
                     sheet_name: Optional[str] = None,
@@ -114,11 +193,182 @@ class DataProcessor:
         return pd.read_excel(path, engine="openpyxl")
     
     def _load_parquet(self, path: Path, progress_callback: Optional[callable] = None) -> pd.DataFrame:
-        # load parquet file
+        # load parquet file with load filters pushed down when set
+        if self.load_filters:
+            return self._read_parquet_dataset(path, progress_callback)
+        
         if progress_callback:
             progress_callback(50, "parsing parquet")
         return pd.read_parquet(path)
     
+    # ---------- MULTI FILE LOADING ----------
+    
+    def is_multi_source(self, source: Union[str, List[str]]) -> bool:
+        # check if source is a folder glob or list of files
+        if isinstance(source, (list, tuple)):
+            return True
+        if glob.has_magic(str(source)):
+            return True
+        return Path(source).is_dir()
+    
+    def resolve_sources(self, source: Union[str, List[str]]) -> List[Path]:
+        # expand folder glob or list into supported file paths
+        if isinstance(source, (list, tuple)):
+            paths = [Path(p) for p in source]
+        elif glob.has_magic(str(source)):
+            paths = [Path(p) for p in sorted(glob.glob(str(source)))]
+        elif Path(source).is_dir():
+            paths = sorted(p for p in Path(source).iterdir() if p.is_file())
+        else:
+            paths = [Path(source)]
+        
+        return [p for p in paths if CompressionUtils.data_suffix(p) in self.SUPPORTED_SUFFIXES]
+    
+    def load_files(self,
+                   source: Union[str, List[str]],
+                   sheet_name: Optional[str] = None,
+                   progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
+        # load several files concurrently into one frame
+        self.load_report = {}
+        paths = self.resolve_sources(source)
+        
+        if not paths:
+            return False, "no supported files found"
+        
+        missing = [p.name for p in paths if not p.exists()]
+        if missing:
+            return False, f"file not found: {missing[0]}"
+        
+        # size limit applies to the combined input
+        size_mb = sum(self._source_size_mb(p) for p in paths)
+        if size_mb > config.MAX_FILE_SIZE_MB:
+            return False, f"files too large: {size_mb:.0f}mb exceeds {config.MAX_FILE_SIZE_MB}mb limit"
+        
+        if progress_callback:
+            progress_callback(5, f"reading {len(paths)} files")
+        
+        parts: Dict[int, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+        workers = max(1, min(config.PERFORMANCE["background_threads"], len(paths)))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(self._read_part, path, sheet_name): i
+                    for i, path in enumerate(paths)
+                }
+                
+                for done, future in enumerate(as_completed(futures), start=1):
+                    i = futures[future]
+                    try:
+                        parts[i] = future.result()
+                    except Exception as e:
+                        errors[paths[i].name] = str(e)
+                    
+                    if progress_callback:
+                        pct = 5 + int(done / len(paths) * 65)
+                        try:
+                            progress_callback(pct, f"read {paths[i].name} ({done}/{len(paths)})")
+                        except InterruptedError:
+                            # drop files not yet started before leaving the pool
+                            for pending in futures:
+                                pending.cancel()
+                            raise
+            
+            if not parts:
+                first = next(iter(errors.items()))
+                return False, f"error loading file: {first[0]}: {first[1]}"
+            
+            if progress_callback:
+                progress_callback(75, "combining files")
+            
+            # keep file order stable regardless of completion order
+            ordered = [parts[i] for i in sorted(parts)]
+            names = [paths[i].name for i in sorted(parts)]
+            rows_per_file = {name: len(part) for name, part in zip(names, ordered)}
+            ordered, mismatches = self._align_parts(ordered, names)
+            
+            self.raw_data = pd.concat(ordered, ignore_index=True, copy=False)
+            del ordered, parts
+            self.date_format = None
+            
+            self.load_report = {
+                "files": names,
+                "rows_per_file": rows_per_file,
+                "schema_mismatches": mismatches,
+                "errors": errors
+            }
+            
+            if self.raw_data.empty:
+                return False, "file is empty"
+            
+            if progress_callback:
+                progress_callback(100, "complete")
+            
+            message = f"loaded {len(self.raw_data):,} rows from {len(names)} files"
+            if mismatches:
+                message += f" ({len(mismatches)} with schema differences)"
+            if errors:
+                message += f" ({len(errors)} failed)"
+            return True, message
+        
+        except InterruptedError:
+            raise
+        except Exception as e:
+            return False, f"error loading file: {str(e)}"
+    
+    def _read_part(self, path: Path, sheet_name: Optional[str] = None) -> pd.DataFrame:
+        # read one file of a multi file load
+        suffix = CompressionUtils.data_suffix(path)
+        
+        if suffix == ".csv":
+            df = self._load_csv(path)
+        elif suffix in [".xlsx", ".xls"]:
+            df = self._load_excel(path, sheet_name)
+        else:
+            df = self._load_parquet(path)
+        
+        df.columns = [str(c).strip() for c in df.columns]
+        return df
+    
+    def _align_parts(self, 
+                     parts: List[pd.DataFrame], 
+                     names: List[str]) -> Tuple[List[pd.DataFrame], Dict[str, Dict[str, List[str]]]]:
+        # enforce first file schema on every part
+        reference = list(parts[0].columns)
+        mismatches: Dict[str, Dict[str, List[str]]] = {}
+        
+        for name, part in zip(names, parts):
+            missing = [c for c in reference if c not in part.columns]
+            extra = [c for c in part.columns if c not in reference]
+            
+            if missing or extra:
+                mismatches[name] = {
+                    "missing_columns": missing,
+                    "extra_columns": extra
+                }
+        
+        # settle one dtype per column across parts
+        aligned = [part.reindex(columns=reference) if list(part.columns) != reference else part
+                   for part in parts]
+        
+        for col in reference:
+            dtypes = {part[col].dtype for part in aligned if part[col].notna().any()}
+            if len(dtypes) <= 1:
+                continue
+            
+            if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d)
+                   for d in dtypes):
+                target = np.result_type(*dtypes)
+            else:
+                target = object
+            
+            for i, part in enumerate(aligned):
+                if part[col].dtype != target:
+                    aligned[i][col] = part[col].astype(target)
+        
+        return aligned, mismatches
+    
     def get_excel_sheet_info(self, file_path: str) -> Dict[str, int]:
         # get sheet names and row counts for excel file
         path = Path(file_path)
@@ -154,10 +404,397 @@ class DataProcessor:
         sheet_info = self.get_excel_sheet_info(file_path)
         return len(sheet_info) > 1
     
+    # ---------- PARQUET DATASETS ----------
+    
+    def set_load_filters(self,
+                         date_range: Optional[Tuple[Any, Any]] = None,
+                         categories: Optional[List[str]] = None,
+                         skus: Optional[List[str]] = None,
+                         project_columns: bool = True) -> None:
+        # set filters pushed into the next parquet load
+        self.load_filters = {}
+        
+        if date_range is not None:
+            self.load_filters["date_range"] = tuple(date_range)
+        if categories:
+            self.load_filters["categories"] = list(categories)
+        if skus:
+            self.load_filters["skus"] = list(skus)
+        self.load_filters["project_columns"] = project_columns
+    
+    def clear_load_filters(self) -> None:
+        # remove load filters
+        self.load_filters = {}
+    
+    def is_parquet_dataset(self, source: Union[str, List[str]]) -> bool:
+        # check if source is a folder holding only parquet files
+        if isinstance(source, (list, tuple)) or glob.has_magic(str(source)):
+            return False
+        
+        root = Path(source)
+        if not root.is_dir():
+            return False
+        
+        files = [p for p in root.rglob("*") if p.is_file() and not p.name.startswith((".", "_"))]
+        return bool(files) and all(p.suffix.lower() == ".parquet" for p in files)
+    
+    def get_dataset_info(self,
+                         source: str,
+                         date_column: Optional[str] = None,
+                         preview_rows: int = 1000) -> Dict[str, Any]:
+        # read dataset schema row counts and date span from metadata
+        dataset = self._open_dataset(Path(source))
+        fragments = list(dataset.get_fragments())
+        
+        info = {
+            "columns": dataset.schema.names,
+            "partitions": self._partition_fields(dataset),
+            "files": len(fragments),
+            "row_groups": sum(f.num_row_groups for f in fragments),
+            "rows": sum(f.metadata.num_rows for f in fragments),
+            "date_min": None,
+            "date_max": None,
+            "preview": dataset.head(preview_rows).to_pandas()
+        }
+        
+        # row group statistics give the date span without reading data
+        if date_column in info["columns"] and self._is_temporal(dataset.schema.field(date_column).type):
+            mins, maxs = [], []
+            for fragment in fragments:
+                for rg in fragment.row_groups:
+                    stats = (rg.statistics or {}).get(date_column)
+                    if stats:
+                        mins.append(pd.Timestamp(stats["min"]))
+                        maxs.append(pd.Timestamp(stats["max"]))
+            if mins:
+                info["date_min"], info["date_max"] = min(mins), max(maxs)
+        
+        return info
+    
+    def load_parquet_dataset(self,
+                             source: str,
+                             progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
+        # load partitioned parquet folder reading only matching row groups
+        self.load_report = {}
+        
+        if not Path(source).exists():
+            return False, "file not found"
+        
+        try:
+            self.raw_data = self._read_parquet_dataset(Path(source), progress_callback)
+            self.date_format = None
+            
+            if self.raw_data.empty:
+                return False, "no rows match the load filters" if self.load_filters else "file is empty"
+            
+            if progress_callback:
+                progress_callback(100, "complete")
+            
+            report = self.load_report
+            return True, (
+                f"loaded {len(self.raw_data):,} rows "
+                f"({report['row_groups_read']} of {report['row_groups_total']} row groups)"
+            )
+        
+        except InterruptedError:
+            raise
+        except Exception as e:
+            return False, f"error loading dataset: {str(e)}"
+    
+    def _open_dataset(self, source: Path):
+        # open parquet file or folder with hive partitions
+        import pyarrow.dataset as ds
+        return ds.dataset(str(source), format="parquet", partitioning="hive")
+    
+    def _partition_fields(self, dataset) -> List[str]:
+        # get partition key names of dataset
+        partitioning = getattr(dataset, "partitioning", None)
+        if partitioning is None or partitioning.schema is None:
+            return []
+        return partitioning.schema.names
+    
+    def _read_parquet_dataset(self,
+                              source: Path,
+                              progress_callback: Optional[callable] = None) -> pd.DataFrame:
+        # read row groups matching load filters with mapped columns only
+        import pyarrow as pa
+        
+        if progress_callback:
+            progress_callback(10, "scanning dataset metadata")
+        
+        dataset = self._open_dataset(source)
+        schema = dataset.schema
+        expression = self._build_dataset_filter(schema, self._partition_fields(dataset))
+        columns = self._projected_columns(schema)
+        
+        # partition pruning then row group statistics pruning
+        total_groups = sum(f.num_row_groups for f in dataset.get_fragments())
+        fragments = list(dataset.get_fragments(filter=expression))
+        row_groups = []
+        for fragment in fragments:
+            if expression is None:
+                row_groups.extend(fragment.split_by_row_group(schema=schema))
+            else:
+                row_groups.extend(fragment.split_by_row_group(filter=expression, schema=schema))
+        
+        # size limit applies to what is actually read
+        size_mb = sum(
+            rg.total_byte_size for group in row_groups for rg in group.row_groups
+        ) / (1024 * 1024)
+        if size_mb > config.MAX_FILE_SIZE_MB:
+            raise ValueError(
+                f"selection too large: {size_mb:.0f}mb exceeds {config.MAX_FILE_SIZE_MB}mb limit"
+            )
+        
+        tables = []
+        for i, group in enumerate(row_groups):
+            tables.append(group.to_table(schema=schema, columns=columns, filter=expression))
+            if progress_callback:
+                progress_callback(
+                    10 + int((i + 1) / len(row_groups) * 60),
+                    f"reading row group {i+1} of {len(row_groups)}"
+                )
+        
+        self.load_report = {
+            "files": len(fragments),
+            "row_groups_total": total_groups,
+            "row_groups_read": len(row_groups),
+            "columns": columns or schema.names,
+            "filters": {k: v for k, v in self.load_filters.items() if k != "project_columns"}
+        }
+        
+        if tables:
+            df = pa.concat_tables(tables).to_pandas()
+        else:
+            df = schema.empty_table().select(columns or schema.names).to_pandas()
+        
+        # text dates cannot be compared inside parquet so filter after read
+        date_col = self.column_mapping.get("date")
+        if date_col in df.columns and not self._is_temporal(schema.field(date_col).type):
+            df = self._filter_read_dates(df, date_col)
+        
+        return df
+    
+    def _filter_read_dates(self, df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+        # apply load date range to parsed dates of rows already read
+        date_range = self.load_filters.get("date_range")
+        if not date_range:
+            return df
+        
+        dates, _ = DateUtils.parse_dates(df[date_col])
+        start, end = self._date_bounds(date_range)
+        return df[(dates >= start) & (dates <= end)].reset_index(drop=True)
+    
+    def _projected_columns(self, schema) -> Optional[List[str]]:
+        # mapped columns to read or none to read all
+        if not self.load_filters.get("project_columns", False):
+            return None
+        
+        mapped = [c for c in self.column_mapping.values() if c]
+        if not mapped or any(c not in schema.names for c in mapped):
+            return None
+        return list(dict.fromkeys(mapped))
+    
+    def _date_bounds(self, date_range: Tuple[Any, Any]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        # inclusive bounds where a plain end date covers the whole day
+        start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        if end == end.normalize():
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+        return start, end
+    
+    def _is_temporal(self, arrow_type) -> bool:
+        # check if arrow type holds dates or timestamps
+        import pyarrow as pa
+        return pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type)
+    
+    def _build_dataset_filter(self, schema, partitions: List[str]):
+        # turn load filters into a pyarrow dataset expression
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        filters = self.load_filters
+        expressions = []
+        
+        date_range = filters.get("date_range")
+        if date_range:
+            date_col = self._filter_column("date", schema)
+            date_type = schema.field(date_col).type
+            start, end = self._date_bounds(date_range)
+            
+            if self._is_temporal(date_type):
+                bounds = pa.array([start, end], type=pa.timestamp("ns")).cast(date_type, safe=False)
+                expressions.append(ds.field(date_col) >= bounds[0])
+                expressions.append(ds.field(date_col) <= bounds[1])
+            
+            # year partitions are pruned without opening files
+            if "year" in partitions and pa.types.is_integer(schema.field("year").type):
+                expressions.append(ds.field("year") >= start.year)
+                expressions.append(ds.field("year") <= end.year)
+        
+        for key, column_type in [("categories", "category"), ("skus", "sku")]:
+            values = filters.get(key)
+            if not values:
+                continue
+            col = self._filter_column(column_type, schema)
+            expressions.append(ds.field(col).isin(self._typed_values(values, schema.field(col).type)))
+        
+        if not expressions:
+            return None
+        
+        expression = expressions[0]
+        for e in expressions[1:]:
+            expression = expression & e
+        return expression
+    
+    def _filter_column(self, column_type: str, schema) -> str:
+        # get mapped column for a load filter
+        col = self.column_mapping.get(column_type)
+        if not col:
+            raise ValueError(f"map a {column_type} column to filter by {column_type}")
+        if col not in schema.names:
+            raise ValueError(f"{column_type} column not in dataset: {col}")
+        return col
+    
+    def _typed_values(self, values: List[Any], arrow_type):
+        # cast filter values to column type
+        import pyarrow as pa
+        
+        if pa.types.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        try:
+            return pa.array(values).cast(arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return pa.array([str(v) for v in values]).cast(arrow_type)
+    
+    # ---------- DATABASE SOURCES ----------
+    
+    def set_database_options(self,
+                             table: Optional[str] = None,
+                             query: Optional[str] = None,
+                             aggregate: bool = True) -> None:
+        # choose table or query read from the next database load
+        self.database_options = {"table": table, "query": query, "aggregate": aggregate}
+    
+    def get_database_tables(self, file_path: str) -> Dict[str, int]:
+        # get tables and row counts from database file
+        try:
+            with DatabaseSource(file_path) as source:
+                return source.list_tables()
+        except Exception:
+            return {}
+    
+    def get_database_info(self,
+                          file_path: str,
+                          table: Optional[str] = None,
+                          query: Optional[str] = None,
+                          date_column: Optional[str] = None,
+                          preview_rows: int = 1000) -> Dict[str, Any]:
+        # read preview and date span of table or query
+        with DatabaseSource(file_path) as source:
+            preview = source.preview(table, query, preview_rows)
+            info = {
+                "columns": list(preview.columns),
+                "rows": source.count_rows(table, query),
+                "date_min": None,
+                "date_max": None,
+                "preview": preview
+            }
+            
+            if date_column in info["columns"]:
+                date_min, date_max = source.value_span(date_column, table, query)
+                info["date_min"] = pd.to_datetime(date_min, errors="coerce")
+                info["date_max"] = pd.to_datetime(date_max, errors="coerce")
+        
+        return info
+    
+    def load_database(self,
+                      file_path: str,
+                      table: Optional[str] = None,
+                      query: Optional[str] = None,
+                      aggregate: Optional[bool] = None,
+                      progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
+        # load table or query with filters projection and rollup done in sql
+        self.load_report = {}
+        path = Path(file_path)
+        
+        if not path.exists():
+            return False, "file not found"
+        
+        options = self.database_options
+        table = table or options.get("table")
+        query = query or options.get("query")
+        aggregate = options.get("aggregate", True) if aggregate is None else aggregate
+        
+        try:
+            if progress_callback:
+                progress_callback(10, "preparing query")
+            
+            with DatabaseSource(path) as source:
+                if not table and not query:
+                    tables = source.list_tables()
+                    if len(tables) != 1:
+                        return False, "choose a table or enter a query"
+                    table = next(iter(tables))
+                
+                # dates stored as integers or non iso text are filtered after fetch
+                filters = self.load_filters
+                date_col = self.column_mapping.get("date")
+                filter_after = bool(
+                    filters.get("date_range") and date_col
+                    and date_col in source.get_columns(table, query)
+                    and not source.is_date_comparable(date_col, table, query)
+                )
+                if filter_after:
+                    filters = {k: v for k, v in filters.items() if k != "date_range"}
+                
+                sql, params, aggregated = source.build_query(
+                    self.column_mapping, table, query, filters, aggregate
+                )
+                
+                def on_batch(batches: int, rows: int) -> None:
+                    if progress_callback:
+                        progress_callback(min(70, 10 + batches * 5), f"fetched {rows:,} rows")
+                
+                table_data = source.read_table(
+                    sql, params,
+                    batch_size=config.PERFORMANCE["chunk_size"] * 100,
+                    progress_callback=on_batch
+                )
+                engine = source.engine
+            
+            self.raw_data = table_data.to_pandas()
+            self.date_format = None
+            if filter_after:
+                self.raw_data = self._filter_read_dates(self.raw_data, date_col)
+            
+            self.load_report = {
+                "engine": engine,
+                "source": table or "query",
+                "sql": sql,
+                "rows": len(self.raw_data),
+                "aggregated": aggregated,
+                "dates_filtered_after_fetch": filter_after
+            }
+            
+            if self.raw_data.empty:
+                return False, "no rows match the load filters" if self.load_filters else "table is empty"
+            
+            if progress_callback:
+                progress_callback(100, "complete")
+            
+            return True, f"loaded {len(self.raw_data):,} rows from {table or 'query'}"
+        
+        except InterruptedError:
+            raise
+        except Exception as e:
+            return False, f"error loading database: {str(e)}"
+    
     # ---------- COLUMN MAPPING ----------
     
     def set_column_mapping(self, mapping: Dict[str, str]) -> None:
         # set column mapping from detection or user input
+        if mapping.get("date") != self.column_mapping.get("date"):
+            self.date_format = None
         self.column_mapping = mapping.copy()
     
     def get_mapped_column(self, column_type: str) -> Optional[str]:
@@ -166,9 +803,12 @@ class DataProcessor:
     
     # ---------- DATA PROCESSING ----------
     
-    def process_data(self, progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
-        # process raw data using column mapping
-        if self.raw_data is None:
+    def process_data(self,
+                     progress_callback: Optional[callable] = None,
+                     release_raw: bool = False) -> Tuple[bool, str]:
+        # process raw data using column mapping with one row gather
+        source = self.raw_data if self.raw_data is not None else self.processed_data
+        if source is None:
             return False, "no data loaded"
         
         if not self.column_mapping:
@@ -178,60 +818,43 @@ class DataProcessor:
             if progress_callback:
                 progress_callback(10, "starting processing")
             
-            df = self.raw_data.copy()
-            
-            # date column
-            date_col = self.column_mapping.get("date")
-            if date_col:
-                if progress_callback:
-                    progress_callback(20, "processing dates")
-                df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-                df = df.dropna(subset=[date_col])
-                df = df.sort_values(date_col)
-            
-            # quantity column
-            qty_col = self.column_mapping.get("quantity")
-            if qty_col:
-                if progress_callback:
-                    progress_callback(40, "processing quantities")
-                df[qty_col] = pd.to_numeric(df[qty_col], errors="coerce")
+            # measured allocations on top of the input which stays resident unless released
+            input_bytes = self._frame_bytes(source)
+            with traced_peak() as memory:
+                df, owned = self._gather_processed(source, progress_callback, release_raw)
+                del source
+                
+                self.dtype_report = {}
+                if config.PERFORMANCE.get("optimize_dtypes", True):
+                    if progress_callback:
+                        progress_callback(92, "optimizing column types")
+                    self.dtype_report = self.dtype_optimizer.optimize(df)
             
-            # sku column
             sku_col = self.column_mapping.get("sku")
-            if sku_col:
-                if progress_callback:
-                    progress_callback(60, "processing items")
-                df[sku_col] = df[sku_col].astype(str).str.strip()
-                self.sku_list = df[sku_col].unique().tolist()
-            
-            # category column
             cat_col = self.column_mapping.get("category")
-            if cat_col:
-                if progress_callback:
-                    progress_callback(70, "processing categories")
-                df[cat_col] = df[cat_col].astype(str).str.strip()
-                self.category_list = df[cat_col].unique().tolist()
-            elif sku_col:
-                # auto category from sku prefix
-                df["auto_category"] = df[sku_col].str[:3]
-                self.column_mapping["category"] = "auto_category"
-                self.category_list = df["auto_category"].unique().tolist()
-            
-            # price column
-            price_col = self.column_mapping.get("price")
-            if price_col:
-                if progress_callback:
-                    progress_callback(80, "processing prices")
-                df[price_col] = pd.to_numeric(df[price_col], errors="coerce")
             
-            # promo column
-            promo_col = self.column_mapping.get("promo")
-            if promo_col:
-                if progress_callback:
-                    progress_callback(90, "processing promotions")
-                df[promo_col] = df[promo_col].fillna(0).astype(int)
+            with self.data_lock:
+                self.processed_data = df
+                self.clear_fix_history()
+                self._record_change("process")
+            self.sku_list = self._labels(df, sku_col)
+            if cat_col:
+                self.category_list = self._labels(df, cat_col)
+            gc.collect()
             
-            self.processed_data = df
+            # released raw columns free during the stage so this is an upper bound then
+            data_bytes = self._frame_bytes(df)
+            peak_bytes = input_bytes + memory["peak_bytes"]
+            self.process_report = {
+                "rows": len(df),
+                "data_mb": data_bytes / (1024 * 1024),
+                "input_mb": input_bytes / (1024 * 1024),
+                "stage_peak_mb": memory["peak_bytes"] / (1024 * 1024),
+                "peak_mb": peak_bytes / (1024 * 1024),
+                "peak_ratio": peak_bytes / max(1, data_bytes),
+                "saved_mb": DtypeOptimizer.total_saved(self.dtype_report) / (1024 * 1024),
+                "raw_released": owned
+            }
             
             if progress_callback:
                 progress_callback(100, "complete")
@@ -241,91 +864,391 @@ class DataProcessor:
         except Exception as e:
             return False, f"error processing data: {str(e)}"
     
-    # ---------- DATA QUALITY ----------
-    
-    def calculate_quality(self, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
-        # calculate data quality metrics
-        if self.processed_data is None:
-            return {"overall_score": 0, "issues": ["no data processed"]}
+    def _gather_processed(self,
+                          source: pd.DataFrame,
+                          progress_callback: Optional[callable],
+                          release_raw: bool) -> Tuple[pd.DataFrame, bool]:
+        # convert keys and gather every column once in sku then date order
+        date_col = self.column_mapping.get("date")
+        qty_col = self.column_mapping.get("quantity")
+        sku_col = self.column_mapping.get("sku")
+        cat_col = self.column_mapping.get("category")
+        price_col = self.column_mapping.get("price")
+        promo_col = self.column_mapping.get("promo")
         
-        df = self.processed_data
-        quality = {
-            "overall_score": 100,
-            "metrics": {},
-            "issues": [],
-            "recommendations": []
-        }
+        # keys for row order and conversions that can fail run first
+        converted = {}
         
-        if progress_callback:
-            progress_callback(20, "checking missing values")
+        if date_col:
+            if progress_callback:
+                progress_callback(20, "processing dates")
+            converted[date_col], self.date_format = DateUtils.parse_dates(
+                source[date_col], self.date_format
+            )
         
-        # missing values
-        missing_pct = (df.isnull().sum().sum() / df.size) * 100
-        quality["metrics"]["missing_data"] = {
-            "value": missing_pct,
-            "status": "good" if missing_pct < 5 else "warning" if missing_pct < 15 else "critical"
-        }
-        if missing_pct > 5:
-            quality["issues"].append(f"{missing_pct:.1f}% missing values detected")
-            quality["recommendations"].append("fill missing values with forward fill or interpolation")
-            quality["overall_score"] -= min(20, missing_pct)
+        if sku_col:
+            if progress_callback:
+                progress_callback(30, "processing items")
+            converted[sku_col] = pd.Series(encode_labels(source[sku_col]), index=source.index)
+        
+        if promo_col:
+            converted[promo_col] = source[promo_col].fillna(0).astype(int)
         
+        # one row order drops missing dates and sorts by sku then date
         if progress_callback:
-            progress_callback(40, "checking duplicates")
+            progress_callback(40, "sorting rows")
+        order = self._row_order(converted.get(date_col), converted.get(sku_col), len(source))
         
-        # duplicates
-        sku_col = self.column_mapping.get("sku")
-        date_col = self.column_mapping.get("date")
-        if sku_col and date_col:
-            dup_count = df.duplicated(subset=[sku_col, date_col]).sum()
-            dup_pct = (dup_count / len(df)) * 100
-            quality["metrics"]["duplicates"] = {
-                "value": dup_pct,
-                "status": "good" if dup_pct == 0 else "warning" if dup_pct < 5 else "critical"
-            }
-            if dup_count > 0:
-                quality["issues"].append(f"{dup_count:,} duplicate entries found")
-                quality["recommendations"].append("aggregate duplicates by sum or average")
-                quality["overall_score"] -= min(15, dup_pct * 2)
+        # raw columns can be handed over one at a time once released
+        owned = release_raw and source is self.raw_data
+        if owned:
+            self.raw_data = None
+        
+        # remaining conversions run on gathered rows only
+        post_convert = {}
+        if qty_col:
+            post_convert[qty_col] = lambda s: pd.to_numeric(s, errors="coerce")
+        if price_col:
+            post_convert[price_col] = lambda s: pd.to_numeric(s, errors="coerce")
+        if cat_col and cat_col in source.columns:
+            post_convert[cat_col] = lambda s: pd.Series(encode_labels(s), index=s.index)
         
         if progress_callback:
-            progress_callback(60, "checking negative values")
+            progress_callback(50, "building processed table")
+        index = source.index.take(order)
+        columns = list(source.columns) + [c for c in converted if c not in source.columns]
+        gathered = {}
+        
+        for i, col in enumerate(columns):
+            is_converted = col in converted
+            if is_converted:
+                values = converted.pop(col)
+            elif owned:
+                values = source.pop(col)
+            else:
+                values = source[col]
+            
+            taken = pd.Series(values.array.take(order), index=index, name=col)
+            if col in post_convert and not is_converted:
+                taken = post_convert[col](taken)
+            gathered[col] = taken.array
+            del values, taken
+            
+            if progress_callback:
+                progress_callback(50 + int((i + 1) / len(columns) * 40), f"building column {col}")
+        
+        # auto category from sku prefix
+        if sku_col and not (cat_col and cat_col in gathered):
+            cat_col = "auto_category"
+            gathered[cat_col] = prefix_labels(gathered[sku_col])
+            self.column_mapping["category"] = cat_col
+        
+        # labels of dropped rows leave the categories
+        for col in [sku_col, cat_col]:
+            if col and isinstance(gathered.get(col), pd.Categorical):
+                gathered[col] = drop_unused_labels(gathered[col])
+        
+        df = pd.DataFrame(gathered, index=index, copy=False)
+        del gathered, source
+        return df, owned
+    
+    def _row_order(self,
+                   dates: Optional[pd.Series],
+                   skus: Optional[pd.Series],
+                   n_rows: int) -> np.ndarray:
+        # positions of kept rows in sku then date order
+        if dates is not None:
+            date_values = dates.to_numpy()
+            positions = np.flatnonzero(~pd.isna(date_values))
+        else:
+            positions = np.arange(n_rows)
+        
+        keys = []
+        if dates is not None:
+            keys.append(date_values[positions].view("i8"))
+        if skus is not None:
+            keys.append(label_codes(skus)[positions])
+        
+        # lexsort uses the last key as primary and is stable
+        if keys:
+            positions = positions[np.lexsort(keys)]
+        return positions
+    
+    def _labels(self, df: pd.DataFrame, col: Optional[str]) -> List[str]:
+        # sorted labels of an identifier column
+        if not col or col not in df.columns:
+            return []
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            return df[col].cat.categories.tolist()
+        return df[col].unique().tolist()
+    
+    def _frame_bytes(self, df: pd.DataFrame) -> int:
+        # array bytes of frame without walking python objects
+        return int(df.memory_usage(index=True, deep=False).sum())
+    
+    # ---------- DELTA INGESTION ----------
+    
+    def validate_delta(self, delta: pd.DataFrame) -> Tuple[bool, str]:
+        # check new rows against the current mapping
+        if self.processed_data is None:
+            return False, "no processed data to append to"
+        if delta is None or delta.empty:
+            return False, "new data has no rows"
+        
+        # auto category is derived so it does not need to be in the file
+        required = [c for c in self.column_mapping.values() if c and c != "auto_category"]
+        missing = [c for c in required if c not in delta.columns]
+        if missing:
+            return False, f"new data is missing mapped columns: {', '.join(missing)}"
         
-        # negative values
         qty_col = self.column_mapping.get("quantity")
         if qty_col:
-            neg_count = (df[qty_col] < 0).sum()
-            neg_pct = (neg_count / len(df)) * 100
-            quality["metrics"]["negative_values"] = {
-                "value": neg_pct,
-                "status": "good" if neg_pct == 0 else "warning" if neg_pct < 2 else "critical"
+            quantities = delta[qty_col]
+            if quantities.notna().any() and pd.to_numeric(quantities, errors="coerce").isna().all():
+                return False, f"quantity column '{qty_col}' has no numeric values"
+        
+        return True, "new data matches mapping"
+    
+    def append_data(self,
+                    source: Union[str, pd.DataFrame],
+                    progress_callback: Optional[callable] = None,
+                    sheet_name: Optional[str] = None,
+                    replace_existing: bool = True) -> Tuple[bool, str]:
+        # merge new periods into processed data without reprocessing history
+        if self.processed_data is None:
+            return False, "no processed data to append to"
+        
+        try:
+            if progress_callback:
+                progress_callback(10, "reading new data")
+            
+            if isinstance(source, pd.DataFrame):
+                delta = source
+            else:
+                delta = self._read_part(Path(source), sheet_name)
+            
+            valid, message = self.validate_delta(delta)
+            if not valid:
+                return False, message
+            
+            if progress_callback:
+                progress_callback(30, "processing new data")
+            staged = self._stage_delta(delta)
+            rows_invalid = len(delta) - len(staged)
+            if staged.empty:
+                return False, "no rows with valid dates in new data"
+            
+            if progress_callback:
+                progress_callback(60, "merging with history")
+            history = self.processed_data
+            merged, overlap = self._merge_delta(history, staged, replace_existing)
+            if config.PERFORMANCE.get("optimize_dtypes", True):
+                # columns widened by the merge shrink again while the report keeps the processing run
+                self.dtype_optimizer.optimize(merged)
+            
+            sku_col = self.column_mapping.get("sku")
+            date_col = self.column_mapping.get("date")
+            cat_col = self.column_mapping.get("category")
+            
+            # new items join the sorted item index
+            delta_skus = staged[sku_col].unique().tolist() if sku_col else []
+            known = set(self.sku_list)
+            new_skus = [s for s in delta_skus if s not in known]
+            if new_skus:
+                self.sku_list = sorted(self.sku_list + new_skus)
+            if cat_col and cat_col in staged.columns:
+                known_categories = set(self.category_list)
+                self.category_list += [c for c in staged[cat_col].unique() if c not in known_categories]
+            
+            start = staged[date_col].min() if date_col else None
+            end = staged[date_col].max() if date_col else None
+            with self.data_lock:
+                self.processed_data = merged
+                
+                # fix log positions refer to the frame before the merge
+                self.clear_fix_history()
+                self._record_change("append", delta_skus, start, end)
+            
+            self.delta_report = {
+                "rows_read": len(delta),
+                "rows_added": len(merged) - len(history),
+                "rows_replaced": overlap if replace_existing else 0,
+                "rows_skipped": 0 if replace_existing else overlap,
+                "rows_invalid": rows_invalid,
+                "affected_skus": delta_skus,
+                "new_skus": new_skus,
+                "start": start,
+                "end": end,
+                "version": self.data_version
             }
-            if neg_count > 0:
-                quality["issues"].append(f"{neg_count:,} negative quantity values")
-                quality["recommendations"].append("review negative values - may indicate returns")
-                quality["overall_score"] -= min(10, neg_pct * 3)
+            
+            if progress_callback:
+                progress_callback(100, "complete")
+            
+            period = f" from {start:%Y-%m-%d} to {end:%Y-%m-%d}" if start is not None else ""
+            return True, f"appended {len(staged):,} rows for {len(delta_skus):,} items{period}"
+        
+        except Exception as e:
+            return False, f"error appending data: {str(e)}"
+    
+    def _stage_delta(self, delta: pd.DataFrame) -> pd.DataFrame:
+        # convert new rows exactly like history using a staging processor
+        staging = DataProcessor()
+        staging.raw_data = delta
+        staging.column_mapping = self.column_mapping.copy()
+        staging.date_format = self.date_format
+        
+        success, message = staging.process_data(release_raw=True)
+        if not success:
+            raise ValueError(message)
+        return staging.processed_data
+    
+    def _merge_delta(self,
+                     history: pd.DataFrame,
+                     staged: pd.DataFrame,
+                     replace_existing: bool) -> Tuple[pd.DataFrame, int]:
+        # insert sorted new rows into sorted history and settle overlapping item dates
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        n_history = len(history)
+        
+        staged = staged.reindex(columns=history.columns)
+        if pd.api.types.is_integer_dtype(history.index) and n_history:
+            start = int(history.index.max()) + 1
+        else:
+            start = n_history
+        staged.index = pd.RangeIndex(start, start + len(staged))
+        
+        # one integer key per row ordered by sku then date
+        key_parts = []
+        for col in [sku_col, date_col]:
+            if col:
+                values = pd.Series(combine_labels(history[col].array, staged[col].array))
+                key_parts.append(label_codes(values).astype(np.int64))
+        key = key_parts[0]
+        for part in key_parts[1:]:
+            key = key * (int(part.max()) + 1) + part
+        
+        history_key, delta_key = key[:n_history], key[n_history:]
+        delta_order = np.argsort(delta_key, kind="stable")
+        delta_key = delta_key[delta_order]
+        
+        if n_history and np.any(np.diff(history_key) < 0):
+            # history no longer sorted so order everything by key
+            history_order = np.argsort(history_key, kind="stable")
+            history_key = history_key[history_order]
+        else:
+            history_order = np.arange(n_history)
+        
+        # history rows sharing an item date with new rows
+        left = np.searchsorted(history_key, delta_key, side="left")
+        right = np.searchsorted(history_key, delta_key, side="right")
+        counts = right - left
+        overlap = np.repeat(left, counts) + (
+            np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        )
+        overlap = np.unique(overlap)
+        
+        keep_history = np.ones(n_history, dtype=bool)
+        keep_delta = np.ones(len(delta_key), dtype=bool)
+        if replace_existing:
+            keep_history[overlap] = False
+        else:
+            keep_delta = counts == 0
+        
+        history_order = history_order[keep_history]
+        history_key = history_key[keep_history]
+        delta_order = delta_order[keep_delta]
+        delta_key = delta_key[keep_delta]
+        
+        # new rows go after history rows with equal or smaller keys
+        slots = np.searchsorted(history_key, delta_key, side="right") + np.arange(len(delta_key))
+        is_delta = np.zeros(len(history_key) + len(delta_key), dtype=bool)
+        is_delta[slots] = True
+        order = np.empty(len(is_delta), dtype=np.int64)
+        order[~is_delta] = history_order
+        order[is_delta] = n_history + delta_order
+        
+        # gather column by column so only one merged column is built at a time
+        index = history.index.append(staged.index).take(order)
+        merged = {
+            col: combine_labels(history[col].array, staged[col].array).take(order)
+            for col in history.columns
+        }
+        overlap_rows = len(overlap) if replace_existing else int((~keep_delta).sum())
+        return pd.DataFrame(merged, index=index, copy=False), overlap_rows
+    
+    # ---------- CHANGE TRACKING ----------
+    
+    def _record_change(self,
+                       kind: str,
+                       skus: Optional[List[str]] = None,
+                       start: Any = None,
+                       end: Any = None) -> None:
+        # bump data version and note which items and dates changed
+        self.data_version += 1
+        self.data_changes.append({
+            "version": self.data_version,
+            "kind": kind,
+            "skus": None if skus is None else set(skus),
+            "start": start,
+            "end": end
+        })
+        del self.data_changes[:-config.PERFORMANCE["max_tracked_changes"]]
+    
+    def changes_since(self, version: int) -> Dict[str, Any]:
+        # items and period changed after a data version
+        changes = {"full": False, "skus": set(), "start": None, "end": None, "version": self.data_version}
+        entries = [c for c in self.data_changes if c["version"] > version]
+        
+        # older versions than the journal keeps need a full refresh
+        if self.data_changes and self.data_changes[0]["version"] > version + 1:
+            changes["full"] = True
+        
+        for entry in entries:
+            if entry["skus"] is None:
+                changes["full"] = True
+                continue
+            changes["skus"] |= entry["skus"]
+            for bound, pick in [("start", min), ("end", max)]:
+                if entry[bound] is not None:
+                    current = changes[bound]
+                    changes[bound] = entry[bound] if current is None else pick(current, entry[bound])
+        
+        return changes
+    
+    def _rows_span(self, df: pd.DataFrame, positions: np.ndarray) -> Tuple[List[str], Any, Any]:
+        # items and dates of rows at positions
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        if not len(positions):
+            return [], None, None
+        
+        rows = df.iloc[positions]
+        skus = rows[sku_col].dropna().unique().tolist() if sku_col in df.columns else []
+        if date_col in df.columns:
+            return skus, rows[date_col].min(), rows[date_col].max()
+        return skus, None, None
+    
+    # ---------- DATA QUALITY ----------
+    
+    def calculate_quality(self, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
+        # calculate data quality metrics from the shared quality profile
+        if self.processed_data is None:
+            return {"overall_score": 0, "issues": ["no data processed"]}
+        
+        df = self.processed_data
+        
+        # fixes keep the profile current so only new data is profiled
+        if not self.profiler.is_current(df, self.column_mapping):
+            if progress_callback:
+                progress_callback(20, "profiling data")
+            self.profiler.profile(df, self.column_mapping)
         
         if progress_callback:
-            progress_callback(80, "checking data coverage")
-        
-        # data coverage
-        if date_col and sku_col:
-            date_range = (df[date_col].max() - df[date_col].min()).days
-            points_per_sku = len(df) / len(self.sku_list) if self.sku_list else 0
-            quality["metrics"]["data_coverage"] = {
-                "date_range_days": date_range,
-                "avg_points_per_item": points_per_sku,
-                "status": "good" if points_per_sku >= 12 else "warning" if points_per_sku >= 7 else "critical"
-            }
-            if points_per_sku < config.DATA_QUALITY["min_data_points"]:
-                quality["issues"].append(
-                    f"low data points per item: {points_per_sku:.1f} "
-                    f"(minimum recommended: {config.DATA_QUALITY['min_data_points']})"
-                )
-                quality["recommendations"].append("consider weekly or monthly aggregation")
-                quality["overall_score"] -= 10
+            progress_callback(80, "scoring data quality")
         
-        quality["overall_score"] = max(0, min(100, quality["overall_score"]))
+        quality = self.profiler.quality(len(self.sku_list))
         self.data_quality = quality
         
         if progress_callback:
@@ -338,153 +1261,404 @@ class DataProcessor:
     def apply_fix(self, fix_type: str,
                   progress_callback: Optional[callable] = None,
                   **kwargs) -> Tuple[bool, str]:
-        # apply data fix based on type
+        # apply data fix in place and record it for undo
         if self.processed_data is None:
             return False, "no data to fix"
         
+        fixes = {
+            "fill_missing": (self._fix_missing, "filling missing values"),
+            "remove_duplicates": (self._fix_duplicates, "removing duplicates"),
+            "fix_negatives": (self._fix_negatives, "fixing negative values"),
+            "remove_outliers": (self._fix_outliers, "handling outliers"),
+            "review_actions": (self._fix_review, "applying review actions")
+        }
+        if fix_type not in fixes:
+            return False, f"unknown fix type: {fix_type}"
+        
         try:
-            df = self.processed_data
+            build_change, status = fixes[fix_type]
+            if progress_callback:
+                progress_callback(50, status)
             
-            if fix_type == "fill_missing":
-                # handle different missing value strategies
-                if progress_callback:
-                    progress_callback(50, "filling missing values")
-                method = kwargs.get("method", "ffill")
-                
-                if method in ("ffill", "bfill"):
-                    df = df.fillna(method=method)
-                elif method == "zero":
-                    df = df.fillna(0)
-                elif method == "mean":
-                    num_cols = df.select_dtypes(include=["number"]).columns
-                    if len(num_cols) > 0:
-                        df[num_cols] = df[num_cols].fillna(df[num_cols].mean())
-                    else:
-                        df = df.fillna(0)
-                else:
-                    df = df.fillna(method="ffill")
-                
-                self.processed_data = df
-                return True, f"filled missing values using {method} method"
+            success, message, change = build_change(self.processed_data, **kwargs)
+            if not success:
+                return False, message
             
-            elif fix_type == "remove_duplicates":
-                # aggregate duplicates with chosen method
-                if progress_callback:
-                    progress_callback(50, "removing duplicates")
-                sku_col = self.column_mapping.get("sku")
-                date_col = self.column_mapping.get("date")
-                qty_col = self.column_mapping.get("quantity")
-                
-                method = kwargs.get("method", "sum")
-                
-                if sku_col and date_col and qty_col:
-                    if method == "first":
-                        df = df.drop_duplicates(subset=[sku_col, date_col], keep="first")
-                    else:
-                        agg_dict = {qty_col: method if method in ("sum", "mean") else "sum"}
-                        for col in df.columns:
-                            if col not in [sku_col, date_col, qty_col]:
-                                agg_dict[col] = "first"
-                        df = df.groupby([sku_col, date_col]).agg(agg_dict).reset_index()
-                    
-                    self.processed_data = df
-                    return True, f"handled duplicate entries using {method} method"
-                return False, "required columns not mapped"
+            change["fix_type"] = fix_type
+            change["message"] = message
+            self._apply_change(change)
             
-            elif fix_type == "fix_negatives":
-                # handle negative quantities
-                if progress_callback:
-                    progress_callback(50, "fixing negative values")
-                qty_col = self.column_mapping.get("quantity")
-                method = kwargs.get("method", "zero")
-                
-                if qty_col:
-                    if method == "zero":
-                        df.loc[df[qty_col] < 0, qty_col] = 0
-                    elif method == "absolute":
-                        df[qty_col] = df[qty_col].abs()
-                    self.processed_data = df
-                    return True, f"fixed negative values using {method} method"
-                return False, "quantity column not mapped"
-            
-            elif fix_type == "remove_outliers":
-                # handle outliers based on z score
-                if progress_callback:
-                    progress_callback(50, "handling outliers")
-                qty_col = self.column_mapping.get("quantity")
-                threshold = kwargs.get("threshold", 3.0)
-                method = kwargs.get("method", "remove")
-                
-                if qty_col:
-                    mean = df[qty_col].mean()
-                    std = df[qty_col].std()
-                    if std == 0 or np.isnan(std):
-                        return False, "cannot detect outliers due to zero variance"
-                    
-                    lower = mean - threshold * std
-                    upper = mean + threshold * std
-                    
-                    mask = (df[qty_col] < lower) | (df[qty_col] > upper)
-                    outlier_count = int(mask.sum())
-                    
-                    if method == "cap":
-                        df.loc[df[qty_col] < lower, qty_col] = lower
-                        df.loc[df[qty_col] > upper, qty_col] = upper
-                    else:
-                        df = df[~mask]
-                    
-                    self.processed_data = df
-                    return True, f"processed {outlier_count:,} outliers using {method} method"
-                return False, "quantity column not mapped"
+            self.fix_history.append(change)
+            del self.fix_history[:-config.DATA_QUALITY["max_undo_steps"]]
+            self.redo_history = []
             
-            else:
-                return False, f"unknown fix type: {fix_type}"
+            return True, message
                 
         except Exception as e:
             return False, f"error applying fix: {str(e)}"
     
-    # ---------- SKU CLASSIFICATION ----------
+    def _new_change(self) -> Dict[str, Any]:
+        # empty change log entry
+        return {"values": {}, "removed": np.array([], dtype=np.int64), "removed_rows": None}
     
-    def classify_skus(self, progress_callback: Optional[callable] = None) -> Dict[str, List[str]]:
-        # classify skus into abc tiers
-        if self.processed_data is None:
-            return {"A": [], "B": [], "C": []}
+    def _flagged_positions(self, df: pd.DataFrame, name: str, fallback: callable) -> np.ndarray:
+        # row positions from current profile or computed mask
+        if self.profiler.is_current(df, self.column_mapping):
+            return self.profiler.get_positions(name)
+        return np.flatnonzero(np.asarray(fallback(), dtype=bool))
+    
+    def _fix_missing(self, df: pd.DataFrame, method: str = "ffill", **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        # fill missing cells within each item or drop incomplete rows
+        change = self._new_change()
+        sku_col = self.column_mapping.get("sku")
+        
+        if method == "remove":
+            # drop rows missing any mapped column
+            mapped = [c for c in self.column_mapping.values() if c and c in df.columns]
+            change["removed"] = self._flagged_positions(
+                df, "missing", lambda: df[mapped].isna().any(axis=1)
+            )
+            return True, f"removed {len(change['removed']):,} rows with missing values", change
+        
+        fill_cols = [c for c in df.columns if c != sku_col and df[c].hasnans]
+        if method == "mean":
+            # averages only apply to numeric columns
+            fill_cols = [c for c in fill_cols if pd.api.types.is_numeric_dtype(df[c])]
+        if not fill_cols:
+            return True, "no missing values to fill", change
+        
+        # groupwise fills so values never leak between items
+        grouped = df.groupby(sku_col, sort=False, observed=True)[fill_cols] if sku_col in df.columns else None
+        
+        if method == "zero":
+            filled = pd.DataFrame(0, index=df.index, columns=fill_cols)
+        elif method == "mean":
+            # items without any values fall back to the overall average
+            filled = grouped.transform("mean")[fill_cols] if grouped is not None else df[fill_cols]
+            filled = filled.fillna(df[fill_cols].mean())
+        else:
+            method = method if method in ("ffill", "bfill") else "ffill"
+            if grouped is not None:
+                filled = grouped.ffill() if method == "ffill" else grouped.bfill()
+            else:
+                filled = df[fill_cols].ffill() if method == "ffill" else df[fill_cols].bfill()
         
+        n_filled = 0
+        for col in fill_cols:
+            new = filled[col].to_numpy()
+            positions = np.flatnonzero(df[col].isna().to_numpy() & ~pd.isna(new))
+            if len(positions):
+                change["values"][col] = (positions, df[col].to_numpy()[positions], new[positions])
+                n_filled += len(positions)
+        
+        return True, f"filled {n_filled:,} missing values using {method} method", change
+    
+    def _fix_duplicates(self, df: pd.DataFrame, method: str = "sum", **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        # collapse rows sharing item and date into their first row
         sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
         qty_col = self.column_mapping.get("quantity")
         
-        if not sku_col or not qty_col:
-            return {"A": [], "B": [], "C": []}
+        if not (sku_col and date_col and qty_col):
+            return False, "required columns not mapped", None
         
-        if progress_callback:
-            progress_callback(30, "calculating volumes")
+        change = self._new_change()
+        keys = [sku_col, date_col]
         
-        sku_volume = self.processed_data.groupby(sku_col)[qty_col].sum().sort_values(ascending=False)
+        # only rows inside duplicate groups are aggregated
+        positions = self._flagged_positions(
+            df, "duplicates", lambda: df.duplicated(subset=keys, keep=False)
+        )
+        rows = df.iloc[positions]
+        first = ~rows.duplicated(subset=keys, keep="first").to_numpy()
         
-        if progress_callback:
-            progress_callback(60, "classifying items")
+        if method != "first":
+            agg = "mean" if method == "mean" else "sum"
+            totals = rows.groupby(keys, sort=False, observed=True)[qty_col].transform(agg).to_numpy()
+            change["values"][qty_col] = (
+                positions[first], rows[qty_col].to_numpy()[first], totals[first]
+            )
+        change["removed"] = positions[~first]
         
-        total_volume = sku_volume.sum()
-        cumulative_pct = (sku_volume.cumsum() / total_volume * 100).values
+        return True, f"handled {len(change['removed']):,} duplicate entries using {method} method", change
+    
+    def _fix_negatives(self, df: pd.DataFrame, method: str = "zero", **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        # set negative quantities to zero or their absolute value
+        qty_col = self.column_mapping.get("quantity")
+        if not qty_col:
+            return False, "quantity column not mapped", None
         
-        a_threshold = config.CLUSTERING["volume_percentiles"]["A"]
-        b_threshold = config.CLUSTERING["volume_percentiles"]["B"]
+        change = self._new_change()
+        positions = self._flagged_positions(df, "negative", lambda: df[qty_col] < 0)
+        old = df[qty_col].to_numpy()[positions]
+        change["values"][qty_col] = (positions, old, np.zeros_like(old) if method == "zero" else -old)
         
-        classification = {"A": [], "B": [], "C": []}
+        return True, f"fixed {len(positions):,} negative values using {method} method", change
+    
+    def _fix_outliers(self,
+                      df: pd.DataFrame,
+                      method: str = "remove",
+                      threshold: float = 3.0,
+                      **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        # remove or cap quantities beyond threshold standard deviations of their item
+        qty_col = self.column_mapping.get("quantity")
+        sku_col = self.column_mapping.get("sku")
+        if not qty_col:
+            return False, "quantity column not mapped", None
         
-        for i, (sku, _) in enumerate(sku_volume.items()):
-            if cumulative_pct[i] <= a_threshold:
-                classification["A"].append(sku)
-            elif cumulative_pct[i] <= a_threshold + b_threshold:
-                classification["B"].append(sku)
-            else:
-                classification["C"].append(sku)
+        qty = pd.to_numeric(df[qty_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        mean, std = item_stats(qty, df[sku_col] if sku_col in df.columns else None)
+        if not np.any(std > 0):
+            return False, "cannot detect outliers due to zero variance", None
+        
+        lower = mean - threshold * std
+        upper = mean + threshold * std
+        positions = np.flatnonzero((std > 0) & ((qty < lower) | (qty > upper)))
+        
+        change = self._new_change()
+        if method == "cap":
+            change["values"][qty_col] = (
+                positions,
+                df[qty_col].to_numpy()[positions],
+                np.clip(qty[positions], lower[positions], upper[positions])
+            )
+        else:
+            change["removed"] = positions
+        
+        return True, f"processed {len(positions):,} outliers using {method} method", change
+    
+    def _fix_review(self,
+                    df: pd.DataFrame,
+                    corrections: Optional[List[Dict[str, Any]]] = None,
+                    removals: Optional[List[Dict[str, Any]]] = None,
+                    **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        # correct or remove reviewed anomaly points matched by item and date
+        qty_col = self.column_mapping.get("quantity")
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        if not (qty_col and sku_col and date_col):
+            return False, "item, date and quantity columns must be mapped", None
+        
+        change = self._new_change()
+        positions, new_values = self._review_positions(df, corrections or [])
+        if len(positions):
+            change["values"][qty_col] = (positions, df[qty_col].to_numpy()[positions], new_values)
+        change["removed"], _ = self._review_positions(df, removals or [])
+        
+        n_corrected = len(positions)
+        n_removed = len(change["removed"])
+        if not (n_corrected or n_removed):
+            return False, "no reviewed points matched the data", None
+        
+        return True, f"corrected {n_corrected:,} values and removed {n_removed:,} data points", change
+    
+    def _review_positions(self, df: pd.DataFrame, actions: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        # row positions of reviewed points with their new values
+        empty = (np.array([], dtype=np.int64), np.array([], dtype=float))
+        if not actions:
+            return empty
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        
+        keys = pd.DataFrame({
+            "sku": [a["sku"] for a in actions],
+            "date": pd.to_datetime([a["date"] for a in actions]),
+            "new_value": [a.get("new_value", np.nan) for a in actions]
+        }).drop_duplicates(subset=["sku", "date"])
+        
+        # only rows of reviewed items take part in the match
+        candidates = np.flatnonzero(df[sku_col].isin(keys["sku"].unique()).to_numpy())
+        rows = pd.DataFrame({
+            "sku": df[sku_col].iloc[candidates].astype(object).to_numpy(),
+            "date": pd.to_datetime(df[date_col].iloc[candidates]).to_numpy(),
+            "position": candidates
+        })
+        matched = rows.merge(keys, on=["sku", "date"]).sort_values("position")
+        if matched.empty:
+            return empty
+        return matched["position"].to_numpy(dtype=np.int64), matched["new_value"].to_numpy(dtype=float)
+    
+    # ---------- FIX HISTORY ----------
+    
+    def _write_values(self, df: pd.DataFrame, col: str, positions: np.ndarray, values: np.ndarray) -> None:
+        # write values into column at row positions
+        kind = df[col].dtype.kind
+        if kind in "iub" and np.asarray(values).dtype.kind == "f":
+            # capped or averaged quantities need a float column
+            df[col] = df[col].astype(float)
+        elif kind in "iu" and len(values) and not self._fits(df[col].dtype, values):
+            # summed duplicates can outgrow a downcast integer column
+            df[col] = df[col].astype(np.int64)
+        elif kind == "f" and df[col].dtype.itemsize < np.asarray(values).dtype.itemsize:
+            # filled values keep full precision in a downcast float column
+            df[col] = df[col].astype(np.float64)
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            # written labels join the categories before assignment
+            new_labels = pd.Index(pd.unique(values)).dropna().difference(df[col].cat.categories)
+            if len(new_labels):
+                df[col] = df[col].cat.add_categories(new_labels)
+        df.iloc[positions, df.columns.get_loc(col)] = values
+    
+    def _fits(self, dtype: np.dtype, values: np.ndarray) -> bool:
+        # check integer values fit in dtype
+        info = np.iinfo(dtype)
+        values = np.asarray(values)
+        return info.min <= values.min() and values.max() <= info.max
+    
+    def _change_positions(self, change: Dict[str, Any]) -> np.ndarray:
+        # every row position touched by a change
+        parts = [positions for positions, _, _ in change["values"].values()] + [change["removed"]]
+        return np.unique(np.concatenate(parts).astype(np.int64))
+    
+    def _apply_change(self, change: Dict[str, Any]) -> None:
+        # write new values then drop removed rows
+        with self.data_lock:
+            df = self.processed_data
+            profiled = self.profiler.is_current(df, self.column_mapping)
+            
+            for col, (positions, old, new) in change["values"].items():
+                self._write_values(df, col, positions, new)
+            if profiled:
+                self.profiler.update_values(
+                    df, {col: (positions, old) for col, (positions, old, _) in change["values"].items()}
+                )
+            
+            removed = change["removed"]
+            self._record_change("fix", *self._rows_span(df, self._change_positions(change)))
+            if len(removed):
+                # removed rows are kept in the log so undo can put them back
+                change["removed_rows"] = df.iloc[removed]
+                keep = np.ones(len(df), dtype=bool)
+                keep[removed] = False
+                fixed = df[keep]
+                if profiled:
+                    self.profiler.remove_rows(df, keep, fixed)
+                df = fixed
+            
+            self.processed_data = df
+        
+    def _revert_change(self, change: Dict[str, Any]) -> None:
+        # put removed rows back then restore old values
+        with self.data_lock:
+            df = self.processed_data
+            
+            removed = change["removed"]
+            if len(removed):
+                # interleave kept and removed rows back into original positions
+                n_rows = len(df) + len(removed)
+                kept = np.ones(n_rows, dtype=bool)
+                kept[removed] = False
+                order = np.empty(n_rows, dtype=np.int64)
+                order[kept] = np.arange(len(df))
+                order[removed] = len(df) + np.arange(len(removed))
+                df = pd.concat([df, change["removed_rows"]]).iloc[order]
+            
+            self._record_change("fix", *self._rows_span(df, self._change_positions(change)))
+            profiled = self.profiler.is_current(df, self.column_mapping)
+            for col, (positions, old, new) in change["values"].items():
+                self._write_values(df, col, positions, old)
+            if profiled:
+                self.profiler.update_values(
+                    df, {col: (positions, new) for col, (positions, _, new) in change["values"].items()}
+                )
+            
+            self.processed_data = df
+        
+    def undo_fix(self) -> Tuple[bool, str]:
+        # revert last applied fix
+        if not self.fix_history:
+            return False, "no fix to undo"
+        
+        change = self.fix_history.pop()
+        self._revert_change(change)
+        self.redo_history.append(change)
+        return True, f"undid: {change['message']}"
+    
+    def redo_fix(self) -> Tuple[bool, str]:
+        # apply last undone fix again
+        if not self.redo_history:
+            return False, "no fix to redo"
+        
+        change = self.redo_history.pop()
+        self._apply_change(change)
+        self.fix_history.append(change)
+        return True, f"redid: {change['message']}"
+    
+    def clear_fix_history(self) -> None:
+        # forget undo and redo steps
+        self.fix_history = []
+        self.redo_history = []
+    
+    # ---------- SKU CLASSIFICATION ----------
+    
+    def get_tier_index(self, progress_callback: Optional[callable] = None) -> TierIndex:
+        # abc tier index cached until data or mapping changes
+        sku_col = self.column_mapping.get("sku")
+        qty_col = self.column_mapping.get("quantity")
+        df = self.processed_data
+        
+        if df is None or not sku_col or not qty_col:
+            return TierIndex.build(pd.Series([], dtype=object), pd.Series([], dtype=float))
+        
+        key = (self.data_version, id(df), len(df), sku_col, qty_col)
+        if self._tier_index is None or self._tier_key != key:
+            if progress_callback:
+                progress_callback(30, "calculating volumes")
+            self._tier_index = TierIndex.build(df[sku_col], df[qty_col], self.data_version)
+            self._tier_key = key
+        
+        return self._tier_index
+    
+    def classify_skus(self, progress_callback: Optional[callable] = None) -> Dict[str, List[str]]:
+        # classify skus into abc tiers
+        classification = self.get_tier_index(progress_callback).to_dict()
         
         if progress_callback:
             progress_callback(100, "complete")
         
         return classification
     
+    def get_tier(self, sku: str) -> str:
+        # abc tier of one sku
+        return self.get_tier_index().get_tier(sku)
+    
+    def get_tier_mapping(self) -> Dict[str, str]:
+        # sku to abc tier mapping
+        return self.get_tier_index().get_mapping()
+    
+    # ---------- SHARD STORE ----------
+    
+    def get_shard_store(self, progress_callback: Optional[callable] = None) -> Optional[ShardStore]:
+        # disk snapshot of processed data for batch scans rebuilt when data changes
+        sku_col = self.column_mapping.get("sku")
+        if self.processed_data is None or not sku_col:
+            return None
+        
+        # workers ask concurrently so only one builds a version and fixes
+        # writing into the frame in place wait until its snapshot is on disk
+        with self._shard_lock, self.data_lock:
+            df = self.processed_data
+            key = (self.data_version, id(df), len(df), sku_col)
+            store = self._shard_store
+            if store is not None and self._shard_key == key:
+                return store
+            
+            if progress_callback:
+                progress_callback(10, "writing item shards")
+            
+            # journaled changes rewrite only the shards of changed items
+            changes = None
+            if store is not None and store.key_col == sku_col and store.version < self.data_version:
+                changes = self.changes_since(store.version)
+            
+            # replaced stores delete their files once running workers let go
+            if changes is not None and not changes["full"]:
+                self._shard_store = store.update(df, changes["skus"], self.data_version)
+            else:
+                self._shard_store = ShardStore.build(df, sku_col, self.data_version)
+            self._shard_key = key
+            return self._shard_store
+    
     # ---------- DATA ACCESS ----------
     
     def get_sku_data(self, sku: str) -> pd.DataFrame:
@@ -507,13 +1681,13 @@ class DataProcessor:
             return self.sku_list.copy()
         
         if stratified:
-            classification = self.classify_skus()
+            tiers = self.get_tier_index()
             sample = []
             per_class = max(1, n // 3)
             
-            for tier in ["A", "B", "C"]:
-                tier_skus = classification[tier]
-                if tier_skus:
+            for tier in TierIndex.TIERS:
+                tier_skus = tiers.get_skus(tier)
+                if len(tier_skus):
                     sample_size = min(per_class, len(tier_skus))
                     sample.extend(
                         np.random.choice(tier_skus, sample_size, replace=False).tolist()
@@ -0,0 +1,122 @@
+"""
+dtype optimizer module
+shrinks processed columns in place without losing values
+reports bytes saved per column for the data health tab
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Any
+
+import config
+
+
+# ============================================================================
+#                             DTYPE OPTIMIZER
+# ============================================================================
+
+class DtypeOptimizer:
+    # precision safe downcasting of integer float and text columns
+    
+    # signed only so differences of quantities never wrap
+    INT_TYPES = [np.int8, np.int16, np.int32]
+    
+    def __init__(self):
+        # initialize with performance configuration
+        self.config = config.PERFORMANCE
+    
+    def optimize(self, df: pd.DataFrame, protected: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        # replace columns with compact dtypes and return per column report
+        protected = set(protected or [])
+        report = {}
+        
+        for col in df.columns:
+            series = df[col]
+            before = int(series.memory_usage(index=False, deep=series.dtype == object))
+            entry = {"from": str(series.dtype), "to": str(series.dtype),
+                     "before": before, "after": before, "saved": 0, "note": ""}
+            report[col] = entry
+            
+            if col in protected:
+                entry["note"] = "protected"
+                continue
+            
+            kind = series.dtype.kind
+            if kind in "iu":
+                values, entry["note"] = self._downcast_int(series.to_numpy())
+            elif kind == "f":
+                values, entry["note"] = self._downcast_float(series.to_numpy())
+            elif series.dtype == object:
+                values, entry["note"] = self._categorize(series)
+            else:
+                continue
+            
+            if values is None:
+                continue
+            
+            # column swap keeps the frame object and its other blocks
+            df[col] = values
+            after = int(df[col].memory_usage(index=False, deep=False))
+            entry.update({"to": str(df[col].dtype), "after": after, "saved": before - after})
+        
+        return report
+    
+    # ---------- COLUMN RULES ----------
+    
+    def _downcast_int(self, values: np.ndarray):
+        # smallest integer type holding the range with arithmetic headroom
+        if not len(values):
+            return None, "empty"
+        
+        headroom = self.config["int_headroom"]
+        low, high = int(values.min()) * headroom, int(values.max()) * headroom
+        
+        for dtype in self.INT_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                if np.dtype(dtype).itemsize >= values.dtype.itemsize:
+                    return None, "already compact"
+                return values.astype(dtype), "range"
+        return None, "range too wide"
+    
+    def _downcast_float(self, values: np.ndarray):
+        # float32 only when values and their totals stay exact
+        if values.dtype.itemsize <= 4:
+            return None, "already compact"
+        
+        finite = values[np.isfinite(values)]
+        
+        # fewest decimals that represent every value
+        decimals = None
+        for d in range(self.config["float_max_decimals"] + 1):
+            if np.array_equal(np.round(finite, d), finite):
+                decimals = d
+                break
+        if decimals is None:
+            return None, "precision"
+        
+        # float32 totals lose cents once sums pass the mantissa
+        if np.abs(finite).sum() * 10 ** decimals >= 2 ** 24:
+            return None, "large sums"
+        
+        narrowed = values.astype(np.float32)
+        if not np.array_equal(np.round(narrowed[np.isfinite(values)].astype(np.float64), decimals), finite):
+            return None, "precision"
+        return narrowed, "precision checked"
+    
+    def _categorize(self, series: pd.Series):
+        # low cardinality text as categorical codes
+        if not len(series):
+            return None, "empty"
+        
+        codes, uniques = pd.factorize(series)
+        if len(uniques) / len(series) >= self.config["category_max_ratio"]:
+            return None, "high cardinality"
+        return pd.Categorical.from_codes(codes, categories=uniques), "low cardinality"
+    
+    # ---------- REPORTING ----------
+    
+    @staticmethod
+    def total_saved(report: Dict[str, Dict[str, Any]]) -> int:
+        # bytes saved across all columns
+        return sum(entry["saved"] for entry in report.values())
@@ -10,6 +10,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 
 import config
+from core.identifiers import iter_groups, group_count
 
 
 # ============================================================================
@@ -290,12 +291,10 @@ class FeatureEngineer:
         # create features for all skus with tier-appropriate feature sets
         
         results = []
-        skus = df[sku_col].unique()
-        total = len(skus)
+        groups = iter_groups(df, sku_col)
+        total = group_count(df, sku_col)
         
-        for i, sku in enumerate(skus):
-            # get sku data
-            sku_df = df[df[sku_col] == sku].copy()
+        for i, (sku, sku_df) in enumerate(groups):
             
             # determine feature set based on tier
             tier = tier_mapping.get(sku, "C")
@@ -14,6 +14,7 @@ import warnings
 warnings.filterwarnings("ignore")
 
 import config
+from core.identifiers import iter_groups, group_count, group_labels, select_groups
 
 
 # ============================================================================
@@ -770,12 +771,10 @@ class Forecaster:
         # forecast multiple skus with strategy selection
         
         results = {}
-        skus = df[sku_col].unique()
-        total = len(skus)
+        groups = iter_groups(df, sku_col)
+        total = group_count(df, sku_col)
         
-        for i, sku in enumerate(skus):
-            # get sku data
-            sku_df = df[df[sku_col] == sku].copy()
+        for i, (sku, sku_df) in enumerate(groups):
             
             # determine strategy based on tier
             if tier_mapping and strategy == "balanced":
@@ -834,14 +833,16 @@ class Forecaster:
         results = {model: {"mape": [], "mae": [], "wins": 0} for model in models_to_test}
         
         # select sample skus
-        all_skus = df[sku_col].unique()
+        all_skus = group_labels(df, sku_col)
         if len(all_skus) > sample_size:
             sample_skus = np.random.choice(all_skus, sample_size, replace=False)
         else:
             sample_skus = all_skus
         
-        for sku in sample_skus:
-            sku_df = df[df[sku_col] == sku].copy()
+        # only the sampled rows are gathered from a frame or its shards
+        sample = select_groups(df, sku_col, list(sample_skus))
+        
+        for sku, sku_df in iter_groups(sample, sku_col):
             
             # aggregate data
             aggregated = self.aggregate_to_frequency(sku_df, date_col, qty_col, frequency)
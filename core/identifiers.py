@@ -0,0 +1,149 @@
+"""
+identifiers module
+sku and category labels held as categoricals with sorted categories
+integer codes drive filters and grouping while labels stay for display
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Iterator, List, Tuple, Any, Union
+from pandas.api.types import union_categoricals
+
+from core.shard_store import ShardStore
+
+
+# ============================================================================
+#                               ENCODING
+# ============================================================================
+
+def encode_labels(values: pd.Series) -> pd.Categorical:
+    # stripped string labels as a categorical with sorted categories
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    
+    # strings are only built for unique values and merge once stripped
+    labels = pd.Index(uniques).astype(str).str.strip()
+    label_codes, categories = pd.factorize(labels, sort=True)
+    lookup = label_codes.astype(code_dtype(len(categories)))
+    return pd.Categorical.from_codes(lookup[codes], categories=categories, validate=False)
+
+
+def label_code(labels: pd.Index, label: Any) -> int:
+    # code of one label in a unique label index or -1
+    try:
+        code = labels.get_loc(label)
+    except (KeyError, TypeError):
+        return -1
+    return int(code) if isinstance(code, (int, np.integer)) else -1
+
+
+def code_dtype(n_categories: int) -> np.dtype:
+    # narrowest signed code dtype pandas uses for a category count
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def drop_unused_labels(labels: pd.Categorical) -> pd.Categorical:
+    # remove categories no row uses without row sized temporaries when all are used
+    used = np.bincount(labels.codes[labels.codes >= 0], minlength=len(labels.categories)) > 0
+    if used.all():
+        return labels
+    
+    lookup = np.append(np.cumsum(used) - 1, -1).astype(code_dtype(int(used.sum())))
+    lookup[:-1][~used] = -1
+    return pd.Categorical.from_codes(lookup[labels.codes], categories=labels.categories[used], validate=False)
+
+
+def prefix_labels(labels: pd.Categorical, length: int = 3) -> pd.Categorical:
+    # categorical of label prefixes derived from the categories only
+    prefixes = pd.Index(labels.categories).str[:length]
+    prefix_codes, categories = pd.factorize(prefixes, sort=True)
+    # lookup in the narrow code dtype so the row sized take stays small
+    lookup = np.append(prefix_codes, -1).astype(code_dtype(len(categories)))
+    return pd.Categorical.from_codes(lookup[labels.codes], categories=categories, validate=False)
+
+
+def combine_labels(first: Any, second: Any) -> Any:
+    # concatenated column with categoricals recoded to shared sorted categories
+    if isinstance(first, pd.Categorical) and isinstance(second, pd.Categorical):
+        return union_categoricals([first, second], sort_categories=True)
+    return pd.concat([pd.Series(first), pd.Series(second)], ignore_index=True).array
+
+
+def label_codes(values: pd.Series) -> np.ndarray:
+    # integer codes ordered like the sorted labels
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.is_monotonic_increasing:
+        return values.cat.codes.to_numpy()
+    return pd.factorize(values.to_numpy(), sort=True)[0]
+
+
+# ============================================================================
+#                               GROUPING
+# ============================================================================
+
+def iter_frames(source: Union[pd.DataFrame, ShardStore]) -> Iterator[pd.DataFrame]:
+    # frame itself or each hydrated shard of a store
+    if isinstance(source, ShardStore):
+        yield from source.iter_shards()
+    else:
+        yield source
+
+
+def iter_batches(source: Union[pd.DataFrame, ShardStore], key_col: str, size: int) -> Iterator[pd.DataFrame]:
+    # frames holding at most size whole labels shard by shard
+    if isinstance(source, ShardStore):
+        for shard in source.iter_shards():
+            yield from iter_batches(shard, key_col, size)
+        return
+    
+    # labels in order of first appearance grouped size at a time by one stable sort
+    df = source
+    codes = pd.factorize(df[key_col])[0]
+    rows = np.flatnonzero(codes >= 0)
+    batch = codes[rows] // max(1, size)
+    n_batches = batch.max() + 1 if len(batch) else 0
+    position = np.argsort(batch, kind="stable")
+    order = rows[position]
+    bounds = np.searchsorted(batch[position], np.arange(n_batches + 1))
+    
+    for i in range(n_batches):
+        yield df.take(order[bounds[i]:bounds[i + 1]])
+
+
+def group_count(source: Union[pd.DataFrame, ShardStore], key_col: str) -> int:
+    # number of labels in a frame or store
+    if isinstance(source, ShardStore):
+        return source.n_keys
+    return source[key_col].nunique()
+
+
+def group_labels(source: Union[pd.DataFrame, ShardStore], key_col: str) -> np.ndarray:
+    # labels of a frame or store without hydrating shards
+    if isinstance(source, ShardStore):
+        return source.get_keys()
+    return np.asarray(source[key_col].dropna().unique(), dtype=object)
+
+
+def select_groups(source: Union[pd.DataFrame, ShardStore], key_col: str, labels: List[Any]) -> pd.DataFrame:
+    # rows of chosen labels from a frame or the shards holding them
+    if isinstance(source, ShardStore):
+        return source.select(labels)
+    return source[source[key_col].isin(labels)]
+
+
+def iter_groups(source: Union[pd.DataFrame, ShardStore], key_col: str) -> Iterator[Tuple[Any, pd.DataFrame]]:
+    # rows of each label shard by shard so only one shard is needed at a time
+    if isinstance(source, ShardStore):
+        for shard in source.iter_shards():
+            yield from iter_groups(shard, key_col)
+        return
+    
+    # labels in order of first appearance from one stable sort
+    df = source
+    codes, uniques = pd.factorize(df[key_col])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    
+    for i, label in enumerate(uniques):
+        yield label, df.take(order[bounds[i]:bounds[i + 1]])
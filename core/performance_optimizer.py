@@ -12,6 +12,7 @@ import sys
 from functools import lru_cache
 
 import config
+from core.dtype_optimizer import DtypeOptimizer
 
 
 # ============================================================================
@@ -57,41 +58,9 @@ class PerformanceOptimizer:
         gc.collect()
     
     def optimize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        # reduce memory usage of dataframe
-        result = df.copy()
-        
-        for col in result.columns:
-            col_type = result[col].dtype
-            
-            # optimize integers
-            if col_type == np.int64:
-                if result[col].min() >= 0:
-                    if result[col].max() < 255:
-                        result[col] = result[col].astype(np.uint8)
-                    elif result[col].max() < 65535:
-                        result[col] = result[col].astype(np.uint16)
-                    elif result[col].max() < 4294967295:
-                        result[col] = result[col].astype(np.uint32)
-                else:
-                    if result[col].min() > -128 and result[col].max() < 127:
-                        result[col] = result[col].astype(np.int8)
-                    elif result[col].min() > -32768 and result[col].max() < 32767:
-                        result[col] = result[col].astype(np.int16)
-                    elif result[col].min() > -2147483648 and result[col].max() < 2147483647:
-                        result[col] = result[col].astype(np.int32)
-            
-            # optimize floats
-            elif col_type == np.float64:
-                result[col] = result[col].astype(np.float32)
-            
-            # optimize objects to category if low cardinality
-            elif col_type == object:
-                num_unique = result[col].nunique()
-                num_total = len(result[col])
-                if num_unique / num_total < 0.5:
-                    result[col] = result[col].astype("category")
-        
-        return result
+        # reduce memory usage of dataframe in place with the shared dtype stage
+        DtypeOptimizer().optimize(df)
+        return df
     
     # ---------- CHUNKED PROCESSING ----------
     
@@ -214,7 +183,7 @@ class PerformanceOptimizer:
                                    n: int = 20) -> List[str]:
         # get representative sample across volume distribution
         # calculate sku volumes
-        sku_volumes = df.groupby(sku_col)[qty_col].sum().sort_values(ascending=False)
+        sku_volumes = df.groupby(sku_col, observed=True)[qty_col].sum().sort_values(ascending=False)
         
         if len(sku_volumes) <= n:
             return sku_volumes.index.tolist()
@@ -0,0 +1,337 @@
+"""
+quality profiler module
+computes data quality metrics and abnormal row masks together
+keeps masks as bitsets and updates them when fixes touch rows
+"""
+
+import weakref
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Any
+
+import config
+
+
+# ============================================================================
+#                           QUALITY PROFILER
+# ============================================================================
+
+class QualityProfiler:
+    # single pass quality profile shared by quality score and abnormal data review
+    
+    # row masks kept per profile
+    MASKS = ["missing", "duplicates", "duplicate_extra", "negative", "outliers"]
+    
+    def __init__(self, threshold: Optional[float] = None):
+        # initialize empty profile
+        self.threshold = threshold or config.DATA_QUALITY["outlier_std_threshold"]
+        self.reset()
+    
+    def reset(self) -> None:
+        # clear profile state
+        self.column_mapping = {}
+        self.n_rows = 0
+        self._frame_ref = None
+        self._bits: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._null_counts: Dict[str, int] = {}
+        self._date_span = (None, None)
+    
+    # ---------- PROFILING ----------
+    
+    def is_current(self, df: pd.DataFrame, column_mapping: Optional[Dict[str, str]] = None) -> bool:
+        # check if profile describes this frame and mapping
+        if self._frame_ref is None or self._frame_ref() is not df or self.n_rows != len(df):
+            return False
+        return column_mapping is None or column_mapping == self.column_mapping
+    
+    def profile(self, df: pd.DataFrame, column_mapping: Dict[str, str]) -> None:
+        # compute every metric and row mask in one pass over the columns
+        self.reset()
+        self.column_mapping = dict(column_mapping)
+        self.n_rows = len(df)
+        
+        mapped = set(self._mapped_columns(df))
+        missing = np.zeros(self.n_rows, dtype=bool)
+        
+        # each column is scanned once for nulls
+        for col in df.columns:
+            isna = df[col].isna().to_numpy()
+            self._null_counts[col] = int(isna.sum())
+            if col in mapped and self._null_counts[col]:
+                missing |= isna
+        self._store("missing", missing)
+        
+        self._profile_duplicates(df)
+        
+        qty = self._quantity_values(df)
+        self._store("negative", qty < 0 if qty is not None else np.zeros(self.n_rows, dtype=bool))
+        self._profile_outliers(df)
+        
+        self._profile_dates(df)
+        self._frame_ref = weakref.ref(df)
+    
+    def _mapped_columns(self, df: pd.DataFrame) -> List[str]:
+        # mapped columns present in frame
+        return [c for c in self.column_mapping.values() if c and c in df.columns]
+    
+    def _quantity_values(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        # quantity column as float array
+        qty_col = self.column_mapping.get("quantity")
+        if not qty_col or qty_col not in df.columns:
+            return None
+        return pd.to_numeric(df[qty_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    
+    def _profile_duplicates(self, df: pd.DataFrame) -> None:
+        # rows sharing item and date
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        
+        if sku_col in df.columns and date_col in df.columns:
+            extra = df.duplicated(subset=[sku_col, date_col], keep="first").to_numpy()
+            if extra.any():
+                every = df.duplicated(subset=[sku_col, date_col], keep=False).to_numpy()
+            else:
+                every = extra
+        else:
+            extra = every = np.zeros(self.n_rows, dtype=bool)
+        
+        self._store("duplicate_extra", extra)
+        self._store("duplicates", every)
+    
+    def _profile_outliers(self, df: pd.DataFrame) -> None:
+        # rows beyond threshold standard deviations of their item quantities
+        mask = np.zeros(self.n_rows, dtype=bool)
+        qty = self._quantity_values(df)
+        
+        if qty is not None:
+            sku_col = self.column_mapping.get("sku")
+            keys = df[sku_col] if sku_col in df.columns else None
+            mean, std = item_stats(qty, keys)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = (qty - mean) / std
+            mask = (std > 0) & ((z > self.threshold) | (z < -self.threshold))
+        
+        self._store("outliers", mask)
+    
+    def _profile_dates(self, df: pd.DataFrame) -> None:
+        # first and last date
+        date_col = self.column_mapping.get("date")
+        if date_col in df.columns and len(df):
+            self._date_span = (df[date_col].min(), df[date_col].max())
+        else:
+            self._date_span = (None, None)
+    
+    # ---------- INCREMENTAL UPDATES ----------
+    
+    def update_values(self, df: pd.DataFrame, changes: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+        # refresh masks for cells changed in place given as column to positions and old values
+        changes = {c: v for c, v in changes.items() if c in df.columns and len(v[0])}
+        
+        if changes:
+            # null counts move by the difference at touched cells
+            for col, (positions, old_values) in changes.items():
+                old_null = pd.isna(old_values).sum()
+                new_null = df[col].iloc[positions].isna().sum()
+                self._null_counts[col] = self._null_counts.get(col, 0) + int(new_null - old_null)
+            
+            # row local masks only for touched rows
+            positions = np.unique(np.concatenate([np.asarray(p, dtype=np.int64) for p, _ in changes.values()]))
+            rows = df.iloc[positions]
+            mapped = self._mapped_columns(df)
+            if mapped:
+                self._set_bits("missing", positions, rows[mapped].isna().any(axis=1).to_numpy())
+            
+            qty_col = self.column_mapping.get("quantity")
+            sku_col = self.column_mapping.get("sku")
+            if qty_col in changes:
+                qty = pd.to_numeric(rows[qty_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                self._set_bits("negative", positions, qty < 0)
+            
+            # item statistics moved so outliers need the quantity column again
+            if qty_col in changes or sku_col in changes:
+                self._profile_outliers(df)
+            
+            if {sku_col, self.column_mapping.get("date")} & set(changes):
+                self._profile_duplicates(df)
+            if self.column_mapping.get("date") in changes:
+                self._profile_dates(df)
+        
+        self._frame_ref = weakref.ref(df)
+    
+    def remove_rows(self, old_df: pd.DataFrame, keep: np.ndarray, df: pd.DataFrame) -> None:
+        # drop masks and counts for removed rows
+        keep = np.asarray(keep, dtype=bool)
+        removed = ~keep
+        
+        if removed.any():
+            removed_rows = old_df[removed]
+            for col in old_df.columns:
+                self._null_counts[col] = self._null_counts.get(col, 0) - int(removed_rows[col].isna().sum())
+            
+            # removing rows outside duplicate groups leaves the groups intact
+            had_duplicates = bool(self.get_mask("duplicates")[removed].any())
+            
+            for name in ["missing", "negative", "duplicates", "duplicate_extra"]:
+                self._store(name, self.get_mask(name)[keep])
+            self.n_rows = int(keep.sum())
+            
+            if had_duplicates:
+                self._profile_duplicates(df)
+            self._profile_outliers(df)
+            self._profile_dates(df)
+        
+        self._frame_ref = weakref.ref(df)
+    
+    # ---------- BITSETS ----------
+    
+    def _store(self, name: str, mask: np.ndarray) -> None:
+        # pack boolean mask into bitset
+        mask = np.asarray(mask, dtype=bool)
+        self._bits[name] = np.packbits(mask)
+        self._counts[name] = int(mask.sum())
+    
+    def _set_bits(self, name: str, positions: np.ndarray, values: np.ndarray) -> None:
+        # overwrite bits at positions
+        bits = self._bits[name]
+        index = positions >> 3
+        shift = (7 - (positions & 7)).astype(np.uint8)
+        
+        old = (bits[index] >> shift) & 1
+        np.bitwise_and.at(bits, index, ~(np.uint8(1) << shift))
+        np.bitwise_or.at(bits, index, np.asarray(values, dtype=np.uint8) << shift)
+        
+        self._counts[name] += int(np.asarray(values, dtype=bool).sum()) - int(old.sum())
+    
+    def get_mask(self, name: str) -> np.ndarray:
+        # unpack bitset to boolean row mask
+        if name not in self._bits:
+            return np.zeros(self.n_rows, dtype=bool)
+        return np.unpackbits(self._bits[name], count=self.n_rows).astype(bool)
+    
+    def get_positions(self, name: str) -> np.ndarray:
+        # row positions flagged by mask
+        return np.flatnonzero(self.get_mask(name))
+    
+    def count(self, name: str) -> int:
+        # number of rows flagged by mask
+        return self._counts.get(name, 0)
+    
+    def get_rows(self, df: pd.DataFrame, name: str, limit: Optional[int] = None) -> pd.DataFrame:
+        # flagged rows read from frame on demand
+        positions = self.get_positions(name)
+        if limit is not None:
+            positions = positions[:limit]
+        return df.iloc[positions]
+    
+    def get_memory_bytes(self) -> int:
+        # bytes held by mask bitsets
+        return int(sum(b.nbytes for b in self._bits.values()))
+    
+    # ---------- QUALITY SCORE ----------
+    
+    def quality(self, n_skus: int) -> Dict[str, Any]:
+        # quality metrics issues and score from profile
+        quality = {
+            "overall_score": 100,
+            "metrics": {},
+            "issues": [],
+            "recommendations": []
+        }
+        
+        n_rows = max(1, self.n_rows)
+        n_cells = self.n_rows * max(1, len(self._null_counts))
+        
+        # missing values
+        missing_pct = (sum(self._null_counts.values()) / n_cells) * 100 if n_cells else 0
+        quality["metrics"]["missing_data"] = {
+            "value": missing_pct,
+            "status": "good" if missing_pct < 5 else "warning" if missing_pct < 15 else "critical"
+        }
+        if missing_pct > 5:
+            quality["issues"].append(f"{missing_pct:.1f}% missing values detected")
+            quality["recommendations"].append("fill missing values with forward fill or interpolation")
+            quality["overall_score"] -= min(20, missing_pct)
+        
+        sku_col = self.column_mapping.get("sku")
+        date_col = self.column_mapping.get("date")
+        qty_col = self.column_mapping.get("quantity")
+        
+        # duplicates
+        if sku_col and date_col:
+            dup_count = self.count("duplicate_extra")
+            dup_pct = (dup_count / n_rows) * 100
+            quality["metrics"]["duplicates"] = {
+                "value": dup_pct,
+                "status": "good" if dup_pct == 0 else "warning" if dup_pct < 5 else "critical"
+            }
+            if dup_count > 0:
+                quality["issues"].append(f"{dup_count:,} duplicate entries found")
+                quality["recommendations"].append("aggregate duplicates by sum or average")
+                quality["overall_score"] -= min(15, dup_pct * 2)
+        
+        # negative values
+        if qty_col:
+            neg_count = self.count("negative")
+            neg_pct = (neg_count / n_rows) * 100
+            quality["metrics"]["negative_values"] = {
+                "value": neg_pct,
+                "status": "good" if neg_pct == 0 else "warning" if neg_pct < 2 else "critical"
+            }
+            if neg_count > 0:
+                quality["issues"].append(f"{neg_count:,} negative quantity values")
+                quality["recommendations"].append("review negative values - may indicate returns")
+                quality["overall_score"] -= min(10, neg_pct * 3)
+        
+        # data coverage
+        if date_col and sku_col:
+            first, last = self._date_span
+            date_range = (last - first).days if first is not None and pd.notna(first) else 0
+            points_per_sku = self.n_rows / n_skus if n_skus else 0
+            quality["metrics"]["data_coverage"] = {
+                "date_range_days": date_range,
+                "avg_points_per_item": points_per_sku,
+                "status": "good" if points_per_sku >= 12 else "warning" if points_per_sku >= 7 else "critical"
+            }
+            if points_per_sku < config.DATA_QUALITY["min_data_points"]:
+                quality["issues"].append(
+                    f"low data points per item: {points_per_sku:.1f} "
+                    f"(minimum recommended: {config.DATA_QUALITY['min_data_points']})"
+                )
+                quality["recommendations"].append("consider weekly or monthly aggregation")
+                quality["overall_score"] -= 10
+        
+        quality["overall_score"] = max(0, min(100, quality["overall_score"]))
+        return quality
+
+
+# ============================================================================
+#                               HELPERS
+# ============================================================================
+
+def item_stats(values: np.ndarray, keys: Optional[pd.Series] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # mean and sample std of each row's item broadcast back to rows
+    if keys is None:
+        codes = np.zeros(len(values), dtype=np.int64)
+        n_groups = 1 if len(values) else 0
+    else:
+        codes, uniques = pd.factorize(keys)
+        n_groups = len(uniques)
+    
+    valid = (codes >= 0) & ~np.isnan(values)
+    group = codes[valid]
+    
+    counts = np.bincount(group, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(group, weights=values[valid], minlength=n_groups) / counts
+        
+        # second pass on deviations keeps variance accurate for large values
+        deviation = values[valid] - means[group]
+        squares = np.bincount(group, weights=deviation * deviation, minlength=n_groups)
+        stds = np.sqrt(squares / (counts - 1))
+    stds[counts < 2] = np.nan
+    
+    # rows without an item get no statistics
+    means = np.append(means, np.nan)
+    stds = np.append(stds, np.nan)
+    return means[codes], stds[codes]
@@ -10,6 +10,8 @@ from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 
 import config
+from core.identifiers import iter_frames, label_code
+from core.tier_index import TierMapping
 
 
 # ============================================================================
@@ -35,12 +37,30 @@ class SKUCluster:
 class RuleClustering:
     # rule based clustering using volume and pattern thresholds
     
+    TIERS = ["A", "B", "C"]
+    PATTERNS = ["seasonal", "erratic", "variable", "steady"]
+    
     def __init__(self, use_percentiles: bool = True):
         # initialize with clustering configuration
         self.config = config.CLUSTERING
         self.use_percentiles = use_percentiles
         self.sku_clusters = {}
         self.cluster_summary = {}
+        
+        # per sku metric arrays kept so thresholds can change without a rescan
+        self.metrics: Dict[str, np.ndarray] = {}
+        self._sorted_volumes = np.array([])
+        
+        # sku labels by code so indexes hold codes and labels resolve on display
+        self.sku_index = pd.Index([], dtype=object)
+        
+        # inverted indexes of sku codes rebuilt on every assignment
+        self._code_rows = np.zeros(0, dtype=np.int32)
+        self._tier_codes = np.zeros(0, dtype=np.int8)
+        self._tier_members: Dict[str, np.ndarray] = {}
+        self._pattern_members: Dict[str, np.ndarray] = {}
+        self._cell_members: Dict[Tuple[str, str], np.ndarray] = {}
+        self._tier_mapping: Optional[TierMapping] = None
     
     # ---------- MAIN CLUSTERING ----------
     
@@ -52,82 +72,149 @@ class RuleClustering:
         # cluster all skus using rule based approach
         
         # calculate metrics for each sku
-        sku_metrics = self._calculate_sku_metrics(df, sku_col, date_col, qty_col)
-        
-        # determine volume thresholds
-        if self.use_percentiles:
-            volume_thresholds = self._calculate_percentile_thresholds(sku_metrics)
-        else:
-            volume_thresholds = self.config["volume_thresholds"]
+        self._set_metrics(*self._calculate_sku_metrics(df, sku_col, date_col, qty_col))
         
         # assign clusters
-        for sku, metrics in sku_metrics.items():
-            volume_tier = self._assign_volume_tier(metrics["total_volume"], volume_thresholds)
-            pattern_type = self._assign_pattern_type(metrics["cv"], metrics["q4_concentration"])
-            
-            cluster_label = config.get_cluster_label(volume_tier, pattern_type)
-            
-            self.sku_clusters[sku] = SKUCluster(
+        return self.assign_clusters()
+    
+    def assign_clusters(self) -> Dict[str, SKUCluster]:
+        # tiers and patterns of every sku from cached metrics and current thresholds
+        if not self.metrics:
+            return self.sku_clusters
+        tier, pattern = self._assign_codes(self.config, self.use_percentiles)
+        
+        labels = np.array([
+            [config.get_cluster_label(t, p) for p in self.PATTERNS] for t in self.TIERS
+        ], dtype=object)
+        m = self.metrics
+        
+        self.sku_clusters = {
+            sku: SKUCluster(
                 sku=sku,
                 volume_tier=volume_tier,
                 pattern_type=pattern_type,
-                total_volume=metrics["total_volume"],
-                cv=metrics["cv"],
-                q4_concentration=metrics["q4_concentration"],
+                total_volume=total_volume,
+                cv=cv,
+                q4_concentration=q4_concentration,
                 cluster_label=cluster_label
             )
+            for sku, volume_tier, pattern_type, total_volume, cv, q4_concentration, cluster_label in zip(
+                m["sku"].tolist(),
+                np.array(self.TIERS)[tier].tolist(),
+                np.array(self.PATTERNS)[pattern].tolist(),
+                m["total_volume"].tolist(),
+                m["cv"].tolist(),
+                m["q4_concentration"].tolist(),
+                labels[tier, pattern].tolist()
+            )
+        }
         
         # calculate summary
-        self._calculate_cluster_summary()
+        self._build_index(tier, pattern)
+        self.cluster_summary = self._summarize(tier, pattern)
         
         return self.sku_clusters
     
+    def preview_counts(self, cluster_config: Dict) -> Dict[Tuple[str, str], Dict]:
+        # cluster sizes under thresholds that are not applied yet
+        if not self.metrics:
+            return {}
+        use_percentiles = cluster_config.get("use_percentiles", self.use_percentiles)
+        tier, pattern = self._assign_codes(cluster_config, use_percentiles)
+        return self._summarize(tier, pattern)
+    
     def _calculate_sku_metrics(self, 
                                df: pd.DataFrame, 
                                sku_col: str, 
                                date_col: str, 
-                               qty_col: str) -> Dict[str, Dict]:
-        # calculate clustering metrics for each sku
-        metrics = {}
+                               qty_col: str) -> Tuple[Dict[str, np.ndarray], Optional[pd.Index]]:
+        # calculate clustering metrics for each sku with category codes when shared
+        parts = []
+        indexes = []
         
-        # group by sku
-        for sku, group in df.groupby(sku_col):
-            total_volume = group[qty_col].sum()
-            mean_volume = group[qty_col].mean()
-            std_volume = group[qty_col].std()
+        # one grouped aggregation per frame or shard covers every sku inside it
+        for part in iter_frames(df):
+            quantity = part[qty_col]
             
-            # coefficient of variation
-            cv = std_volume / mean_volume if mean_volume > 0 else 0
+            # month parsed once per part and q4 volume summed through a mask
+            month = pd.to_datetime(part[date_col]).dt.month.to_numpy()
+            in_q4 = np.isin(month, [10, 11, 12])
+            grouped = pd.DataFrame({
+                "qty": quantity,
+                "q4": quantity.where(in_q4)
+            }).groupby(part[sku_col], observed=True)
             
-            # q4 concentration for seasonality detection
-            group_with_month = group.copy()
-            group_with_month["month"] = pd.to_datetime(group[date_col]).dt.month
-            q4_volume = group_with_month[group_with_month["month"].isin([10, 11, 12])][qty_col].sum()
-            q4_concentration = q4_volume / total_volume if total_volume > 0 else 0
+            stats = grouped["qty"].agg(["sum", "mean", "std", "size"])
+            total_volume = stats["sum"].to_numpy()
+            mean_volume = stats["mean"].to_numpy()
+            std_volume = stats["std"].to_numpy()
+            q4_volume = grouped["q4"].sum().to_numpy()
+            indexes.append(stats.index)
             
-            metrics[sku] = {
-                "total_volume": total_volume,
-                "mean_volume": mean_volume,
-                "std_volume": std_volume,
-                "cv": cv,
-                "q4_concentration": q4_concentration,
-                "data_points": len(group)
-            }
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parts.append({
+                    "sku": np.asarray(stats.index, dtype=object),
+                    "total_volume": total_volume,
+                    "mean_volume": mean_volume,
+                    "std_volume": std_volume,
+                    # coefficient of variation
+                    "cv": np.where(mean_volume > 0, std_volume / mean_volume, 0),
+                    # q4 concentration for seasonality detection
+                    "q4_concentration": np.where(total_volume > 0, q4_volume / total_volume, 0),
+                    "data_points": stats["size"].to_numpy()
+                })
         
-        return metrics
+        if not parts:
+            empty = np.array([])
+            return {key: empty for key in ["sku", "total_volume", "mean_volume", "std_volume",
+                                           "cv", "q4_concentration", "data_points"]}, None
+        metrics = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+        
+        # frames and shards of the processed data share one category index
+        if all(isinstance(i, pd.CategoricalIndex) and i.categories.equals(indexes[0].categories) for i in indexes):
+            metrics["code"] = np.concatenate([i.codes for i in indexes])
+            return metrics, indexes[0].categories
+        return metrics, None
     
-    def _calculate_percentile_thresholds(self, sku_metrics: Dict) -> Dict[str, float]:
-        # calculate volume thresholds based on percentiles
-        volumes = [m["total_volume"] for m in sku_metrics.values()]
-        volumes_sorted = sorted(volumes, reverse=True)
+    def _set_metrics(self, metrics: Dict[str, np.ndarray], sku_index: Optional[pd.Index] = None) -> None:
+        # cache metric arrays with sku codes and volumes sorted once for percentile lookups
+        if sku_index is None:
+            codes, uniques = pd.factorize(metrics["sku"], sort=True)
+            sku_index = pd.Index(uniques, dtype=object)
+            metrics["code"] = codes
+        metrics["code"] = metrics["code"].astype(np.int32)
+        
+        self.metrics = metrics
+        self.sku_index = sku_index
+        self._sorted_volumes = np.sort(metrics["total_volume"].astype(float))[::-1]
+    
+    # ---------- ASSIGNMENT ----------
+    
+    def _assign_codes(self, cluster_config: Dict, use_percentiles: bool) -> Tuple[np.ndarray, np.ndarray]:
+        # tier and pattern positions of every sku in one pass over the arrays
+        
+        # determine volume thresholds
+        if use_percentiles:
+            volume_thresholds = self._calculate_percentile_thresholds(cluster_config["volume_percentiles"])
+        else:
+            volume_thresholds = cluster_config["volume_thresholds"]
         
+        tier = self._assign_volume_tiers(self.metrics["total_volume"], volume_thresholds)
+        pattern = self._assign_pattern_types(
+            self.metrics["cv"], self.metrics["q4_concentration"], cluster_config["pattern_thresholds"]
+        )
+        return tier, pattern
+    
+    def _calculate_percentile_thresholds(self, percentiles: Dict[str, float]) -> Dict[str, float]:
+        # calculate volume thresholds based on percentiles
+        volumes_sorted = self._sorted_volumes
         n = len(volumes_sorted)
-        a_percentile = self.config["volume_percentiles"]["A"]
-        b_percentile = self.config["volume_percentiles"]["B"]
+        if n == 0:
+            return {"A": 0, "B": 0, "C": 0}
         
         # find threshold values
-        a_idx = int(n * (100 - a_percentile) / 100)
-        b_idx = int(n * (100 - b_percentile) / 100)
+        a_idx = int(n * (100 - percentiles["A"]) / 100)
+        b_idx = int(n * (100 - percentiles["B"]) / 100)
         
         return {
             "A": volumes_sorted[min(a_idx, n - 1)],
@@ -135,54 +222,98 @@ class RuleClustering:
             "C": 0
         }
     
-    def _assign_volume_tier(self, volume: float, thresholds: Dict[str, float]) -> str:
-        # assign volume tier based on thresholds
-        if volume >= thresholds["A"]:
-            return "A"
-        elif volume >= thresholds["B"]:
-            return "B"
-        else:
-            return "C"
+    def _assign_volume_tiers(self, volumes: np.ndarray, thresholds: Dict[str, float]) -> np.ndarray:
+        # tier position per sku based on thresholds
+        return np.select([volumes >= thresholds["A"], volumes >= thresholds["B"]], [0, 1], 2)
     
-    def _assign_pattern_type(self, cv: float, q4_concentration: float) -> str:
-        # assign pattern type based on metrics
-        thresholds = self.config["pattern_thresholds"]
-        
-        # check for strong seasonality first
-        if q4_concentration >= thresholds["seasonal"]:
-            return "seasonal"
-        
-        # check volatility
-        if cv >= thresholds["erratic"]:
-            return "erratic"
-        elif cv >= thresholds["variable"]:
-            return "variable"
-        else:
-            return "steady"
+    def _assign_pattern_types(self,
+                              cv: np.ndarray,
+                              q4_concentration: np.ndarray,
+                              thresholds: Dict[str, float]) -> np.ndarray:
+        # pattern position per sku with strong seasonality checked first then volatility
+        return np.select(
+            [
+                q4_concentration >= thresholds["seasonal"],
+                cv >= thresholds["erratic"],
+                cv >= thresholds["variable"]
+            ],
+            [0, 1, 2],
+            3
+        )
     
     # ---------- CLUSTER SUMMARY ----------
     
     def _calculate_cluster_summary(self) -> None:
-        # calculate summary statistics for each cluster
-        self.cluster_summary = {}
+        # calculate summary statistics for each cluster from the sku clusters
+        clusters = list(self.sku_clusters.values())
         
-        # group by volume tier and pattern type
-        for cluster in self.sku_clusters.values():
-            key = (cluster.volume_tier, cluster.pattern_type)
-            
-            if key not in self.cluster_summary:
-                self.cluster_summary[key] = {
-                    "volume_tier": cluster.volume_tier,
-                    "pattern_type": cluster.pattern_type,
-                    "label": cluster.cluster_label,
-                    "sku_count": 0,
-                    "total_volume": 0,
-                    "skus": []
-                }
-            
-            self.cluster_summary[key]["sku_count"] += 1
-            self.cluster_summary[key]["total_volume"] += cluster.total_volume
-            self.cluster_summary[key]["skus"].append(cluster.sku)
+        # restored clusters carry the metrics needed for re-thresholding
+        self._set_metrics({
+            "sku": np.array([c.sku for c in clusters], dtype=object),
+            "total_volume": np.array([c.total_volume for c in clusters], dtype=float),
+            "cv": np.array([c.cv for c in clusters], dtype=float),
+            "q4_concentration": np.array([c.q4_concentration for c in clusters], dtype=float)
+        })
+        tier = np.array([self.TIERS.index(c.volume_tier) for c in clusters], dtype=np.int64)
+        pattern = np.array([self.PATTERNS.index(c.pattern_type) for c in clusters], dtype=np.int64)
+        self._build_index(tier, pattern)
+        self.cluster_summary = self._summarize(tier, pattern)
+    
+    def _summarize(self, tier: np.ndarray, pattern: np.ndarray) -> Dict[Tuple[str, str], Dict]:
+        # sku count and volume per tier and pattern cell with members left to the cell index
+        n_patterns = len(self.PATTERNS)
+        cell = tier * n_patterns + pattern
+        n_cells = len(self.TIERS) * n_patterns
+        counts = np.bincount(cell, minlength=n_cells)
+        volumes = np.bincount(cell, weights=self.metrics["total_volume"].astype(float), minlength=n_cells)
+        
+        summary = {}
+        for i in np.flatnonzero(counts):
+            volume_tier, pattern_type = self.TIERS[i // n_patterns], self.PATTERNS[i % n_patterns]
+            summary[(volume_tier, pattern_type)] = {
+                "volume_tier": volume_tier,
+                "pattern_type": pattern_type,
+                "label": config.get_cluster_label(volume_tier, pattern_type),
+                "sku_count": int(counts[i]),
+                "total_volume": float(volumes[i])
+            }
+        return summary
+    
+    # ---------- INDEXES ----------
+    
+    def _build_index(self, tier: np.ndarray, pattern: np.ndarray) -> None:
+        # sku codes per tier pattern and cell plus code to row from stable sorts
+        codes = self.metrics["code"]
+        self._code_rows = np.full(len(self.sku_index), -1, dtype=np.int32)
+        self._code_rows[codes] = np.arange(len(codes), dtype=np.int32)
+        self._tier_codes = tier.astype(np.int8)
+        self._tier_mapping = None
+        
+        self._tier_members = self._group_codes(tier, self.TIERS)
+        self._pattern_members = self._group_codes(pattern, self.PATTERNS)
+        cells = self._group_codes(
+            tier * len(self.PATTERNS) + pattern,
+            [(t, p) for t in self.TIERS for p in self.PATTERNS]
+        )
+        self._cell_members = {key: members for key, members in cells.items() if len(members)}
+    
+    def _group_codes(self, keys_of_rows: np.ndarray, keys: List[Any]) -> Dict[Any, np.ndarray]:
+        # read only sku codes of each key in row order
+        order = np.argsort(keys_of_rows, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(keys_of_rows, minlength=len(keys)))])
+        members = self.metrics["code"][order]
+        members.setflags(write=False)
+        return {key: members[bounds[i]:bounds[i + 1]] for i, key in enumerate(keys)}
+    
+    def _no_codes(self) -> np.ndarray:
+        # empty read only member array
+        empty = np.zeros(0, dtype=np.int32)
+        empty.setflags(write=False)
+        return empty
+    
+    def _labels_of(self, codes: np.ndarray) -> Tuple[str, ...]:
+        # sku labels of codes resolved for display
+        return tuple(self.sku_index.take(codes).tolist())
     
     def get_cluster_summary(self) -> List[Dict]:
         # get cluster summary as list
@@ -215,25 +346,57 @@ class RuleClustering:
     
     # ---------- FILTERING ----------
     
-    def get_skus_by_tier(self, tier: str) -> List[str]:
-        # get all skus in volume tier
-        return [c.sku for c in self.sku_clusters.values() if c.volume_tier == tier]
+    def get_codes_by_tier(self, tier: str) -> np.ndarray:
+        # read only sku codes in volume tier from the tier index
+        return self._tier_members.get(tier, self._no_codes())
+    
+    def get_codes_by_pattern(self, pattern: str) -> np.ndarray:
+        # read only sku codes with pattern type from the pattern index
+        return self._pattern_members.get(pattern, self._no_codes())
     
-    def get_skus_by_pattern(self, pattern: str) -> List[str]:
-        # get all skus with pattern type
-        return [c.sku for c in self.sku_clusters.values() if c.pattern_type == pattern]
+    def get_codes_by_cluster(self, tier: str, pattern: str) -> np.ndarray:
+        # read only sku codes matching both tier and pattern from the cell index
+        return self._cell_members.get((tier, pattern), self._no_codes())
     
-    def get_skus_by_cluster(self, tier: str, pattern: str) -> List[str]:
-        # get skus matching both tier and pattern
-        return [
-            c.sku for c in self.sku_clusters.values() 
-            if c.volume_tier == tier and c.pattern_type == pattern
-        ]
+    def get_skus_by_tier(self, tier: str) -> Tuple[str, ...]:
+        # get all skus in volume tier from the tier index
+        return self._labels_of(self.get_codes_by_tier(tier))
+    
+    def get_skus_by_pattern(self, pattern: str) -> Tuple[str, ...]:
+        # get all skus with pattern type from the pattern index
+        return self._labels_of(self.get_codes_by_pattern(pattern))
+    
+    def get_skus_by_cluster(self, tier: str, pattern: str) -> Tuple[str, ...]:
+        # get skus matching both tier and pattern from the cell index
+        return self._labels_of(self.get_codes_by_cluster(tier, pattern))
     
     def get_cluster_for_sku(self, sku: str) -> Optional[SKUCluster]:
         # get cluster info for single sku
         return self.sku_clusters.get(sku)
     
+    def get_sku_code(self, sku: str) -> int:
+        # code of a sku in the sku index or -1
+        return label_code(self.sku_index, sku)
+    
+    def get_sku_row(self, sku: str) -> int:
+        # position of a sku in the metric arrays or -1
+        code = self.get_sku_code(sku)
+        return -1 if code < 0 else int(self._code_rows[code])
+    
+    def get_tier(self, sku: str, default: str = "C") -> str:
+        # volume tier of one sku
+        row = self.get_sku_row(sku)
+        return default if row < 0 else self.TIERS[self._tier_codes[row]]
+    
+    def get_tier_mapping(self) -> TierMapping:
+        # sku to volume tier mapping keyed by code built once per assignment and shared by callers
+        if self._tier_mapping is None:
+            tier_by_code = np.full(len(self.sku_index), -1, dtype=np.int8)
+            if self.metrics:
+                tier_by_code[self.metrics["code"]] = self._tier_codes
+            self._tier_mapping = TierMapping(self.sku_index, tier_by_code)
+        return self._tier_mapping
+    
     # ---------- THRESHOLD ADJUSTMENT ----------
     
     def update_volume_thresholds(self, new_thresholds: Dict[str, float]) -> None:
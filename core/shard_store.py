@@ -0,0 +1,333 @@
+"""
+shard store module
+snapshot of processed data written to disk in sku hash shards for batch scans
+shards hydrate on demand and scans stream them under one memory budget
+new data versions rewrite only the shards of changed skus
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Iterator, Iterable, Any
+
+import config
+
+
+# ============================================================================
+#                               SHARD STORE
+# ============================================================================
+
+class ShardStore:
+    # read only snapshot of processed data split into sku shards on disk
+    
+    def __init__(self, root: Optional[Path] = None, budget_mb: Optional[float] = None):
+        # initialize empty store with its own shard directory
+        base = Path(root) if root else config.CACHE_DIR / "shards"
+        base.mkdir(parents=True, exist_ok=True)
+        self.root = Path(tempfile.mkdtemp(prefix="store_", dir=base))
+        self.budget_bytes = int((budget_mb or config.PERFORMANCE["cache_size_mb"]) * 1024 * 1024)
+        
+        self.key_col = None
+        self.version = 0
+        self.n_rows = 0
+        self.columns: List[str] = []
+        self.categories: Dict[str, pd.Index] = {}
+        self.shard_rows: List[int] = []
+        self.shard_keys: List[np.ndarray] = []
+        self._key_shard: Dict[Any, int] = {}
+        
+        # category index each shard's codes were written against
+        self._shard_categories: List[Dict[str, pd.Index]] = []
+        self._dtypes: Dict[str, Any] = {}
+        self._key_filter: Optional[pd.Index] = None
+        
+        self._cache: "OrderedDict[int, pd.DataFrame]" = OrderedDict()
+        self._cache_bytes: Dict[int, int] = {}
+        
+        # bytes of shards handed out by running scans outside the cache
+        self._streamed_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        
+        # files go with the last reference so running workers keep their snapshot
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.root), True)
+    
+    # ---------- WRITING ----------
+    
+    @classmethod
+    def build(cls,
+              df: pd.DataFrame,
+              key_col: str,
+              version: int = 0,
+              n_shards: Optional[int] = None,
+              root: Optional[Path] = None,
+              budget_mb: Optional[float] = None) -> "ShardStore":
+        # write frame into shards of whole skus
+        store = cls(root, budget_mb)
+        store.write(df, key_col, version, n_shards)
+        return store
+    
+    def write(self,
+              df: pd.DataFrame,
+              key_col: str,
+              version: int = 0,
+              n_shards: Optional[int] = None) -> None:
+        # split rows by hashed sku label and write one parquet file per shard
+        if n_shards is None:
+            n_shards = -(-df[key_col].nunique() // config.PERFORMANCE["max_skus_in_memory"])
+        self._write_shards(df, key_col, version, max(1, n_shards))
+    
+    def update(self, df: pd.DataFrame, keys: Iterable[Any], version: int) -> "ShardStore":
+        # new snapshot that rewrites shards holding changed skus and links the rest
+        store = ShardStore(self.root.parent, self.budget_bytes / (1024 * 1024))
+        
+        # schema changes touch every shard so nothing can be linked
+        same_schema = list(df.columns) == self.columns and all(
+            df[col].dtype == self._dtypes[col] for col in self.columns if col not in self.categories
+        )
+        changed = None
+        if same_schema and self.n_shards:
+            changed = set(self._hash_keys(list(keys), self.n_shards).tolist())
+        
+        store._write_shards(df, self.key_col, version, self.n_shards or 1, changed, self)
+        return store
+    
+    def _write_shards(self,
+                      df: pd.DataFrame,
+                      key_col: str,
+                      version: int,
+                      n_shards: int,
+                      changed: Optional[set] = None,
+                      source: Optional["ShardStore"] = None) -> None:
+        # write every shard or only changed ones while linking the files of source
+        self.key_col = key_col
+        self.version = version
+        self.n_rows = len(df)
+        self.columns = list(df.columns)
+        self._dtypes = df.dtypes.to_dict()
+        
+        codes, labels = pd.factorize(df[key_col])
+        labels = np.asarray(labels, dtype=object)
+        
+        # label hash keeps a sku in the same shard across rebuilds
+        label_shard = self._hash_keys(labels, n_shards)
+        row_shard = np.append(label_shard, n_shards)[codes]
+        order = np.argsort(row_shard, kind="stable")
+        bounds = np.searchsorted(row_shard[order], np.arange(n_shards + 1))
+        
+        # categorical columns are stored as codes with one shared category index
+        self.categories = {
+            col: df[col].cat.categories for col in df.columns
+            if isinstance(df[col].dtype, pd.CategoricalDtype)
+        }
+        
+        self.shard_rows = []
+        self.shard_keys = []
+        self._shard_categories = []
+        for i in range(n_shards):
+            if changed is not None and i not in changed:
+                self._link_shard(i, source)
+            else:
+                part = df.take(order[bounds[i]:bounds[i + 1]])
+                for col in self.categories:
+                    part[col] = part[col].cat.codes
+                part.to_parquet(self._shard_path(i), index=True)
+                self.shard_rows.append(len(part))
+                self._shard_categories.append(self.categories)
+            self.shard_keys.append(labels[label_shard == i])
+        
+        self._key_shard = dict(zip(labels.tolist(), label_shard.tolist()))
+        self.clear_cache()
+    
+    def _link_shard(self, shard: int, source: "ShardStore") -> None:
+        # reuse an unchanged shard file of an older snapshot
+        target = self._shard_path(shard)
+        try:
+            os.link(source._shard_path(shard), target)
+        except OSError:
+            shutil.copyfile(source._shard_path(shard), target)
+        self.shard_rows.append(source.shard_rows[shard])
+        self._shard_categories.append(source._shard_categories[shard])
+    
+    @staticmethod
+    def _hash_keys(keys: Any, n_shards: int) -> np.ndarray:
+        # shard of each sku label
+        text = pd.Index(np.asarray(keys, dtype=object)).astype(str).to_numpy()
+        return (pd.util.hash_array(text) % n_shards).astype(np.int64)
+    
+    def _shard_path(self, shard: int) -> Path:
+        # file of one shard
+        return self.root / f"shard_{shard:04d}.parquet"
+    
+    # ---------- HYDRATION ----------
+    
+    @property
+    def n_shards(self) -> int:
+        # number of shards written
+        return len(self.shard_rows)
+    
+    @property
+    def n_keys(self) -> int:
+        # number of skus across all shards
+        return len(self._key_shard)
+    
+    def get_shard(self, shard: int) -> pd.DataFrame:
+        # hydrate shard from disk or the lru cache
+        with self._lock:
+            if shard in self._cache:
+                self._cache.move_to_end(shard)
+                self.hits += 1
+                return self._cache[shard]
+        
+        df = self._read_shard(shard)
+        
+        with self._lock:
+            self._cache[shard] = df
+            self._cache_bytes[shard] = self._frame_bytes(df)
+            self._evict(keep=1)
+        return df
+    
+    def _read_shard(self, shard: int) -> pd.DataFrame:
+        # load one shard file restoring categories from the shared index
+        df = pd.read_parquet(self._shard_path(shard))
+        written = self._shard_categories[shard]
+        for col, categories in self.categories.items():
+            codes = df[col].to_numpy()
+            if written[col] is not categories:
+                # linked shards carry codes of an older category index
+                codes = np.append(categories.get_indexer(written[col]), -1)[codes]
+            df[col] = pd.Categorical.from_codes(codes, categories=categories)
+        if self._key_filter is not None:
+            df = df[df[self.key_col].isin(self._key_filter)]
+        
+        with self._lock:
+            self.loads += 1
+        return df
+    
+    @staticmethod
+    def _frame_bytes(df: pd.DataFrame) -> int:
+        # shallow bytes of a hydrated shard
+        return int(df.memory_usage(index=True, deep=False).sum())
+    
+    def _evict(self, keep: int = 0) -> None:
+        # drop least recently used shards until cached and streamed shards fit the budget
+        while (len(self._cache) > keep
+               and sum(self._cache_bytes.values()) + self._streamed_bytes > self.budget_bytes):
+            shard, _ = self._cache.popitem(last=False)
+            del self._cache_bytes[shard]
+    
+    def cached_shards(self) -> List[int]:
+        # shards in memory from least to most recently used
+        with self._lock:
+            return list(self._cache)
+    
+    def get_memory_bytes(self) -> int:
+        # bytes of hydrated shards in the cache and in running scans
+        with self._lock:
+            return sum(self._cache_bytes.values()) + self._streamed_bytes
+    
+    def clear_cache(self) -> None:
+        # release all hydrated shards
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes.clear()
+    
+    # ---------- ACCESS ----------
+    
+    def iter_shards(self) -> Iterator[pd.DataFrame]:
+        # hydrate shards one after another without keeping them in the cache
+        for shard in range(self.n_shards):
+            if not self.shard_rows[shard]:
+                continue
+            with self._lock:
+                cached = self._cache.get(shard)
+            if cached is not None:
+                yield cached
+                continue
+            
+            # the streamed shard counts against the budget until the scan moves on
+            df = self._read_shard(shard)
+            nbytes = self._frame_bytes(df)
+            with self._lock:
+                self._streamed_bytes += nbytes
+                self._evict()
+            try:
+                yield df
+            finally:
+                with self._lock:
+                    self._streamed_bytes -= nbytes
+                del df
+    
+    def shard_of(self, key: Any) -> Optional[int]:
+        # shard holding a sku
+        return self._key_shard.get(key)
+    
+    def get_keys(self) -> np.ndarray:
+        # every sku grouped by shard
+        if not self.shard_keys:
+            return np.array([], dtype=object)
+        return np.concatenate(self.shard_keys)
+    
+    def get_group(self, key: Any) -> pd.DataFrame:
+        # rows of one sku hydrating only its shard
+        shard = self.shard_of(key)
+        if shard is None:
+            return pd.DataFrame(columns=self.columns)
+        df = self.get_shard(shard)
+        return df[df[self.key_col] == key].copy()
+    
+    def select(self, keys: List[Any]) -> pd.DataFrame:
+        # rows of several skus from the shards that hold them
+        by_shard: Dict[int, List[Any]] = {}
+        for key in keys:
+            shard = self.shard_of(key)
+            if shard is not None:
+                by_shard.setdefault(shard, []).append(key)
+        
+        parts = []
+        for shard in sorted(by_shard):
+            df = self.get_shard(shard)
+            parts.append(df[df[self.key_col].isin(by_shard[shard])])
+        if not parts:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(parts)
+    
+    def subset(self, keys: List[Any]) -> "ShardStore":
+        # view of some skus over the same files that hydrates only their rows
+        view = ShardStore.__new__(ShardStore)
+        view.__dict__.update(self.__dict__)
+        view._key_filter = pd.Index(keys).unique()
+        view.shard_keys = [k[view._key_filter.get_indexer(k) >= 0] for k in self.shard_keys]
+        view._key_shard = {key: self._key_shard[key] for key in keys if key in self._key_shard}
+        
+        # row counts stay per whole shard and shards without chosen skus are skipped
+        view.shard_rows = [rows if len(k) else 0 for rows, k in zip(self.shard_rows, view.shard_keys)]
+        view.n_rows = sum(view.shard_rows)
+        
+        view._cache = OrderedDict()
+        view._cache_bytes = {}
+        view._streamed_bytes = 0
+        view._lock = threading.Lock()
+        view.hits = 0
+        view.loads = 0
+        
+        # the parent owns the files and lives as long as the view
+        view._parent = self
+        view._finalizer = lambda: None
+        return view
+    
+    def __len__(self) -> int:
+        # number of rows in store
+        return self.n_rows
+    
+    def close(self) -> None:
+        # release cache and delete shard files
+        self.clear_cache()
+        self._finalizer()
@@ -0,0 +1,131 @@
+"""
+tier index module
+abc volume tiers computed once per data version
+shared by classification navigator sparklines and forecasting
+"""
+
+import pandas as pd
+import numpy as np
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+import config
+from core.identifiers import label_code
+
+
+# ============================================================================
+#                              TIER MAPPING
+# ============================================================================
+
+class TierMapping(Mapping):
+    # sku to tier lookup held as one tier code per sku code instead of a label dict
+    
+    TIERS = ["A", "B", "C"]
+    
+    def __init__(self, labels: pd.Index, tier_codes: np.ndarray):
+        # sku labels by code and tier position per code with -1 where unassigned
+        self.labels = labels
+        self.tier_codes = np.asarray(tier_codes, dtype=np.int8)
+        self.tier_codes.setflags(write=False)
+    
+    def __getitem__(self, sku: Any) -> str:
+        # tier of one sku resolved through its code
+        code = label_code(self.labels, sku)
+        if code < 0 or self.tier_codes[code] < 0:
+            raise KeyError(sku)
+        return self.TIERS[self.tier_codes[code]]
+    
+    def __iter__(self) -> Iterator[str]:
+        # labels of assigned skus in code order
+        return iter(self.labels[self.tier_codes >= 0])
+    
+    def __len__(self) -> int:
+        # number of assigned skus
+        return int(np.count_nonzero(self.tier_codes >= 0))
+
+
+# ============================================================================
+#                              TIER INDEX
+# ============================================================================
+
+class TierIndex:
+    # abc tier of every sku with constant time lookup and per tier arrays
+    
+    TIERS = ["A", "B", "C"]
+    
+    def __init__(self, skus: np.ndarray, volumes: np.ndarray, tier_codes: np.ndarray, version: int = 0):
+        # skus volumes and tier codes ordered by volume descending
+        self.skus = skus
+        self.volumes = volumes
+        self.tier_codes = tier_codes
+        self.version = version
+        
+        self._arrays = {tier: skus[tier_codes == i] for i, tier in enumerate(self.TIERS)}
+        
+        # arrays are shared with every caller so edits would corrupt the index
+        for values in self._arrays.values():
+            values.setflags(write=False)
+        self._lookup = TierMapping(pd.Index(skus), tier_codes)
+        self._metadata = None
+    
+    @classmethod
+    def build(cls,
+              sku_values: pd.Series,
+              quantities: pd.Series,
+              version: int = 0) -> "TierIndex":
+        # rank skus by total volume with cumulative share boundaries
+        codes, uniques = pd.factorize(sku_values, sort=True)
+        qty = pd.to_numeric(quantities, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        
+        valid = codes >= 0
+        volumes = np.bincount(codes[valid], weights=np.nan_to_num(qty[valid]), minlength=len(uniques))
+        
+        # stable sort keeps ties in sku order
+        order = np.argsort(-volumes, kind="stable")
+        volumes = volumes[order]
+        skus = np.asarray(uniques, dtype=object)[order]
+        
+        tier_codes = np.full(len(skus), 2, dtype=np.int8)
+        total = volumes.sum()
+        if total > 0:
+            # running max keeps the share sorted when returns make volumes negative
+            cumulative_pct = np.maximum.accumulate(np.cumsum(volumes) / total * 100)
+            
+            a_threshold = config.CLUSTERING["volume_percentiles"]["A"]
+            b_threshold = config.CLUSTERING["volume_percentiles"]["B"]
+            a_end = np.searchsorted(cumulative_pct, a_threshold, side="right")
+            b_end = np.searchsorted(cumulative_pct, a_threshold + b_threshold, side="right")
+            
+            tier_codes[:a_end] = 0
+            tier_codes[a_end:b_end] = 1
+        
+        return cls(skus, volumes, tier_codes, version)
+    
+    # ---------- LOOKUP ----------
+    
+    def get_tier(self, sku: str, default: str = "C") -> str:
+        # tier of one sku
+        return self._lookup.get(sku, default)
+    
+    def get_skus(self, tier: str) -> np.ndarray:
+        # skus of tier ordered by volume descending
+        return self._arrays.get(tier, np.array([], dtype=object))
+    
+    def get_mapping(self) -> TierMapping:
+        # sku to tier mapping keyed by code shared by callers
+        return self._lookup
+    
+    def get_metadata(self) -> Dict[str, Dict[str, str]]:
+        # per sku navigator metadata built once
+        if self._metadata is None:
+            tiers = np.array(self.TIERS)[self.tier_codes].tolist()
+            self._metadata = {sku: {"tier": tier} for sku, tier in zip(self.skus.tolist(), tiers)}
+        return self._metadata
+    
+    def counts(self) -> Dict[str, int]:
+        # number of skus per tier
+        return {tier: len(skus) for tier, skus in self._arrays.items()}
+    
+    def to_dict(self) -> Dict[str, List[str]]:
+        # tiers as lists of skus
+        return {tier: skus.tolist() for tier, skus in self._arrays.items()}
@@ -8,18 +8,24 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import sys
+import threading
 from pathlib import Path
 
 # add project root to path before any other imports
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+import config
 from core.data_processor import DataProcessor
+from core.dtype_optimizer import DtypeOptimizer
+from core.shard_store import ShardStore
 from core.column_detector import ColumnDetector
 from core.rule_clustering import RuleClustering
 from core.feature_engineer import FeatureEngineer
 from core.forecaster import Forecaster
 from core.anomaly_detector import AnomalyDetector
+from core.anomaly_engine import AnomalyEngine
+from core.anomaly_store import AnomalyStore
 
 
 # ============================================================================
@@ -110,6 +116,173 @@ class TestDataProcessor:
         total = len(classification["A"]) + len(classification["B"]) + len(classification["C"])
         assert total == len(processor.sku_list)
     
+    def test_tier_index_cached(self, processor):
+        # test vectorized tiers match cumulative volume rule and follow data changes
+        volume = processor.processed_data.groupby("sku", observed=True)["quantity"].sum().sort_values(ascending=False)
+        cumulative = volume.cumsum() / volume.sum() * 100
+        expected_a = set(cumulative[cumulative <= 80].index)
+        
+        tiers = processor.get_tier_index()
+        assert set(tiers.get_skus("A")) == expected_a
+        assert processor.get_tier_index() is tiers
+        
+        sku = tiers.get_skus("A")[0]
+        assert processor.get_tier(sku) == "A"
+        assert processor.get_tier_mapping()[sku] == "A"
+        
+        # a fix bumps the data version and rebuilds the index
+        processor.apply_fix("fix_negatives", method="zero")
+        assert processor.get_tier_index() is not tiers
+    
+    def test_identifiers_categorical(self, processor, sample_data):
+        # test sku and category columns hold sorted codes with labels at the edges
+        df = processor.processed_data
+        assert isinstance(df["sku"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["category"].dtype, pd.CategoricalDtype)
+        assert processor.sku_list == sorted(sample_data["sku"].unique())
+        assert df["sku"].memory_usage(deep=True) < df["sku"].astype(object).memory_usage(deep=True) / 4
+        
+        sku = processor.sku_list[3]
+        assert (processor.get_sku_data(sku)["sku"] == sku).all()
+        assert len(processor.get_sku_data(sku)) == int((sample_data["sku"] == sku).sum())
+        
+        # padded labels merge and auto categories come from sku prefixes
+        raw = sample_data.drop(columns=["category"]).copy()
+        raw["sku"] = " " + raw["sku"] + " "
+        other = DataProcessor()
+        other.raw_data = raw
+        other.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity"})
+        other.process_data()
+        assert other.sku_list == processor.sku_list
+        assert other.processed_data["auto_category"].cat.categories.tolist() == ["SKU"]
+    
+    def test_dtype_optimization(self, sample_data):
+        # test columns shrink only when values and sums stay exact
+        raw = sample_data.copy()
+        raw["price"] = 19.99
+        raw["cost"] = 0.25
+        raw["store"] = np.where(raw.index % 2, "north", "south")
+        proc = DataProcessor()
+        proc.raw_data = raw.copy()
+        proc.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity", "price": "price"})
+        proc.process_data()
+        
+        df = proc.processed_data
+        report = proc.dtype_report
+        assert df["quantity"].dtype == np.int32
+        assert report["quantity"]["saved"] == len(df) * 4
+        assert df["price"].dtype == np.float64
+        assert report["price"]["note"] == "large sums"
+        assert isinstance(df["store"].dtype, pd.CategoricalDtype)
+        assert report["store"]["saved"] > 0
+        assert proc.process_report["saved_mb"] > 0
+        
+        small = pd.DataFrame({"cost": [0.25, 1.5, np.nan], "flag": [0, 1, 1]})
+        DtypeOptimizer().optimize(small)
+        assert small["cost"].dtype == np.float32
+        assert small["flag"].dtype == np.int8
+        
+        # summed duplicates outgrowing the downcast column widen it
+        position = df.index.get_loc(df.index[0])
+        proc._write_values(df, "quantity", np.array([position]), np.array([2 ** 40]))
+        assert df["quantity"].iloc[0] == 2 ** 40
+    
+    def test_shard_store_hydration(self, processor, tmp_path, monkeypatch):
+        # test sku shards round trip and stay within the memory budget
+        df = processor.processed_data
+        store = ShardStore.build(df, "sku", n_shards=4, root=tmp_path, budget_mb=0.5)
+        assert store.n_shards == 4 and store.n_keys == len(processor.sku_list)
+        assert sum(store.shard_rows) == len(df)
+        
+        sku = processor.sku_list[7]
+        pd.testing.assert_frame_equal(store.get_group(sku), processor.get_sku_data(sku))
+        
+        # a full scan streams shards without filling the cache
+        # and evicts cached shards to keep the streamed one within budget
+        rows = 0
+        for shard in store.iter_shards():
+            rows += len(shard)
+            assert store.get_memory_bytes() >= store._frame_bytes(shard)
+            assert store.get_memory_bytes() <= store.budget_bytes or not store.cached_shards()
+        assert rows == len(df)
+        assert len(store.cached_shards()) <= 1
+        assert store.get_memory_bytes() == sum(store._cache_bytes.values())
+        
+        # batch pipelines give the same result from shards
+        clustering = RuleClustering()
+        from_store = clustering.cluster_skus(store, "sku", "date", "quantity")
+        from_frame = RuleClustering().cluster_skus(df, "sku", "date", "quantity")
+        assert {k: c.cluster_label for k, c in from_store.items()} == {k: c.cluster_label for k, c in from_frame.items()}
+        
+        # a subset hydrates only the chosen skus from the same files
+        chosen = processor.sku_list[:5]
+        subset = store.subset(chosen)
+        assert sorted(subset.get_keys()) == chosen
+        assert sorted(pd.concat(subset.iter_shards())["sku"].unique()) == chosen
+        
+        # the processor reuses its store until the data changes
+        monkeypatch.setitem(config.PERFORMANCE, "max_skus_in_memory", max(1, len(processor.sku_list) // 4))
+        cached = processor.get_shard_store()
+        assert processor.get_shard_store() is cached
+        root = cached.root
+        sku = processor.sku_list[3]
+        rows = np.flatnonzero((processor.processed_data["sku"] == sku).to_numpy())
+        processor.processed_data.iloc[rows[:2], processor.processed_data.columns.get_loc("quantity")] = -5
+        processor.data_version += 1
+        processor.data_changes.append({"version": processor.data_version, "kind": "test",
+                                       "skus": {sku}, "start": None, "end": None})
+        updated = processor.get_shard_store()
+        assert updated is not cached
+        
+        # only the shard holding the changed sku is written again
+        changed = updated.shard_of(sku)
+        for i in range(updated.n_shards):
+            same_file = updated._shard_path(i).stat().st_ino == cached._shard_path(i).stat().st_ino
+            assert same_file == (i != changed)
+        cached.close()
+        assert not root.exists()
+        assert updated.get_group(sku)["quantity"].iloc[0] == -5
+        for other in processor.sku_list[::9]:
+            pd.testing.assert_frame_equal(updated.get_group(other), processor.get_sku_data(other))
+        
+        # a new sku sorting first shifts category codes of linked shards
+        new_rows = processor.get_sku_data(processor.sku_list[0])[["date", "sku", "quantity", "category"]]
+        success, message = processor.append_data(new_rows.astype({"sku": str, "category": str}).assign(sku="AAA"))
+        assert success, message
+        appended = processor.get_shard_store()
+        linked = [appended._shard_path(i).stat().st_nlink > 1 for i in range(appended.n_shards)]
+        assert appended.n_shards >= 4 and sum(linked) == appended.n_shards - 1
+        assert not linked[appended.shard_of("AAA")]
+        for other in ["AAA"] + processor.sku_list[::9]:
+            pd.testing.assert_frame_equal(appended.get_group(other), processor.get_sku_data(other))
+    
+    def test_shard_snapshot_lock(self, processor, monkeypatch):
+        # test a fix waits until the snapshot of the current version is on disk
+        df = processor.processed_data
+        sku = df["sku"].iloc[0]
+        df.iloc[0, df.columns.get_loc("quantity")] = -5
+        version = processor.data_version
+        
+        write = ShardStore.write
+        workers = []
+        
+        def write_during_fix(store, frame, *args, **kwargs):
+            worker = threading.Thread(target=processor.apply_fix, args=("fix_negatives",))
+            worker.start()
+            worker.join(0.2)
+            workers.append(worker)
+            write(store, frame, *args, **kwargs)
+        
+        monkeypatch.setattr(ShardStore, "write", write_during_fix)
+        store = processor.get_shard_store()
+        assert workers[0].is_alive()
+        workers[0].join()
+        
+        # the snapshot keeps the values of its version while the fix lands after it
+        assert store.version == version and processor.data_version > version
+        assert store.get_group(sku)["quantity"].min() == -5
+        assert processor.get_sku_data(sku)["quantity"].min() >= 0
+    
     def test_get_sku_data(self, processor):
         # test getting single sku data
         sku = processor.sku_list[0]
@@ -117,6 +290,178 @@ class TestDataProcessor:
         
         assert not sku_data.empty
         assert "quantity" in sku_data.columns
+    
+    def test_process_string_dates(self, sample_data):
+        # test string dates parsed with detected format
+        raw = sample_data.copy()
+        raw["date"] = raw["date"].dt.strftime("%d/%m/%Y")
+        
+        proc = DataProcessor()
+        proc.raw_data = raw
+        proc.set_column_mapping({
+            "date": "date",
+            "sku": "sku",
+            "quantity": "quantity"
+        })
+        success, _ = proc.process_data()
+        
+        assert success
+        assert proc.date_format == "%d/%m/%Y"
+        assert proc.processed_data["date"].min() == pd.Timestamp("2022-01-01")
+        assert proc.processed_data["date"].max() == pd.Timestamp("2023-12-31")
+    
+    def test_process_releases_raw(self, sample_data):
+        # test single gather pass sorts rows and can drop raw data
+        raw = sample_data.sample(frac=1, random_state=1)
+        raw.loc[raw.index[:5], "date"] = pd.NaT
+        
+        proc = DataProcessor()
+        proc.raw_data = raw
+        proc.set_column_mapping({
+            "date": "date",
+            "sku": "sku",
+            "quantity": "quantity"
+        })
+        success, _ = proc.process_data(release_raw=True)
+        
+        assert success
+        assert proc.raw_data is None
+        assert len(proc.processed_data) == len(sample_data) - 5
+        
+        # rows ordered by sku then date
+        df = proc.processed_data
+        expected = df.sort_values(["sku", "date"], kind="stable")
+        assert df.index.equals(expected.index)
+        
+        report = proc.process_report
+        assert report["raw_released"]
+        assert report["peak_mb"] >= report["data_mb"] > 0
+        assert report["stage_peak_mb"] >= report["data_mb"]
+        assert report["peak_mb"] == pytest.approx(report["input_mb"] + report["stage_peak_mb"])
+        
+        # remapping after release reprocesses the processed frame
+        success, _ = proc.process_data()
+        assert success
+        assert len(proc.processed_data) == len(sample_data) - 5
+    
+    def test_quality_profile_updates_with_fixes(self, processor):
+        # test profile masks match direct checks and follow fixes
+        df = processor.processed_data
+        df.loc[df.index[:10], "quantity"] = -5
+        df.loc[df.index[10:13], "category"] = None
+        df.loc[df.index[20], "quantity"] = 1e6
+        processor.calculate_quality()
+        
+        profiler = processor.profiler
+        assert profiler.count("negative") == 10
+        assert profiler.count("missing") == 3
+        assert profiler.get_mask("outliers")[20]
+        assert profiler.get_memory_bytes() < len(df)
+        
+        success, _ = processor.apply_fix("fix_negatives", method="absolute")
+        assert success
+        assert profiler.is_current(processor.processed_data)
+        assert profiler.count("negative") == 0
+        assert (processor.processed_data["quantity"].iloc[:10] == 5).all()
+        
+        success, _ = processor.apply_fix("remove_outliers", method="remove")
+        assert success
+        assert profiler.is_current(processor.processed_data)
+        
+        # incremental profile agrees with a fresh one
+        df = processor.processed_data
+        incremental = processor.calculate_quality()
+        processor.profiler.reset()
+        fresh = processor.calculate_quality()
+        assert incremental == fresh
+        grouped = df.groupby("sku", observed=True)["quantity"]
+        z = (df["quantity"] - grouped.transform("mean")) / grouped.transform("std")
+        assert processor.profiler.count("outliers") == int((z.abs() > 3).sum())
+    
+    def test_fixes_per_sku_with_undo(self, processor):
+        # test fixes stay inside each sku and undo restores the frame
+        df = processor.processed_data
+        first_rows = df.groupby("sku", observed=True).head(1).index
+        df.loc[first_rows[1], "quantity"] = np.nan
+        dup = df.iloc[[5]].copy()
+        dup["quantity"] = 7
+        processor.processed_data = pd.concat([df.iloc[:6], dup, df.iloc[6:]])
+        original = processor.processed_data.copy()
+        
+        # first row of a sku has nothing earlier in its own sku to fill from
+        success, message = processor.apply_fix("fill_missing", method="ffill")
+        assert success
+        assert pd.isna(processor.processed_data.loc[first_rows[1], "quantity"])
+        
+        success, _ = processor.apply_fix("remove_duplicates", method="sum")
+        assert success
+        fixed = processor.processed_data
+        assert len(fixed) == len(original) - 1
+        assert fixed["quantity"].iloc[5] == original["quantity"].iloc[5] + 7
+        
+        success, _ = processor.apply_fix("fix_negatives", method="zero")
+        assert success
+        assert len(processor.fix_history) == 3
+        
+        for _ in range(3):
+            success, _ = processor.undo_fix()
+            assert success
+        pd.testing.assert_frame_equal(processor.processed_data, original, check_dtype=False)
+        assert not processor.undo_fix()[0]
+        
+        success, _ = processor.redo_fix()
+        success, _ = processor.redo_fix()
+        assert success
+        assert len(processor.processed_data) == len(original) - 1
+        assert len(processor.redo_history) == 1
+    
+    def test_fill_missing_mean_skips_text(self, processor):
+        # test mean fill uses item averages and leaves text columns alone
+        df = processor.processed_data
+        sku = processor.sku_list[0]
+        rows = df.index[(df["sku"] == sku).to_numpy()]
+        df.loc[rows[3], "quantity"] = np.nan
+        df.loc[rows[4], "category"] = np.nan
+        expected = df.loc[rows, "quantity"].mean()
+        
+        success, message = processor.apply_fix("fill_missing", method="mean")
+        assert success, message
+        fixed = processor.processed_data
+        assert fixed.loc[rows[3], "quantity"] == pytest.approx(expected, abs=1)
+        assert pd.isna(fixed.loc[rows[4], "category"])
+
+
+# ============================================================================
+#                          DATE UTILS TESTS
+# ============================================================================
+
+class TestDateUtils:
+    # date utils test cases
+    
+    def test_detect_date_format(self):
+        # test format detection from sample
+        from utils.date_utils import DateUtils
+        
+        series = pd.Series(["2023-01-15", "2023-02-20", "2023-03-31"])
+        assert DateUtils.detect_date_format(series) == "%Y-%m-%d"
+        
+        series = pd.Series(["Jan 15, 2023", "Feb 20, 2023"])
+        assert DateUtils.detect_date_format(series) == "%b %d, %Y"
+    
+    def test_parse_dates_broadcasts_uniques(self):
+        # test parsed values align with original rows
+        from utils.date_utils import DateUtils
+        
+        values = [f"{d:02d}.01.2024" for d in range(1, 11)]
+        series = pd.Series(values + ["31.12.2023", None, "31.12.2023", "bad"])
+        parsed, fmt = DateUtils.parse_dates(series)
+        
+        assert fmt == "%d.%m.%Y"
+        assert parsed.iloc[0] == pd.Timestamp("2024-01-01")
+        assert parsed.iloc[10] == pd.Timestamp("2023-12-31")
+        assert parsed.iloc[12] == pd.Timestamp("2023-12-31")
+        assert pd.isna(parsed.iloc[11])
+        assert pd.isna(parsed.iloc[13])
 
 
 # ============================================================================
@@ -152,6 +497,34 @@ class TestColumnDetector:
         assert "date" in mapping
         assert "sku" in mapping
         assert "quantity" in mapping
+    
+    def test_detection_sample_and_cache(self, sample_data, tmp_path, monkeypatch):
+        # test bounded sample and detection reuse for an unchanged file
+        detector = ColumnDetector()
+        sample = detector.sample_frame(sample_data, 500)
+        assert len(sample) == 500
+        assert sample.index.is_monotonic_increasing
+        
+        path = tmp_path / "sales.csv"
+        sample_data.head(2000).to_csv(path, index=False)
+        data = pd.read_csv(path)
+        fingerprint = ColumnDetector.source_fingerprint(str(path))
+        
+        detector.cache_path = tmp_path / "column_detection.json"
+        first = detector.detect_columns(data, fingerprint)
+        assert detector.cache_path.exists()
+        
+        # a fresh detector reads the disk cache without scoring
+        ColumnDetector._cache.clear()
+        reopened = ColumnDetector()
+        reopened.cache_path = detector.cache_path
+        monkeypatch.setattr(reopened, "_column_stats", lambda sample: pytest.fail("detection was not cached"))
+        cached = reopened.detect_columns(data, fingerprint)
+        assert reopened.get_best_mapping(cached) == detector.get_best_mapping(first)
+        
+        # a changed file gets a new fingerprint
+        sample_data.head(1000).to_csv(path, index=False)
+        assert ColumnDetector.source_fingerprint(str(path)) != fingerprint
 
 
 # ============================================================================
@@ -176,6 +549,48 @@ class TestRuleClustering:
             assert cluster.volume_tier in ["A", "B", "C"]
             assert cluster.pattern_type in ["seasonal", "erratic", "variable", "steady"]
     
+    def test_grouped_metrics(self, processor):
+        # test grouped metrics match a direct computation on one sku
+        df = processor.processed_data
+        df.loc[df.index[:40], "quantity"] = np.nan
+        clusters = RuleClustering().cluster_skus(df, "sku", "date", "quantity")
+        
+        for sku in processor.sku_list[:2]:
+            group = df[df["sku"] == sku]
+            q4 = group[group["date"].dt.month >= 10]["quantity"].sum()
+            cluster = clusters[sku]
+            assert cluster.total_volume == group["quantity"].sum()
+            assert cluster.cv == pytest.approx(group["quantity"].std() / group["quantity"].mean())
+            assert cluster.q4_concentration == pytest.approx(q4 / group["quantity"].sum())
+    
+    def test_rethreshold_from_cached_metrics(self, processor, monkeypatch):
+        # test new thresholds reassign clusters without recomputing metrics
+        clustering = RuleClustering()
+        clustering.cluster_skus(processor.processed_data, "sku", "date", "quantity")
+        
+        new_config = dict(config.CLUSTERING)
+        new_config["pattern_thresholds"] = {"seasonal": 0.9, "erratic": 0.15, "variable": 0.05}
+        new_config["volume_percentiles"] = {"A": 60, "B": 30, "C": 0}
+        fresh = RuleClustering()
+        fresh.config = new_config
+        expected = fresh.cluster_skus(processor.processed_data, "sku", "date", "quantity")
+        
+        monkeypatch.setattr(clustering, "_calculate_sku_metrics", lambda *a: pytest.fail("metrics were recomputed"))
+        preview = clustering.preview_counts(new_config)
+        clustering.config = new_config
+        clusters = clustering.assign_clusters()
+        
+        assert clusters == expected
+        assert {k: v["sku_count"] for k, v in preview.items()} == {
+            k: v["sku_count"] for k, v in fresh.cluster_summary.items()
+        }
+        
+        # clusters restored from a saved session can be re-thresholded too
+        restored = RuleClustering()
+        restored.sku_clusters = dict(expected)
+        restored._calculate_cluster_summary()
+        assert restored.preview_counts(new_config) == preview
+    
     def test_cluster_summary(self, processor):
         # test cluster summary
         clustering = RuleClustering()
@@ -207,6 +622,48 @@ class TestRuleClustering:
         
         total = len(a_items) + len(b_items) + len(c_items)
         assert total == len(processor.sku_list)
+    
+    def test_inverted_indexes(self, processor):
+        # test tier pattern and cell indexes match a scan and follow reassignment
+        clustering = RuleClustering()
+        clusters = clustering.cluster_skus(processor.processed_data, "sku", "date", "quantity")
+        
+        for tier in RuleClustering.TIERS:
+            assert list(clustering.get_skus_by_tier(tier)) == [s for s, c in clusters.items() if c.volume_tier == tier]
+            for pattern in RuleClustering.PATTERNS:
+                assert list(clustering.get_skus_by_cluster(tier, pattern)) == [
+                    s for s, c in clusters.items() if c.volume_tier == tier and c.pattern_type == pattern
+                ]
+        for pattern in RuleClustering.PATTERNS:
+            assert list(clustering.get_skus_by_pattern(pattern)) == [
+                s for s, c in clusters.items() if c.pattern_type == pattern
+            ]
+        
+        # shared index results cannot be edited by a caller
+        with pytest.raises(AttributeError):
+            clustering.get_skus_by_tier("C").sort()
+        
+        mapping = clustering.get_tier_mapping()
+        assert mapping == {s: c.volume_tier for s, c in clusters.items()}
+        assert clustering.get_tier_mapping() is mapping
+        
+        # indexes hold category codes of the processed sku column
+        categories = processor.processed_data["sku"].cat.categories
+        assert clustering.sku_index.equals(categories)
+        codes = clustering.get_codes_by_tier("A")
+        assert not codes.flags.writeable and not mapping.tier_codes.flags.writeable
+        assert list(categories[codes]) == list(clustering.get_skus_by_tier("A"))
+        assert (mapping.tier_codes[codes] == 0).all()
+        sku = processor.sku_list[5]
+        assert clustering.get_tier(sku) == clusters[sku].volume_tier
+        assert clustering.metrics["sku"][clustering.get_sku_row(sku)] == sku
+        assert clustering.get_tier("missing") == "C" and clustering.get_sku_row("missing") == -1
+        
+        # reassignment under new thresholds rebuilds the shared mapping
+        clustering.config = dict(config.CLUSTERING, volume_percentiles={"A": 10, "B": 10, "C": 80})
+        clusters = clustering.assign_clusters()
+        assert clustering.get_tier_mapping() is not mapping
+        assert list(clustering.get_skus_by_tier("A")) == [s for s, c in clusters.items() if c.volume_tier == "A"]
 
 
 # ============================================================================
@@ -367,7 +824,196 @@ class TestAnomalyDetector:
             small_df, "sku", "date", "quantity"
         )
         
-        assert isinstance(all_anomalies, dict)
+        assert isinstance(all_anomalies, AnomalyStore)
+    
+    def test_batch_engine_matches_single(self, processor):
+        # test vectorized batch scan gives per sku results
+        detector = AnomalyDetector()
+        
+        small_df = processor.processed_data[
+            processor.processed_data["sku"].isin(processor.sku_list[:20])
+        ].copy()
+        small_df.loc[small_df.index[5], "quantity"] = 10000
+        
+        for method in ["iqr", "zscore", "rolling"]:
+            batch = detector.detect_batch(small_df, "sku", "date", "quantity", method)
+            
+            for sku in processor.sku_list[:20]:
+                single = detector.detect_anomalies(
+                    small_df[small_df["sku"] == sku], "date", "quantity", method
+                )
+                for a in single:
+                    a.sku = sku
+                assert batch.get(sku, []) == single
+        
+        # injected spike is flagged against the sku median
+        engine = AnomalyEngine()
+        result = engine.scan(small_df, "quantity", "iqr", "sku")
+        assert result["mask"][5]
+        assert engine.TYPES[result["type"][5]] == "spike"
+        assert result["expected"][5] == small_df["quantity"].iloc[:730].median()
+    
+    def test_anomaly_store_indexes(self, processor):
+        # test columnar store answers per sku and severity queries like the lists did
+        detector = AnomalyDetector()
+        
+        small_df = processor.processed_data[
+            processor.processed_data["sku"].isin(processor.sku_list[:20])
+        ].copy()
+        small_df.loc[small_df.index[::50], "quantity"] = 10000
+        store = detector.detect_batch(small_df, "sku", "date", "quantity")
+        records = [a for sku in store for a in store[sku]]
+        assert store.n_rows == len(records) > 0
+        
+        playlist = detector.get_anomaly_playlist(min_severity=0.3)
+        expected = sorted([a for a in records if a.severity >= 0.3], key=lambda a: a.severity, reverse=True)
+        assert list(playlist) == expected
+        
+        summary = detector.get_summary()
+        assert summary["total_anomalies"] == len(records)
+        assert summary["by_type"]["spike"] == sum(a.anomaly_type == "spike" for a in records)
+        
+        exported = detector.export_anomalies()
+        assert exported["date"].dtype == "datetime64[ns]"
+        assert len(exported) == len(records)
+        
+        sku = next(iter(store))
+        rows = store.filter(types=["spike"], search=str(sku).lower())
+        assert {store.anomaly(r).sku for r in rows} == {sku}
+        assert len(store.points(sku)) == len(store[sku])
+        
+        # record lists from older sessions convert without reordering
+        restored = AnomalyStore.from_records(list(playlist))
+        assert list(restored.view()) == list(playlist)
+    
+    def test_zero_and_gap_runs_batch(self, processor):
+        # test run length kernels find the same runs as the single series scans
+        detector = AnomalyDetector()
+        
+        small_df = processor.processed_data[
+            processor.processed_data["sku"].isin(processor.sku_list[:5])
+        ].copy()
+        small_df.loc[small_df.index[10:14], "quantity"] = 0
+        small_df.loc[small_df.index[20:22], "quantity"] = 0
+        small_df = small_df.drop(small_df.index[[100, 101, 102, 800]])
+        
+        zeros = detector.detect_zeros_batch(small_df, "sku", "date", "quantity")
+        gaps = detector.detect_gaps_batch(small_df, "sku", "date")
+        
+        first = processor.sku_list[0]
+        assert [a.severity for a in zeros[first]] == [0.4]
+        assert [round(a.severity * 7) for a in gaps[first]] == [3]
+        assert pd.Timestamp(gaps[first][0].date) == small_df["date"].iloc[99] + pd.Timedelta(days=1)
+        assert set(gaps) == {processor.sku_list[0], processor.sku_list[1]}
+        
+        for sku in processor.sku_list[:5]:
+            sku_df = small_df[small_df["sku"] == sku]
+            single_zeros = detector.detect_zeros(sku_df, "date", "quantity")
+            single_gaps = detector.detect_gaps(sku_df, "date")
+            assert [(a.date, a.severity) for a in zeros.get(sku, [])] == [(a.date, a.severity) for a in single_zeros]
+            assert [(a.date, a.severity) for a in gaps.get(sku, [])] == [(a.date, a.severity) for a in single_gaps]
+        
+        # the full scan carries zero and gap runs next to the method's findings
+        store = detector.detect_batch(small_df, "sku", "date", "quantity", include_runs=True)
+        assert {"zero", "gap"} <= set(store.summary()["by_type"])
+        assert [a.severity for a in store[first] if a.anomaly_type == "zero"] == [0.4]
+        assert len(store[first]) == len(zeros[first]) + len(gaps[first]) + len(
+            detector.detect_anomalies(small_df[small_df["sku"] == first], "date", "quantity")
+        )
+    
+    def test_gaps_on_calendar_frequencies(self):
+        # test weekly and monthly grids find missing periods and bad aliases raise
+        detector = AnomalyDetector()
+        weeks = pd.DataFrame({"date": pd.date_range("2023-01-01", periods=20, freq="W")}).drop([3, 4, 10])
+        gaps = detector.detect_gaps(weeks, "date", expected_freq="W")
+        assert [(pd.Timestamp(a.date), round(a.severity * 7)) for a in gaps] == [
+            (pd.Timestamp("2023-01-22"), 2), (pd.Timestamp("2023-03-12"), 1)
+        ]
+        
+        daily = pd.DataFrame({"date": pd.date_range("2023-01-01", "2023-06-30")})
+        assert detector.detect_gaps(daily, "date", expected_freq="M") == []
+        assert detector.detect_gaps(daily, "date", expected_freq="MS") == []
+        months = pd.DataFrame({"date": pd.date_range("2023-01-01", periods=12, freq="MS")}).drop([5])
+        assert [a.date for a in detector.detect_gaps(months, "date", expected_freq="MS")] == ["2023-06-01 00:00:00"]
+        
+        with pytest.raises(ValueError):
+            detector.detect_gaps(daily, "date", expected_freq="bogus")
+    
+    def test_incremental_redetection(self, processor):
+        # test review actions rescan only changed skus and match a full scan
+        df = processor.processed_data
+        df.loc[df.index[::97], "quantity"] = 10000
+        detector = AnomalyDetector()
+        df.loc[df.index[5:9], "quantity"] = 0
+        detector.detect_batch(df, "sku", "date", "quantity", version=processor.data_version, include_runs=True)
+        
+        sku = next(iter(detector.anomalies))
+        spike = detector.anomalies[sku][0]
+        success, message = processor.apply_fix(
+            "review_actions",
+            corrections=[{"sku": sku, "date": spike.date, "new_value": spike.expected_value}]
+        )
+        assert success and processor.changes_since(detector.version)["skus"] == {sku}
+        
+        store = detector.redetect(processor)
+        assert detector.get_sku_version(sku) == processor.data_version
+        assert spike.date not in [a.date for a in store[sku]]
+        
+        full = AnomalyDetector().detect_batch(processor.processed_data, "sku", "date", "quantity", include_runs=True)
+        assert {s: list(v) for s, v in store.items()} == {s: list(v) for s, v in full.items()}
+        
+        # the review change is a regular fix that can be undone
+        assert processor.undo_fix()[0]
+        assert processor.changes_since(detector.version)["skus"] == {sku}
+    
+    def test_streaming_partial_results(self, processor, monkeypatch):
+        # test sku batches stream partial stores and cancelling keeps them
+        monkeypatch.setitem(config.PERFORMANCE, "chunk_size", 10)
+        monkeypatch.setitem(config.PERFORMANCE, "partial_result_interval", 0)
+        df = processor.processed_data
+        df.loc[df.index[::97], "quantity"] = 10000
+        
+        detector = AnomalyDetector()
+        partials = []
+        store = detector.detect_batch(df, "sku", "date", "quantity", partial_callback=partials.append)
+        assert len(partials) == 10
+        assert [len(p) for p in partials] == sorted(len(p) for p in partials)
+        assert list(partials[-1].view()) == list(store.view())
+        
+        def cancel_at_30(value, text=""):
+            if value >= 30:
+                raise InterruptedError("operation cancelled")
+        
+        with pytest.raises(InterruptedError):
+            detector.detect_batch(df, "sku", "date", "quantity", progress_callback=cancel_at_30)
+        assert len(detector.anomalies) == len([s for s in processor.sku_list[:30] if s in store])
+        assert all(list(detector.anomalies[s]) == list(store[s]) for s in detector.anomalies)
+        
+        # a cancelled scan is rerun in full
+        assert detector.version is None
+        assert detector.redetect(processor).n_rows == store.n_rows
+    
+    def test_seasonal_residuals(self):
+        # test weekly peaks are expected while an off pattern spike is flagged
+        dates = pd.date_range("2023-01-02", periods=364, freq="D")
+        base = np.where(dates.dayofweek == 0, 60.0, 20.0) + np.tile([0.0, 1.0, -1.0, 2.0], 91)
+        df = pd.DataFrame({
+            "sku": np.repeat(["A", "B"], 364),
+            "date": np.tile(dates, 2),
+            "quantity": np.concatenate([base, base * 2]),
+        })
+        df.loc[200, "quantity"] = 90
+        
+        detector = AnomalyDetector()
+        iqr = detector.detect_batch(df, "sku", "date", "quantity", "iqr")
+        seasonal = detector.detect_batch(df, "sku", "date", "quantity", "seasonal")
+        
+        assert len(iqr["A"]) > 50
+        assert [(pd.Timestamp(a.date), a.anomaly_type) for a in seasonal["A"]] == [(dates[200], "spike")]
+        assert "B" not in seasonal
+        
+        single = detector.detect_anomalies(df[df["sku"] == "A"], "date", "quantity", "seasonal")
+        assert [(a.date, a.severity) for a in single] == [(a.date, a.severity) for a in seasonal["A"]]
     
     def test_anomaly_summary(self, processor):
         # test anomaly summary
@@ -23,6 +23,7 @@ from core.feature_engineer import FeatureEngineer
 from core.forecaster import Forecaster
 from core.anomaly_detector import AnomalyDetector
 from utils.export_formatter import ExportFormatter
+from utils.compression import CompressionUtils
 
 
 # ============================================================================
@@ -156,6 +157,211 @@ class TestFullWorkflow:
         assert processor.raw_data is not None
         assert len(processor.raw_data) > 0
     
+    def test_folder_load_workflow(self, large_sample_data, tmp_path):
+        # test loading a folder of regional files
+        sample = large_sample_data.head(3000)
+        sample.iloc[:1000].to_csv(tmp_path / "region_a.csv", index=False)
+        sample.iloc[1000:2000].to_parquet(tmp_path / "region_b.parquet", index=False)
+        
+        extra = sample.iloc[2000:].copy()
+        extra["store"] = "S1"
+        extra.to_csv(tmp_path / "region_c.csv", index=False)
+        (tmp_path / "notes.txt").write_text("ignored")
+        
+        processor = DataProcessor()
+        messages = []
+        success, message = processor.load_file(
+            str(tmp_path),
+            progress_callback=lambda pct, text="": messages.append(text)
+        )
+        
+        assert success
+        assert len(processor.raw_data) == 3000
+        assert list(processor.raw_data.columns) == list(sample.columns)
+        assert processor.load_report["files"] == [
+            "region_a.csv", "region_b.parquet", "region_c.csv"
+        ]
+        assert processor.load_report["schema_mismatches"]["region_c.csv"]["extra_columns"] == ["store"]
+        assert sum("region_" in m for m in messages) == 3
+        
+        # glob selects a subset
+        success, _ = processor.load_file(str(tmp_path / "*.csv"))
+        assert success
+        assert len(processor.raw_data) == 2000
+    
+    def test_compressed_load_workflow(self, large_sample_data, tmp_path):
+        # test streaming compressed csv files
+        sample = large_sample_data.head(5000)
+        sample.to_csv(tmp_path / "sales.csv.gz", index=False)
+        sample.to_csv(tmp_path / "sales.csv.bz2", index=False)
+        sample.to_csv(
+            tmp_path / "sales.zip", index=False,
+            compression={"method": "zip", "archive_name": "sales.csv"}
+        )
+        
+        for name in ["sales.csv.gz", "sales.csv.bz2", "sales.zip"]:
+            processor = DataProcessor()
+            messages = []
+            success, message = processor.load_file(
+                str(tmp_path / name),
+                progress_callback=lambda pct, text="": messages.append(text)
+            )
+            
+            assert success, message
+            assert len(processor.raw_data) == 5000
+            assert list(processor.raw_data.columns) == list(sample.columns)
+            assert any("compressed" in m for m in messages)
+    
+    def test_compressed_size_estimate(self, large_sample_data, tmp_path):
+        # test sampled sizes of streams without a size header stay above the real size
+        pytest.importorskip("zstandard")
+        raw_size = len(large_sample_data.to_csv(index=False).encode())
+        
+        for name in ["sales.csv.bz2", "sales.csv.zst"]:
+            path = tmp_path / name
+            large_sample_data.to_csv(path, index=False)
+            assert path.stat().st_size > CompressionUtils.SAMPLE_BYTES
+            
+            estimate = CompressionUtils.estimate_uncompressed_size(path)
+            assert raw_size <= estimate <= raw_size * 1.25
+        
+        # zstd files load through the streaming reader
+        processor = DataProcessor()
+        success, message = processor.load_file(str(tmp_path / "sales.csv.zst"))
+        assert success, message
+        assert len(processor.raw_data) == len(large_sample_data)
+    
+    def test_parquet_dataset_workflow(self, large_sample_data, tmp_path):
+        # test loading one quarter of a year partitioned dataset
+        archive = large_sample_data.copy()
+        archive["year"] = archive["date"].dt.year
+        for year, part in archive.groupby("year"):
+            folder = tmp_path / f"year={year}"
+            folder.mkdir()
+            part.drop(columns="year").to_parquet(
+                folder / "part-0.parquet", index=False, row_group_size=20000
+            )
+        
+        processor = DataProcessor()
+        assert processor.is_parquet_dataset(str(tmp_path))
+        
+        info = processor.get_dataset_info(str(tmp_path), date_column="date")
+        assert info["rows"] == len(large_sample_data)
+        assert info["partitions"] == ["year"]
+        assert info["date_min"] == pd.Timestamp("2022-01-01")
+        
+        processor.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity"})
+        processor.set_load_filters(date_range=("2023-04-01", "2023-06-30"), skus=["SKU0001", "SKU0002"])
+        success, message = processor.load_file(str(tmp_path))
+        
+        assert success, message
+        assert list(processor.raw_data.columns) == ["date", "sku", "quantity"]
+        assert len(processor.raw_data) == 2 * 91
+        assert processor.raw_data["date"].min() == pd.Timestamp("2023-04-01")
+        assert processor.raw_data["date"].max() == pd.Timestamp("2023-06-30")
+        
+        report = processor.load_report
+        assert report["files"] == 1
+        assert report["row_groups_read"] < report["row_groups_total"]
+    
+    def test_database_load_workflow(self, large_sample_data, tmp_path):
+        # test loading from a local sqlite file with sql pushdown
+        import sqlite3
+        
+        sample = large_sample_data[large_sample_data["sku"].isin(["SKU0001", "SKU0002", "SKU0003"])].copy()
+        sample["date"] = sample["date"].dt.strftime("%Y-%m-%d")
+        sample["store"] = "S1"
+        other_store = sample.assign(store="S2", quantity=1)
+        
+        db_path = tmp_path / "sales.sqlite"
+        with sqlite3.connect(db_path) as conn:
+            pd.concat([sample, other_store]).to_sql("sales", conn, index=False)
+        
+        processor = DataProcessor()
+        assert processor.get_database_tables(str(db_path)) == {"sales": 2 * len(sample)}
+        
+        info = processor.get_database_info(str(db_path), table="sales", date_column="date")
+        assert info["date_min"] == pd.Timestamp("2022-01-01")
+        
+        processor.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity"})
+        processor.set_load_filters(date_range=("2023-01-01", "2023-01-31"), skus=["SKU0001", "SKU0002"])
+        success, message = processor.load_file(str(db_path), sheet_name="sales")
+        
+        assert success, message
+        assert list(processor.raw_data.columns) == ["date", "sku", "quantity"]
+        assert len(processor.raw_data) == 2 * 31
+        assert processor.load_report["aggregated"]
+        assert not processor.load_report["dates_filtered_after_fetch"]
+        
+        # two stores roll up to one row per sku and date
+        expected = sample[(sample["sku"] == "SKU0001") & (sample["date"] == "2023-01-15")]["quantity"].iloc[0] + 1
+        row = processor.raw_data[(processor.raw_data["sku"] == "SKU0001") & (processor.raw_data["date"] == "2023-01-15")]
+        assert row["quantity"].iloc[0] == expected
+        
+        success, _ = processor.process_data()
+        assert success
+        assert sorted(processor.sku_list) == ["SKU0001", "SKU0002"]
+        
+        # day first text dates cannot be compared in sql so they filter after fetch
+        dayfirst = sample.assign(date=pd.to_datetime(sample["date"]).dt.strftime("%d/%m/%Y"))
+        db_path = tmp_path / "dayfirst.sqlite"
+        with sqlite3.connect(db_path) as conn:
+            dayfirst.to_sql("sales", conn, index=False)
+        
+        processor.set_load_filters(date_range=("2023-01-01", "2023-01-31"), skus=["SKU0001"])
+        success, message = processor.load_file(str(db_path), sheet_name="sales")
+        assert success, message
+        assert len(processor.raw_data) == 31
+        assert processor.load_report["dates_filtered_after_fetch"]
+        assert processor.raw_data["date"].iloc[0] == "01/01/2023"
+    
+    def test_append_data_workflow(self, large_sample_data, tmp_path):
+        # test weekly delta merges into processed history without reprocessing
+        cutoff = pd.Timestamp("2023-12-25")
+        history = large_sample_data[large_sample_data["date"] < cutoff]
+        week = large_sample_data[large_sample_data["date"] >= cutoff - pd.Timedelta(days=1)].copy()
+        new_sku = week[week["sku"] == "SKU0000"].assign(sku="SKU9999")
+        week.loc[week.index[0], "quantity"] = 99999
+        week.loc[week.index[1], "date"] = None
+        
+        delta_path = tmp_path / "week.csv"
+        pd.concat([week, new_sku]).to_csv(delta_path, index=False)
+        
+        processor = DataProcessor()
+        processor.raw_data = history
+        processor.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity", "category": "category"})
+        processor.process_data()
+        version = processor.data_version
+        
+        # mapped columns are required
+        success, message = processor.append_data(week.drop(columns=["quantity"]))
+        assert not success
+        assert "quantity" in message
+        
+        success, message = processor.append_data(str(delta_path))
+        assert success, message
+        
+        report = processor.delta_report
+        assert report["rows_invalid"] == 1
+        assert report["rows_replaced"] == 500
+        assert report["new_skus"] == ["SKU9999"]
+        assert report["end"] == pd.Timestamp("2023-12-31")
+        
+        # merged frame equals a full reprocess of the combined data
+        df = processor.processed_data
+        assert len(df) == len(large_sample_data) - 1 + len(new_sku)
+        expected = df.sort_values(["sku", "date"], kind="stable")
+        assert df.index.equals(expected.index)
+        assert not df.duplicated(subset=["sku", "date"]).any()
+        assert df[(df["sku"] == week["sku"].iloc[0]) & (df["date"] == week["date"].iloc[0])]["quantity"].iloc[0] == 99999
+        assert processor.sku_list[-1] == "SKU9999"
+        
+        changes = processor.changes_since(version)
+        assert not changes["full"]
+        assert len(changes["skus"]) == 501
+        assert changes["start"] == cutoff - pd.Timedelta(days=1)
+        assert processor.changes_since(0)["full"]
+    
     def test_anomaly_workflow(self, large_sample_data):
         # test anomaly detection workflow
         processor = DataProcessor()
@@ -263,6 +469,58 @@ class TestPerformance:
         assert elapsed < 30  # 30 seconds max for 500 skus
         assert len(clusters) == 500
     
+    def test_generated_fixture_scale(self, tmp_path):
+        # test vectorized generator streams a seeded fixture that loads end to end
+        import importlib.util
+        import time
+        
+        path = Path(__file__).parent.parent / "assets" / "sample_data" / "generate_test_data.py"
+        spec = importlib.util.spec_from_file_location("generate_test_data", path)
+        generator_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(generator_module)
+        
+        settings = dict(
+            generator_module.CONFIG, num_skus=2000, duration_days=120, chunk_skus=300,
+            output_csv=str(tmp_path / "large.csv"), output_parquet=str(tmp_path / "large.parquet")
+        )
+        start = time.time()
+        generator = generator_module.DataGenerator(settings)
+        rows = generator.save_files(("csv", "parquet"), excel=False)
+        assert time.time() - start < 30
+        
+        # same seed gives the same rows and tier mix
+        again = generator_module.DataGenerator(settings).create_dataset()
+        assert len(again) == rows
+        assert (generator.profiles["tier"].value_counts() == pd.Series({"C": 1200, "B": 600, "A": 200})).all()
+        
+        stored = pd.read_parquet(tmp_path / "large.parquet")
+        pd.testing.assert_frame_equal(stored, again, check_dtype=False, check_categorical=False)
+        
+        processor = DataProcessor()
+        success, _ = processor.load_file(str(tmp_path / "large.csv"))
+        assert success
+        processor.set_column_mapping({"date": "trx_date", "sku": "product_id", "quantity": "sales_qty"})
+        success, _ = processor.process_data()
+        assert success
+        assert len(processor.sku_list) == 2000
+    
+    def test_seasonal_scan_speed(self, large_sample_data):
+        # test seasonal residuals stay close to the vectorized iqr scan
+        import time
+        from core.anomaly_engine import AnomalyEngine
+        
+        engine = AnomalyEngine()
+        timings = {}
+        for method in ["iqr", "seasonal"]:
+            runs = []
+            for _ in range(3):
+                start = time.perf_counter()
+                engine.scan(large_sample_data, "quantity", method, "sku", "date")
+                runs.append(time.perf_counter() - start)
+            timings[method] = min(runs)
+        
+        assert timings["seasonal"] < 2 * timings["iqr"]
+    
     def test_memory_usage(self, large_sample_data):
         # test memory usage
         from utils.memory_manager import MemoryManager
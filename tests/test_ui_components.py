@@ -13,6 +13,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 
 # create qapplication for tests
 app = QApplication.instance() or QApplication(sys.argv)
@@ -20,10 +21,18 @@ app = QApplication.instance() or QApplication(sys.argv)
 import pandas as pd
 import numpy as np
 
+import config
+
 from ui.models.session_model import SessionModel
 from ui.models.sku_table_model import SKUTableModel
 from ui.models.forecast_model import ForecastTableModel
+from ui.models.anomaly_table_model import AnomalyTableModel
+from ui.dialogs.anomaly_review_dialog import AnomalyReviewDialog
+from ui.dialogs.clustering_config_dialog import ClusteringConfigDialog
+from ui.tabs.explore_tab import ExploreTab
+from core.rule_clustering import RuleClustering
 from core.forecaster import ForecastResult
+from core.anomaly_store import AnomalyStore
 
 
 # ============================================================================
@@ -59,6 +68,24 @@ def sample_forecasts():
     return forecasts
 
 
+@pytest.fixture
+def sample_anomalies():
+    # create store of spikes over many items in playlist order
+    rng = np.random.default_rng(0)
+    n = 5000
+    store = AnomalyStore.from_events(
+        np.array([f"SKU{i:03d}" for i in range(500)], dtype=object),
+        np.sort(rng.integers(0, 500, n)),
+        np.datetime64("2023-01-01") + rng.integers(0, 700, n).astype("timedelta64[D]"),
+        rng.uniform(0, 1000, n),
+        rng.uniform(0, 1000, n),
+        rng.uniform(0, 1, n),
+        "spike",
+        "iqr"
+    )
+    return store.view(store.playlist(0.0))
+
+
 # ============================================================================
 #                       SESSION MODEL TESTS
 # ============================================================================
@@ -82,6 +109,30 @@ class TestSessionModel:
         assert session.state.file_loaded
         assert session.state.total_skus == 100
     
+    def test_stale_results_after_append(self):
+        # test the change journal marks results computed before an append
+        from core.data_processor import DataProcessor
+        days = pd.date_range("2023-01-01", periods=60)
+        df = pd.DataFrame({
+            "date": np.tile(days, 3),
+            "sku": np.repeat(["A1", "B2", "C3"], len(days)),
+            "quantity": 5.0
+        })
+        processor = DataProcessor()
+        processor.raw_data = df[df["date"] < days[-7]]
+        processor.set_column_mapping({"date": "date", "sku": "sku", "quantity": "quantity"})
+        processor.process_data()
+        
+        session = SessionModel()
+        session.set_forecasts({"A1": None, "B2": None, "C3": None}, processor.data_version)
+        session.set_clusters({"A1": None, "B2": None, "C3": None})
+        
+        success, message = processor.append_data(df[(df["date"] >= days[-7]) & (df["sku"] != "C3")])
+        assert success, message
+        assert session.get_stale_skus("forecasts", processor) == {"A1", "B2"}
+        # results without a known data version are never reported stale
+        assert session.get_stale_skus("clusters", processor) == set()
+    
     def test_bookmarks(self):
         # test bookmark functionality
         session = SessionModel()
@@ -325,6 +376,128 @@ class TestForecastTableModel:
         assert model.columnCount() == len(model.COLUMNS)
 
 
+# ============================================================================
+#                     ANOMALY TABLE MODEL TESTS
+# ============================================================================
+
+class TestAnomalyTableModel:
+    # anomaly table model test cases
+    
+    def test_rows_formatted_on_demand(self, sample_anomalies):
+        # test cells come from the columnar data in playlist order
+        model = AnomalyTableModel()
+        model.set_anomalies(sample_anomalies)
+        
+        assert model.rowCount() == len(sample_anomalies)
+        assert model.columnCount() == len(model.COLUMNS)
+        first = sample_anomalies[0]
+        assert model.data(model.index(0, 0)) == first.sku
+        assert model.data(model.index(0, 5)) == f"{int(first.severity * 100)}%"
+        assert model.data(model.index(0, 6)) == "Pending"
+    
+    def test_filter_and_sort(self, sample_anomalies):
+        # test vectorized filter and sort match a plain scan of the records
+        model = AnomalyTableModel()
+        model.set_anomalies(sample_anomalies)
+        
+        model.set_filter(min_severity=0.7, search="sku01")
+        expected = [a for a in sample_anomalies if a.severity >= 0.7 and "sku01" in a.sku.lower()]
+        assert model.rowCount() == len(expected)
+        
+        model.sort(2, Qt.AscendingOrder)
+        values = [sample_anomalies[model.anomaly_index(r)].value for r in range(model.rowCount())]
+        assert values == sorted(a.value for a in expected)
+        
+        model.set_filter(anomaly_type="drop")
+        assert model.rowCount() == 0
+    
+    def test_batch_actions(self, sample_anomalies):
+        # test actions on row arrays follow the visible order
+        model = AnomalyTableModel()
+        model.set_anomalies(sample_anomalies)
+        model.sort(5, Qt.DescendingOrder)
+        
+        assert model.set_actions(np.arange(10), "Remove") == 10
+        assert model.setData(model.index(10, model.ACTION_COLUMN), "Keep")
+        assert model.action_counts() == {"Keep": 1, "Remove": 10}
+        assert set(model.actioned()) == set(model.anomaly_indices(np.arange(11)))
+    
+    def test_review_dialog(self, sample_anomalies):
+        # test dialog batch action over a selection
+        dialog = AnomalyReviewDialog(sample_anomalies)
+        dialog._table.selectRow(2)
+        assert dialog._first_selected_row() == 2
+        
+        dialog._search_edit.setText("sku000")
+        dialog._table.selectAll()
+        actions = dialog._model.set_actions(dialog._selected_rows(), "Flag")
+        assert actions == dialog._model.visible_count() > 0
+        
+        flagged = [a for a, action in dialog.get_actions() if action == "Flag"]
+        assert {a.sku for a in flagged} == {"SKU000"}
+
+
+# ============================================================================
+#                     CLUSTERING CONFIG DIALOG TESTS
+# ============================================================================
+
+class TestClusteringConfigDialog:
+    # clustering config dialog test cases
+    
+    def test_live_preview(self):
+        # test threshold edits report cluster sizes from cached metrics
+        rng = np.random.default_rng(1)
+        days = pd.date_range("2023-01-01", periods=365)
+        df = pd.DataFrame({
+            "sku": np.repeat([f"SKU{i:03d}" for i in range(50)], len(days)),
+            "date": np.tile(days, 50),
+            "quantity": rng.gamma(np.repeat(rng.uniform(0.5, 20, 50), len(days)))
+        })
+        clustering = RuleClustering()
+        clustering.cluster_skus(df, "sku", "date", "quantity")
+        
+        dialog = ClusteringConfigDialog(clustering.config, clustering=clustering)
+        previews = []
+        dialog.preview_changed.connect(previews.append)
+        dialog._variable_threshold.setValue(1.0)
+        
+        assert sum(v["sku_count"] for v in previews[-1].values()) == 50
+        assert not any(pattern == "variable" for _, pattern in previews[-1])
+        assert "Items per tier" in dialog._preview_label.text()
+
+
+# ============================================================================
+#                            EXPLORE TAB TESTS
+# ============================================================================
+
+class TestExploreTab:
+    # explore tab test cases
+    
+    def test_anomaly_method_selector(self):
+        # test every configured method is offered starting from the default
+        tab = ExploreTab(SessionModel())
+        combo = tab._anomaly_method_combo
+        
+        methods = [combo.itemData(i) for i in range(combo.count())]
+        assert methods == list(config.ANOMALY_DETECTION["methods"])
+        assert combo.currentData() == config.ANOMALY_DETECTION["default_method"] == "seasonal"
+    
+    def test_sparkline_tier_colors(self):
+        # test sparklines take tier colors from a code keyed mapping
+        from ui.widgets.sparklines_widget import SparklinesWidget
+        from core.tier_index import TierMapping
+        
+        mapping = TierMapping(pd.Index(["SKU1", "SKU2", "SKU3"]), np.array([0, -1, 2]))
+        assert dict(mapping) == {"SKU1": "A", "SKU3": "C"} and mapping.get("SKU2") is None
+        
+        widget = SparklinesWidget()
+        widget.set_colors_by_tier(mapping)
+        widget.set_data({sku: [1.0, 2.0, 3.0] for sku in ["SKU1", "SKU2", "SKU3"]})
+        colors = {sku: item._canvas._color.name() for sku, item in widget._sparklines.items()}
+        assert colors["SKU1"] == "#4caf50" and colors["SKU3"] == "#f44336"
+        assert colors["SKU2"] == QColor(config.UI_COLORS["primary"]).name()
+
+
 # ============================================================================
 #                            RUN TESTS
 # ============================================================================
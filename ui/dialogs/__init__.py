@@ -10,6 +10,8 @@ from .anomaly_review_dialog import AnomalyReviewDialog
 from .about_dialog import AboutDialog
 from .welcome_dialog import WelcomeDialog
 from .sheet_selection_dialog import SheetSelectionDialog
+from .dataset_filter_dialog import DatasetFilterDialog
+from .database_source_dialog import DatabaseSourceDialog
 from .abnormal_data_dialog import AbnormalDataDialog
 from .help_dialog import ClusterHelpDialog, ForecastHelpDialog, DataCleaningHelpDialog
 from .anomaly_chart_dialog import AnomalyChartDialog
@@ -22,6 +24,8 @@ __all__ = [
     "AboutDialog",
     "WelcomeDialog",
     "SheetSelectionDialog",
+    "DatasetFilterDialog",
+    "DatabaseSourceDialog",
     "AbnormalDataDialog",
     "ClusterHelpDialog",
     "ForecastHelpDialog",
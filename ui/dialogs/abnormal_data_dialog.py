@@ -19,6 +19,7 @@ import numpy as np
 
 import config
 from core.data_processor import DataProcessor
+from core.quality_profiler import QualityProfiler
 
 
 # ============================================================================
@@ -43,6 +44,7 @@ class AbnormalDataDialog(QDialog):
         self._processor = processor
         
         self._abnormal_data: Dict[str, Dict[str, Any]] = {}
+        self._profiler: Optional[QualityProfiler] = None
         self._tables: Dict[str, QTableWidget] = {}
         self._type_order: List[str] = []
         self._fix_controls: Dict[str, Dict[str, object]] = {}
@@ -140,57 +142,38 @@ class AbnormalDataDialog(QDialog):
     # ---------- ANALYSIS ----------
     
     def _analyze_abnormal_data(self) -> None:
-        # analyze abnormal rows by category
+        # read abnormal row masks from the quality profile
         df = self._data
-        qty_col = self._column_mapping.get("quantity")
-        date_col = self._column_mapping.get("date")
-        sku_col = self._column_mapping.get("sku")
-        
-        # missing values in mapped columns
-        mapped_cols = [c for c in self._column_mapping.values() if c and c in df.columns]
-        if mapped_cols:
-            miss_mask = df[mapped_cols].isnull().any(axis=1)
-            if miss_mask.any():
-                self._abnormal_data["missing"] = {
-                    "title": "Missing Values",
-                    "data": df[miss_mask].copy(),
-                    "description": f"{int(miss_mask.sum()):,} rows with missing values in key columns"
-                }
-        
-        # duplicates by sku + date
-        if sku_col and date_col:
-            dup_mask = df.duplicated(subset=[sku_col, date_col], keep=False)
-            if dup_mask.any():
-                self._abnormal_data["duplicates"] = {
-                    "title": "Duplicate Entries",
-                    "data": df[dup_mask].copy(),
-                    "description": f"{int(dup_mask.sum()):,} rows with duplicate item and date"
-                }
-        
-        # negative values
-        if qty_col and qty_col in df.columns:
-            neg_mask = df[qty_col] < 0
-            if neg_mask.any():
-                self._abnormal_data["negative"] = {
-                    "title": "Negative Values",
-                    "data": df[neg_mask].copy(),
-                    "description": f"{int(neg_mask.sum()):,} rows with negative quantities"
+        if self._processor is not None and self._processor.processed_data is df:
+            self._profiler = self._processor.profiler
+        else:
+            self._profiler = QualityProfiler()
+        
+        if not self._profiler.is_current(df, self._column_mapping):
+            self._profiler.profile(df, self._column_mapping)
+        
+        threshold = self._profiler.threshold
+        categories = [
+            ("missing", "Missing Values", "missing", "rows with missing values in key columns"),
+            ("duplicates", "Duplicate Entries", "duplicates", "rows with duplicate item and date"),
+            ("negative", "Negative Values", "negative", "rows with negative quantities"),
+            ("outliers", "Outliers", "outliers", f"rows more than {threshold:g} standard deviations from their item average")
+        ]
+        
+        # rows are taken from the frame only when shown or exported
+        for key, title, mask, description in categories:
+            count = self._profiler.count(mask)
+            if count:
+                self._abnormal_data[key] = {
+                    "title": title,
+                    "mask": mask,
+                    "count": count,
+                    "description": f"{count:,} {description}"
                 }
-        
-        # outliers by z-score
-        if qty_col and qty_col in df.columns:
-            vals = df[qty_col].astype(float)
-            mean = vals.mean()
-            std = vals.std()
-            if std and not np.isnan(std):
-                z = (vals - mean) / std
-                out_mask = (z > 3.0) | (z < -3.0)
-                if out_mask.any():
-                    self._abnormal_data["outliers"] = {
-                        "title": "Outliers",
-                        "data": df[out_mask].copy(),
-                        "description": f"{int(out_mask.sum()):,} rows with values outside 3 standard deviations"
-                    }
+    
+    def _abnormal_rows(self, key: str, limit: Optional[int] = None) -> pd.DataFrame:
+        # flagged rows for abnormal type
+        return self._profiler.get_rows(self._data, self._abnormal_data[key]["mask"], limit)
     
     # ---------- TABS ----------
     
@@ -213,7 +196,7 @@ class AbnormalDataDialog(QDialog):
         
         for key, info in self._abnormal_data.items():
             title = info["title"]
-            df = info["data"]
+            count = info["count"]
             
             tab = QWidget()
             tab_layout = QVBoxLayout(tab)
@@ -234,7 +217,7 @@ class AbnormalDataDialog(QDialog):
             table.setSortingEnabled(True)
             
             # preview first 1000 rows
-            preview = df.head(1000)
+            preview = self._abnormal_rows(key, 1000)
             cols = list(preview.columns)
             
             # set columns without exclude checkbox
@@ -263,15 +246,15 @@ class AbnormalDataDialog(QDialog):
             tab_layout.addWidget(table)
             
             # info label for large datasets
-            if len(df) > len(preview):
+            if count > len(preview):
                 info_label = QLabel(
-                    f"Showing first {len(preview):,} of {len(df):,} rows. "
+                    f"Showing first {len(preview):,} of {count:,} rows. "
                     f"Export to CSV or Excel to see full abnormal dataset."
                 )
                 info_label.setStyleSheet("color: #666; font-style: italic;")
                 tab_layout.addWidget(info_label)
             
-            self._tabs.addTab(tab, f"{title} ({len(df):,})")
+            self._tabs.addTab(tab, f"{title} ({count:,})")
             self._tables[key] = table
             self._type_order.append(key)
     
@@ -435,7 +418,7 @@ class AbnormalDataDialog(QDialog):
             QMessageBox.warning(self, "No Data", "No abnormal data to export")
             return
         
-        df = info["data"]
+        df = self._abnormal_rows(t_key)
         if df.empty:
             QMessageBox.warning(self, "No Data", "No abnormal data to export")
             return
@@ -6,18 +6,40 @@ batch processing for efficiency
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem,
+    QPushButton, QTableView, QStyledItemDelegate,
     QComboBox, QGroupBox, QLineEdit,
     QFrame, QHeaderView, QAbstractItemView, QMessageBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont, QColor, QBrush
+from PyQt5.QtGui import QFont
 from typing import Dict, List, Optional, Any
-import pandas as pd
 import numpy as np
 
-import config
-from core.anomaly_detector import Anomaly
+from core.anomaly_store import Anomaly, AnomalyStore, AnomalyView
+from ui.models.anomaly_table_model import AnomalyTableModel
+
+
+# ============================================================================
+#                         ACTION DELEGATE
+# ============================================================================
+
+class ActionDelegate(QStyledItemDelegate):
+    # combo editor created only for the action cell being edited
+    
+    def createEditor(self, parent, option, index):
+        # action combo that commits as soon as a choice is made
+        combo = QComboBox(parent)
+        combo.addItems(AnomalyTableModel.ACTIONS)
+        combo.activated.connect(lambda _: self.commitData.emit(combo))
+        return combo
+    
+    def setEditorData(self, editor, index) -> None:
+        # show current action
+        editor.setCurrentText(index.data(Qt.EditRole))
+    
+    def setModelData(self, editor, model, index) -> None:
+        # write chosen action back to model
+        model.setData(index, editor.currentText(), Qt.EditRole)
 
 
 # ============================================================================
@@ -37,17 +59,27 @@ class AnomalyReviewDialog(QDialog):
     # ---------- CONSTANTS ----------
     ROW_HEIGHT = 40
     
+    # type filter entries in combo order
+    TYPE_FILTERS = [None, "spike", "drop", "zero", "gap"]
+    SEVERITY_FILTERS = [0.0, 0.7, 0.4]
+    
     def __init__(self, anomalies: List[Anomaly], parent=None, processor=None):
         # initialize dialog
         super().__init__(parent)
         
+        # plain lists keep their order as rows of a new store
+        if not isinstance(anomalies, AnomalyView):
+            anomalies = AnomalyStore.from_records(list(anomalies)).view()
         self._anomalies = anomalies
         self._processor = processor
-        self._actions: Dict[int, str] = {}
         self._flagged_skus: set = set()
         
+        # columns are read straight from the store as rows scroll into view
+        self._model = AnomalyTableModel(self)
+        self._model.set_anomalies(anomalies)
+        self._frame = self._model.get_data()
+        
         self._setup_ui()
-        self._populate_table()
     
     # ---------- UI SETUP ----------
     
@@ -101,20 +133,25 @@ class AnomalyReviewDialog(QDialog):
         layout.addLayout(search_layout)
         
         # anomaly table
-        self._table = QTableWidget()
-        self._table.setColumnCount(7)
-        self._table.setHorizontalHeaderLabels([
-            "Item", "Date", "Value", "Expected", "Type", "Severity", "Action"
-        ])
+        self._table = QTableView()
+        self._table.setModel(self._model)
+        self._table.setItemDelegateForColumn(AnomalyTableModel.ACTION_COLUMN, ActionDelegate(self._table))
         self._table.setAlternatingRowColors(True)
         self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # only the action column is editable in the model
+        self._table.setEditTriggers(QAbstractItemView.AllEditTriggers)
         self._table.horizontalHeader().setStretchLastSection(True)
-        self._table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # fixed widths avoid measuring every row to fit contents
+        self._table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self._table.horizontalHeader().setDefaultSectionSize(130)
         self._table.verticalHeader().setVisible(False)
         # set taller default row height for readability
+        self._table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self._table.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
-        self._table.itemSelectionChanged.connect(self._on_selection_changed)
+        self._table.selectionModel().selectionChanged.connect(self._on_selection_changed)
+        self._model.dataChanged.connect(self._update_summary)
+        # playlist order is kept until a header is clicked
+        self._table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self._table.setSortingEnabled(True)
         
         layout.addWidget(self._table)
@@ -198,134 +235,38 @@ class AnomalyReviewDialog(QDialog):
         
         self._update_summary()
     
-    # ---------- TABLE POPULATION ----------
+    # ---------- TABLE ACCESS ----------
     
-    def _populate_table(self) -> None:
-        # populate table with anomalies
-        self._table.setRowCount(len(self._anomalies))
-        
-        for i, anomaly in enumerate(self._anomalies):
-            # ensure row has desired height
-            self._table.setRowHeight(i, self.ROW_HEIGHT)
-            
-            # sku column
-            sku_item = QTableWidgetItem(anomaly.sku)
-            sku_item.setFlags(sku_item.flags() | Qt.ItemIsSelectable)
-            sku_item.setData(Qt.UserRole, anomaly)
-            self._table.setItem(i, 0, sku_item)
-            
-            # date column
-            date_item = QTableWidgetItem(str(anomaly.date))
-            self._table.setItem(i, 1, date_item)
-            
-            # value column
-            value_item = QTableWidgetItem(f"{anomaly.value:,.0f}")
-            value_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self._table.setItem(i, 2, value_item)
-            
-            # expected column
-            expected_item = QTableWidgetItem(f"{anomaly.expected_value:,.0f}")
-            expected_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self._table.setItem(i, 3, expected_item)
-            
-            # type column
-            type_text = config.ANOMALY_TYPES.get(anomaly.anomaly_type, anomaly.anomaly_type)
-            type_item = QTableWidgetItem(type_text)
-            self._table.setItem(i, 4, type_item)
-            
-            # severity column
-            severity_pct = int(anomaly.severity * 100)
-            severity_item = QTableWidgetItem(f"{severity_pct}%")
-            severity_item.setTextAlignment(Qt.AlignCenter)
-            
-            # set background color by severity
-            if anomaly.severity >= 0.7:
-                severity_item.setBackground(QBrush(QColor("#E57373")))
-            elif anomaly.severity >= 0.4:
-                severity_item.setBackground(QBrush(QColor("#FFD54F")))
-            else:
-                severity_item.setBackground(QBrush(QColor("#81C784")))
-            
-            self._table.setItem(i, 5, severity_item)
-            
-            # action combo column
-            action_combo = QComboBox()
-            action_combo.addItems([
-                "Pending",
-                "Keep",
-                "Flag",
-                "Auto-correct",
-                "Remove"
-            ])
-            # store row index on widget
-            action_combo.setProperty("row", i)
-            action_combo.currentIndexChanged.connect(self._on_action_changed)
-            self._table.setCellWidget(i, 6, action_combo)
+    def _anomaly_at(self, row: int) -> Anomaly:
+        # anomaly shown in a table row after any sorting
+        return self._anomalies[self._model.anomaly_index(row)]
+    
+    def _selected_rows(self) -> np.ndarray:
+        # table rows of the selection read from its ranges
+        ranges = self._table.selectionModel().selection()
+        if ranges.isEmpty():
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate([np.arange(r.top(), r.bottom() + 1) for r in ranges]))
+    
+    def _first_selected_row(self) -> Optional[int]:
+        # topmost selected row without listing every selected index
+        rows = self._selected_rows()
+        return int(rows[0]) if len(rows) else None
     
     # ---------- FILTERING ----------
     
     def _apply_filter(self, *args) -> None:
         # apply type severity and search filters
         # args is ignored so method can be used for multiple signals
-        
-        type_index = self._type_filter.currentIndex()
-        severity_index = self._severity_filter.currentIndex()
-        search_text = self._search_edit.text().lower().strip()
-        
-        for row in range(self._table.rowCount()):
-            sku_item = self._table.item(row, 0)
-            if not sku_item:
-                continue
-            
-            # get anomaly from user role
-            anomaly: Anomaly = sku_item.data(Qt.UserRole)
-            show = True
-            
-            # type filter conditions
-            if type_index == 1 and anomaly.anomaly_type != "spike":
-                show = False
-            elif type_index == 2 and anomaly.anomaly_type != "drop":
-                show = False
-            elif type_index == 3 and anomaly.anomaly_type != "zero":
-                show = False
-            elif type_index == 4 and anomaly.anomaly_type != "gap":
-                show = False
-            
-            # severity filter conditions
-            if show:
-                if severity_index == 1 and anomaly.severity < 0.7:
-                    show = False
-                elif severity_index == 2 and anomaly.severity < 0.4:
-                    show = False
-            
-            # search filter conditions
-            if show and search_text:
-                row_match = False
-                for col in range(self._table.columnCount()):
-                    item = self._table.item(row, col)
-                    if not item:
-                        continue
-                    if search_text in item.text().lower():
-                        row_match = True
-                        break
-                if not row_match:
-                    show = False
-            
-            # apply visibility
-            self._table.setRowHidden(row, not show)
-        
+        self._model.set_filter(
+            self.TYPE_FILTERS[self._type_filter.currentIndex()],
+            self.SEVERITY_FILTERS[self._severity_filter.currentIndex()],
+            self._search_edit.text()
+        )
         self._update_summary()
     
     # ---------- ACTION STATE ----------
     
-    def _on_action_changed(self) -> None:
-        # update internal actions dict from combo change
-        combo = self.sender()
-        row = combo.property("row")
-        action = combo.currentText()
-        self._actions[row] = action
-        self._update_summary()
-    
     def _apply_batch_action(self) -> None:
         # apply one action to all selected rows
         label = self._batch_combo.currentText()
@@ -341,16 +282,8 @@ class AnomalyReviewDialog(QDialog):
         }
         action = map_text.get(label, "Pending")
         
-        # collect unique selected rows
-        selected_rows = {idx.row() for idx in self._table.selectedIndexes()}
-        
-        for row in selected_rows:
-            combo = self._table.cellWidget(row, 6)
-            if combo:
-                idx = combo.findText(action)
-                if idx >= 0:
-                    combo.setCurrentIndex(idx)
-                    self._actions[row] = action
+        # one assignment over the selected rows
+        count = self._model.set_actions(self._selected_rows(), action)
         
         # reset batch selector
         self._batch_combo.setCurrentIndex(0)
@@ -359,22 +292,20 @@ class AnomalyReviewDialog(QDialog):
         QMessageBox.information(
             self,
             "Batch Action Applied",
-            f"Applied '{action}' to {len(selected_rows)} selected anomalies."
+            f"Applied '{action}' to {count} selected anomalies."
         )
     
     def _on_selection_changed(self) -> None:
         # update details for selected anomaly
-        selected = self._table.selectedItems()
+        row = self._first_selected_row()
         
-        if not selected:
+        if row is None:
             self._details_label.setText("Select an anomaly to see details")
             self._view_btn.setEnabled(False)
             self._flag_btn.setEnabled(False)
             return
         
-        row = selected[0].row()
-        sku_item = self._table.item(row, 0)
-        anomaly: Anomaly = sku_item.data(Qt.UserRole)
+        anomaly = self._anomaly_at(row)
         
         self._show_details(anomaly)
         self._view_btn.setEnabled(True)
@@ -397,14 +328,11 @@ class AnomalyReviewDialog(QDialog):
     
     def _view_in_chart(self) -> None:
         # show sku chart with anomalies
-        selected = self._table.selectedItems()
-        if not selected:
+        row = self._first_selected_row()
+        if row is None:
             return
         
-        row = selected[0].row()
-        sku_item = self._table.item(row, 0)
-        anomaly: Anomaly = sku_item.data(Qt.UserRole)
-        sku = anomaly.sku
+        sku = self._anomaly_at(row).sku
         
         # if processor is available show embedded chart dialog
         if self._processor:
@@ -412,9 +340,12 @@ class AnomalyReviewDialog(QDialog):
             date_col = self._processor.get_mapped_column("date")
             qty_col = self._processor.get_mapped_column("quantity")
             
+            rows = self._frame[self._frame["sku"] == sku]
             sku_anoms = [
-                {"date": a.date, "value": a.value, "type": a.anomaly_type}
-                for a in self._anomalies if a.sku == sku
+                {"date": date, "value": value, "type": anomaly_type}
+                for date, value, anomaly_type in zip(
+                    rows["date"], rows["value"], rows["type"].astype(str)
+                )
             ]
             
             from ui.dialogs.anomaly_chart_dialog import AnomalyChartDialog
@@ -429,22 +360,14 @@ class AnomalyReviewDialog(QDialog):
     
     def _flag_selected(self) -> None:
         # flag selected sku for correction
-        selected = self._table.selectedItems()
-        if not selected:
+        row = self._first_selected_row()
+        if row is None:
             return
         
-        row = selected[0].row()
-        sku_item = self._table.item(row, 0)
-        anomaly: Anomaly = sku_item.data(Qt.UserRole)
-        sku = anomaly.sku
+        sku = self._anomaly_at(row).sku
         
-        # set action to flag in combo
-        combo = self._table.cellWidget(row, 6)
-        if combo:
-            idx = combo.findText("Flag")
-            if idx >= 0:
-                combo.setCurrentIndex(idx)
-                self._actions[row] = "Flag"
+        # set action of the row to flag
+        self._model.set_actions(np.array([row]), "Flag")
         
         # track flagged sku and emit signal
         self._flagged_skus.add(sku)
@@ -459,19 +382,12 @@ class AnomalyReviewDialog(QDialog):
     
     # ---------- SUMMARY / EXPORT ----------
     
-    def _update_summary(self) -> None:
-        # update summary footer text
+    def _update_summary(self, *args) -> None:
+        # update summary footer text from action counts
         total = len(self._anomalies)
-        visible = sum(
-            0 if self._table.isRowHidden(r) else 1
-            for r in range(self._table.rowCount())
-        )
-        actioned = sum(1 for a in self._actions.values() if a != "Pending")
-        
-        counts: Dict[str, int] = {}
-        for a in self._actions.values():
-            if a != "Pending":
-                counts[a] = counts.get(a, 0) + 1
+        visible = self._model.visible_count()
+        counts = self._model.action_counts()
+        actioned = sum(counts.values())
         
         if counts:
             action_text = ", ".join([f"{v} {k}" for k, v in counts.items()])
@@ -496,21 +412,8 @@ class AnomalyReviewDialog(QDialog):
         if not path:
             return
         
-        rows: List[Dict[str, Any]] = []
-        for idx, anomaly in enumerate(self._anomalies):
-            action = self._actions.get(idx, "Pending")
-            rows.append({
-                "sku": anomaly.sku,
-                "date": anomaly.date,
-                "value": anomaly.value,
-                "expected": anomaly.expected_value,
-                "type": anomaly.anomaly_type,
-                "severity": anomaly.severity,
-                "method": anomaly.method,
-                "action": action
-            })
-        
-        df = pd.DataFrame(rows)
+        df = self._frame.rename(columns={"expected_value": "expected"})
+        df["action"] = self._model.get_actions()
         df.to_csv(path, index=False)
         
         QMessageBox.information(self, "Export Complete", f"Exported to:\n{path}")
@@ -519,34 +422,27 @@ class AnomalyReviewDialog(QDialog):
     
     def _on_apply(self) -> None:
         # apply actions to underlying data
-        result = []
-        flagged: set = set()
-        corrections: List[Dict[str, Any]] = []
-        removals: List[Dict[str, Any]] = []
-        action_counts: Dict[str, int] = {}
-        
-        # collect actions per anomaly
-        for idx, anomaly in enumerate(self._anomalies):
-            action = self._actions.get(idx, "Pending")
-            if action == "Pending":
-                continue
-            
-            result.append((anomaly, action))
-            action_counts[action] = action_counts.get(action, 0) + 1
-            
-            if action == "Flag":
-                flagged.add(anomaly.sku)
-            elif action == "Auto-correct":
-                corrections.append({
-                    "sku": anomaly.sku,
-                    "date": anomaly.date,
-                    "new_value": anomaly.expected_value
-                })
-            elif action == "Remove":
-                removals.append({
-                    "sku": anomaly.sku,
-                    "date": anomaly.date
-                })
+        # actions are grouped with masks over the actioned anomalies
+        rows = self._model.actioned()
+        actions = self._model.get_actions()[rows]
+        frame = self._frame.iloc[rows]
+        skus = frame["sku"].tolist()
+        dates = frame["date"].tolist()
+        expected = frame["expected_value"].tolist()
+        
+        result = [(self._anomalies[i], action) for i, action in zip(rows.tolist(), actions.tolist())]
+        action_counts = self._model.action_counts()
+        flagged = {sku for sku, action in zip(skus, actions) if action == "Flag"}
+        corrections: List[Dict[str, Any]] = [
+            {"sku": sku, "date": date, "new_value": value}
+            for sku, date, value, action in zip(skus, dates, expected, actions)
+            if action == "Auto-correct"
+        ]
+        removals: List[Dict[str, Any]] = [
+            {"sku": sku, "date": date}
+            for sku, date, action in zip(skus, dates, actions)
+            if action == "Remove"
+        ]
         
         # if no actions selected show info and exit
         if not result:
@@ -557,69 +453,16 @@ class AnomalyReviewDialog(QDialog):
             )
             return
         
-        corrections_made = 0
-        removals_made = 0
+        applied = ""
+        changed = False
         
-        # apply changes to processor data when available
-        if self._processor and self._processor.processed_data is not None:
-            df = self._processor.processed_data
-            sku_col = self._processor.get_mapped_column("sku")
-            date_col = self._processor.get_mapped_column("date")
-            qty_col = self._processor.get_mapped_column("quantity")
-            
-            if sku_col and date_col and qty_col:
-                df = df.copy()
-                df[date_col] = pd.to_datetime(df[date_col])
-                
-                # auto-correct values
-                if corrections:
-                    corr_df = pd.DataFrame(corrections)
-                    corr_df["date"] = pd.to_datetime(corr_df["date"])
-                    corr_df = corr_df.drop_duplicates(subset=["sku", "date"])
-                    corr_df = corr_df.rename(
-                        columns={"sku": "_sku_corr", "date": "_date_corr", "new_value": "_new_val"}
-                    )
-                    
-                    df = df.merge(
-                        corr_df,
-                        left_on=[sku_col, date_col],
-                        right_on=["_sku_corr", "_date_corr"],
-                        how="left"
-                    )
-                    
-                    mask = df["_new_val"].notna()
-                    corrections_made = int(mask.sum())
-                    if corrections_made > 0:
-                        df.loc[mask, qty_col] = df.loc[mask, "_new_val"]
-                    
-                    df = df.drop(columns=["_sku_corr", "_date_corr", "_new_val"])
-                
-                # remove data points
-                if removals:
-                    rem_df = pd.DataFrame(removals)
-                    rem_df["date"] = pd.to_datetime(rem_df["date"])
-                    rem_df = rem_df.drop_duplicates(subset=["sku", "date"])
-                    rem_df = rem_df.rename(
-                        columns={"sku": "_sku_rem", "date": "_date_rem"}
-                    )
-                    
-                    df = df.merge(
-                        rem_df,
-                        left_on=[sku_col, date_col],
-                        right_on=["_sku_rem", "_date_rem"],
-                        how="left",
-                        indicator="_rem_flag"
-                    )
-                    
-                    mask = df["_rem_flag"] == "both"
-                    removals_made = int(mask.sum())
-                    if removals_made > 0:
-                        df = df[~mask]
-                    
-                    df = df.drop(columns=["_sku_rem", "_date_rem", "_rem_flag"])
-                
-                df = df.reset_index(drop=True)
-                self._processor.processed_data = df
+        # changes go through the processor fix log so they can be undone
+        # and the changed items are known to incremental re-detection
+        if self._processor and self._processor.processed_data is not None and (corrections or removals):
+            changed, message = self._processor.apply_fix(
+                "review_actions", corrections=corrections, removals=removals
+            )
+            applied = f"\n\nData update: {message}." if changed else f"\n\nData not changed: {message}."
         
         # emit summary signals
         self.anomalies_actioned.emit(result)
@@ -627,16 +470,12 @@ class AnomalyReviewDialog(QDialog):
         for sku in flagged:
             self.flag_for_correction.emit(sku)
         
-        if corrections_made > 0:
-            self.anomalies_corrected.emit(corrections)
+        if changed:
+            self.anomalies_corrected.emit(corrections + removals)
         
         # build summary text
         lines = [f"• {v} anomalies: {k}" for k, v in action_counts.items()]
-        extra = ""
-        if corrections_made > 0:
-            extra += f"\n\n{corrections_made} values were auto-corrected."
-        if removals_made > 0:
-            extra += f"\n{removals_made} data points were removed."
+        extra = applied
         if flagged:
             extra += f"\n\n{len(flagged)} unique items flagged for correction."
         
@@ -655,11 +494,7 @@ class AnomalyReviewDialog(QDialog):
     
     def get_actions(self) -> List[tuple]:
         # return anomaly actions list
-        result = []
-        for idx, anomaly in enumerate(self._anomalies):
-            action = self._actions.get(idx, "Pending")
-            result.append((anomaly, action))
-        return result
+        return list(zip(self._anomalies, self._model.get_actions().tolist()))
     
     def set_processor(self, processor) -> None:
         # set data processor reference
@@ -25,12 +25,15 @@ class ClusteringConfigDialog(QDialog):
     
     # signals
     config_changed = pyqtSignal(dict)
+    preview_changed = pyqtSignal(dict)
     
-    def __init__(self, current_config: Dict = None, parent=None):
+    def __init__(self, current_config: Dict = None, parent=None, clustering=None):
         # initialize dialog
         super().__init__(parent)
         
         self._config = current_config or config.CLUSTERING.copy()
+        # clustering with cached metrics gives live cluster sizes while editing
+        self._clustering = clustering
         self._setup_ui()
         self._load_config()
     
@@ -262,7 +265,22 @@ class ClusteringConfigDialog(QDialog):
         pat = cfg["pattern_thresholds"]
         pat_text = f"CV > {pat['erratic']} = erratic, CV < {pat['variable']} = steady"
         
-        self._preview_label.setText(f"{vol_text}. {pat_text}")
+        text = f"{vol_text}. {pat_text}"
+        
+        if self._clustering is not None and self._clustering.metrics:
+            preview = self._clustering.preview_counts(cfg)
+            tiers = {t: 0 for t in self._clustering.TIERS}
+            patterns = {p: 0 for p in self._clustering.PATTERNS}
+            for (tier, pattern), info in preview.items():
+                tiers[tier] += info["sku_count"]
+                patterns[pattern] += info["sku_count"]
+            text += (
+                "\n\nItems per tier: " + ", ".join(f"{t} {n:,}" for t, n in tiers.items()) +
+                "\nItems per pattern: " + ", ".join(f"{p} {n:,}" for p, n in patterns.items())
+            )
+            self.preview_changed.emit(preview)
+        
+        self._preview_label.setText(text)
     
     def _reset_defaults(self) -> None:
         # reset to default configuration
@@ -0,0 +1,156 @@
+"""
+database source dialog module
+picks a table or query from a local database file
+rollup to sku x date is done by the database engine
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QListWidget, QListWidgetItem, QPushButton,
+    QGroupBox, QRadioButton, QPlainTextEdit, QCheckBox
+)
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+from typing import Dict, Any
+
+import config
+
+
+# ============================================================================
+#                        DATABASE SOURCE DIALOG
+# ============================================================================
+
+class DatabaseSourceDialog(QDialog):
+    # dialog for choosing table or query of a database file
+    
+    # signals
+    source_selected = pyqtSignal(dict)
+    
+    def __init__(self, file_path: str, tables: Dict[str, int], parent=None):
+        # initialize dialog
+        super().__init__(parent)
+        
+        self._file_path = file_path
+        self._tables = tables
+        
+        self._setup_ui()
+        self._populate_tables()
+    
+    # ---------- UI SETUP ----------
+    
+    def _setup_ui(self) -> None:
+        # setup user interface
+        self.setWindowTitle("Open Database")
+        self.setMinimumWidth(560)
+        self.setMinimumHeight(460)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+        
+        # header
+        header = QLabel("Choose the sales history to load")
+        header.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        layout.addWidget(header)
+        
+        # file info
+        file_name = self._file_path.split("/")[-1].split("\\")[-1]
+        info_label = QLabel(f"🗄 {file_name} • {len(self._tables)} table(s)")
+        info_label.setStyleSheet("color: #666;")
+        layout.addWidget(info_label)
+        
+        # table source
+        source_group = QGroupBox("Source")
+        source_layout = QVBoxLayout(source_group)
+        
+        self._table_radio = QRadioButton("Table or view")
+        self._table_radio.setChecked(True)
+        source_layout.addWidget(self._table_radio)
+        
+        self._table_list = QListWidget()
+        self._table_list.setAlternatingRowColors(True)
+        self._table_list.itemDoubleClicked.connect(lambda item: self._on_load())
+        source_layout.addWidget(self._table_list)
+        
+        # query source
+        self._query_radio = QRadioButton("SQL query")
+        source_layout.addWidget(self._query_radio)
+        
+        self._query_edit = QPlainTextEdit()
+        self._query_edit.setPlaceholderText("SELECT ... FROM ...")
+        self._query_edit.setMaximumHeight(90)
+        self._query_edit.setEnabled(False)
+        source_layout.addWidget(self._query_edit)
+        
+        self._table_radio.toggled.connect(self._table_list.setEnabled)
+        self._query_radio.toggled.connect(self._query_edit.setEnabled)
+        
+        layout.addWidget(source_group)
+        
+        # rollup
+        self._aggregate_check = QCheckBox("Combine rows to one per SKU and date in the database")
+        self._aggregate_check.setChecked(True)
+        layout.addWidget(self._aggregate_check)
+        
+        # buttons
+        button_layout = QHBoxLayout()
+        
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        load_btn = QPushButton("Next")
+        load_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {config.UI_COLORS['primary']};
+                color: white;
+                border: none;
+                padding: 8px 20px;
+                border-radius: 4px;
+                font-weight: bold;
+            }}
+            QPushButton:hover {{
+                background-color: #3A9CC0;
+            }}
+        """)
+        load_btn.clicked.connect(self._on_load)
+        button_layout.addWidget(load_btn)
+        
+        layout.addLayout(button_layout)
+    
+    # ---------- POPULATION ----------
+    
+    def _populate_tables(self) -> None:
+        # populate table list largest first
+        for name, row_count in sorted(self._tables.items(), key=lambda x: -x[1]):
+            item = QListWidgetItem(f"📊 {name} ({row_count:,} rows)")
+            item.setData(Qt.UserRole, name)
+            self._table_list.addItem(item)
+        
+        if self._table_list.count() > 0:
+            self._table_list.setCurrentRow(0)
+        else:
+            self._query_radio.setChecked(True)
+    
+    # ---------- ACTIONS ----------
+    
+    def get_source(self) -> Dict[str, Any]:
+        # collect choice as keyword arguments for set_database_options
+        source = {"table": None, "query": None, "aggregate": self._aggregate_check.isChecked()}
+        
+        if self._query_radio.isChecked():
+            source["query"] = self._query_edit.toPlainText().strip() or None
+        elif self._table_list.currentItem():
+            source["table"] = self._table_list.currentItem().data(Qt.UserRole)
+        
+        return source
+    
+    def _on_load(self) -> None:
+        # emit choice and close
+        source = self.get_source()
+        if not source["table"] and not source["query"]:
+            return
+        self.source_selected.emit(source)
+        self.accept()
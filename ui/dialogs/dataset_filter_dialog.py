@@ -0,0 +1,186 @@
+"""
+dataset filter dialog module
+sets load filters for parquet datasets and database files
+filters are applied by the reader before data is loaded
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QGroupBox, QGridLayout,
+    QCheckBox, QDateEdit, QLineEdit
+)
+from PyQt5.QtCore import Qt, QDate, pyqtSignal
+from PyQt5.QtGui import QFont
+from typing import Dict, List, Any
+import pandas as pd
+
+import config
+
+
+# ============================================================================
+#                         DATASET FILTER DIALOG
+# ============================================================================
+
+class DatasetFilterDialog(QDialog):
+    # dialog for choosing what part of a parquet dataset to load
+    
+    # signals
+    filters_selected = pyqtSignal(dict)
+    
+    def __init__(self,
+                 source: str,
+                 info: Dict[str, Any],
+                 mapping: Dict[str, str],
+                 parent=None):
+        # initialize dialog
+        super().__init__(parent)
+        
+        self._source = source
+        self._info = info
+        self._mapping = mapping
+        
+        self._setup_ui()
+    
+    # ---------- UI SETUP ----------
+    
+    def _setup_ui(self) -> None:
+        # setup user interface
+        self.setWindowTitle("Choose Data to Load")
+        self.setMinimumWidth(480)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+        
+        # header
+        header = QLabel("Choose what to load from this dataset")
+        header.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        layout.addWidget(header)
+        
+        # source info
+        info_label = QLabel(self._info.get("summary") or self._dataset_summary())
+        info_label.setWordWrap(True)
+        info_label.setStyleSheet("color: #666;")
+        layout.addWidget(info_label)
+        
+        # filters
+        filter_group = QGroupBox("Load Filters")
+        grid = QGridLayout(filter_group)
+        
+        # date range
+        date_col = self._mapping.get("date")
+        self._date_check = QCheckBox(f"Date range ({date_col})" if date_col else "Date range")
+        self._date_check.setEnabled(bool(date_col))
+        grid.addWidget(self._date_check, 0, 0)
+        
+        self._date_from = QDateEdit()
+        self._date_to = QDateEdit()
+        for edit, value in [(self._date_from, self._info.get("date_min")),
+                            (self._date_to, self._info.get("date_max"))]:
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+            if value is not None:
+                value = pd.Timestamp(value)
+                edit.setDate(QDate(value.year, value.month, value.day))
+        self._date_check.toggled.connect(self._date_from.setEnabled)
+        self._date_check.toggled.connect(self._date_to.setEnabled)
+        
+        date_row = QHBoxLayout()
+        date_row.addWidget(self._date_from)
+        date_row.addWidget(QLabel("to"))
+        date_row.addWidget(self._date_to)
+        grid.addLayout(date_row, 0, 1)
+        
+        # categories
+        cat_col = self._mapping.get("category")
+        grid.addWidget(QLabel(f"Categories ({cat_col})" if cat_col else "Categories"), 1, 0)
+        self._category_edit = QLineEdit()
+        self._category_edit.setPlaceholderText("all - or comma separated list")
+        self._category_edit.setEnabled(bool(cat_col))
+        grid.addWidget(self._category_edit, 1, 1)
+        
+        # skus
+        sku_col = self._mapping.get("sku")
+        grid.addWidget(QLabel(f"SKUs ({sku_col})" if sku_col else "SKUs"), 2, 0)
+        self._sku_edit = QLineEdit()
+        self._sku_edit.setPlaceholderText("all - or comma separated list")
+        self._sku_edit.setEnabled(bool(sku_col))
+        grid.addWidget(self._sku_edit, 2, 1)
+        
+        layout.addWidget(filter_group)
+        
+        # projection
+        mapped = [c for c in self._mapping.values() if c]
+        self._project_check = QCheckBox(
+            f"Only read mapped columns ({len(mapped)} of {len(self._info.get('columns', []))})"
+        )
+        self._project_check.setChecked(bool(mapped))
+        self._project_check.setEnabled(bool(mapped))
+        layout.addWidget(self._project_check)
+        
+        # buttons
+        button_layout = QHBoxLayout()
+        
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        load_btn = QPushButton("Load")
+        load_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {config.UI_COLORS['primary']};
+                color: white;
+                border: none;
+                padding: 8px 20px;
+                border-radius: 4px;
+                font-weight: bold;
+            }}
+            QPushButton:hover {{
+                background-color: #3A9CC0;
+            }}
+        """)
+        load_btn.clicked.connect(self._on_load)
+        button_layout.addWidget(load_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def _dataset_summary(self) -> str:
+        # describe parquet dataset layout
+        folder_name = self._source.replace("\\", "/").rstrip("/").split("/")[-1]
+        partitions = ", ".join(self._info.get("partitions", [])) or "none"
+        return (
+            f"📁 {folder_name} • {self._info.get('files', 0)} file(s) • "
+            f"{self._info.get('row_groups', 0)} row groups • "
+            f"{self._info.get('rows', 0):,} rows • partitions: {partitions}"
+        )
+    
+    # ---------- ACTIONS ----------
+    
+    def _split_list(self, text: str) -> List[str]:
+        # split comma separated entry
+        return [v.strip() for v in text.split(",") if v.strip()]
+    
+    def get_filters(self) -> Dict[str, Any]:
+        # collect filters as keyword arguments for set_load_filters
+        filters = {
+            "date_range": None,
+            "categories": self._split_list(self._category_edit.text()),
+            "skus": self._split_list(self._sku_edit.text()),
+            "project_columns": self._project_check.isChecked()
+        }
+        
+        if self._date_check.isChecked():
+            filters["date_range"] = (
+                self._date_from.date().toString("yyyy-MM-dd"),
+                self._date_to.date().toString("yyyy-MM-dd")
+            )
+        
+        return filters
+    
+    def _on_load(self) -> None:
+        # emit filters and close
+        self.filters_selected.emit(self.get_filters())
+        self.accept()
@@ -490,8 +490,9 @@ class DataCleaningHelpDialog(QDialog):
                  "data errors or out-of-scope events.",
                  "#4CAF50"),
                 ("Step 3 – Optional second pass",
-                 "If needed, re-run anomaly detection once more to see the updated "
-                 "picture. At this stage, you will usually keep most remaining "
+                 "Items you correct or remove points from are rescanned right after "
+                 "you apply the review actions, so the updated picture appears "
+                 "without a full re-run. At this stage, you will usually keep most remaining "
                  "anomalies as real but unusual business events.",
                  "#4CAF50"),
                 ("When to stop",
@@ -83,6 +83,10 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self._on_open_file)
         file_menu.addAction(open_action)
         
+        open_folder_action = QAction("Open &Folder...", self)
+        open_folder_action.triggered.connect(self._on_open_folder)
+        file_menu.addAction(open_folder_action)
+        
         file_menu.addSeparator()
         
         # session submenu
@@ -279,6 +283,7 @@ class MainWindow(QMainWindow):
         # data tab signals
         self._data_tab.data_loaded.connect(self._on_data_loaded)
         self._data_tab.data_processed.connect(self._on_data_processed)
+        self._data_tab.data_appended.connect(self._on_data_appended)
         self._data_tab.proceed_requested.connect(lambda: self._switch_to_tab(1))
         
         # explore tab signals
@@ -361,6 +366,23 @@ class MainWindow(QMainWindow):
         self._update_session_info()
         self._set_status("Data processed - ready for pattern discovery")
     
+    def _on_data_appended(self, report: dict) -> None:
+        # handle new period merged into history
+        processor = self._data_tab.get_processor()
+        
+        # the change journal says which clusters and forecasts predate the merge
+        stale_clusters = self._session.get_stale_skus("clusters", processor)
+        stale_forecasts = self._session.get_stale_skus("forecasts", processor)
+        self._explore_tab.on_data_appended(report, stale_clusters)
+        self._forecast_tab.mark_stale(stale_forecasts)
+        
+        self._update_session_info()
+        self._set_status(
+            f"Appended {report.get('rows_added', 0):,} rows • "
+            f"{len(report.get('affected_skus', [])):,} items updated, "
+            f"{len(report.get('new_skus', [])):,} new"
+        )
+    
     def _on_clusters_created(self, clusters: dict) -> None:
         # handle clusters created event
         self._tabs.setTabEnabled(2, True)
@@ -516,7 +538,6 @@ class MainWindow(QMainWindow):
                 # restore data and mappings
                 self._session.set_data(session_data.get("processed_data"))
                 self._session.set_column_mapping(session_data.get("column_mapping", {}))
-                self._session.set_clusters(session_data.get("clusters", {}))
                 self._session.set_features(session_data.get("features", {}))
                 self._session.set_forecasts(session_data.get("forecasts", {}))
                 self._session.set_anomalies(session_data.get("anomalies", {}))
@@ -559,7 +580,8 @@ class MainWindow(QMainWindow):
                 clustering = self._explore_tab.get_clustering()
                 clustering.sku_clusters = clusters
                 clustering._calculate_cluster_summary()
-                self._explore_tab._navigator.set_clusters(clusters)
+                self._session.set_clusters(clusters, clustering)
+                self._explore_tab._navigator.set_clusters(clusters, clustering)
                 self._explore_tab._heatmap.set_cluster_matrix(clustering.cluster_summary)
                 summary_list = clustering.get_cluster_summary()
                 self._explore_tab._cluster_summary_label.setText(
@@ -612,6 +634,11 @@ class MainWindow(QMainWindow):
         self._switch_to_tab(0)
         self._data_tab._browse_file()
     
+    def _on_open_folder(self) -> None:
+        # open folder picker and route to data tab
+        self._switch_to_tab(0)
+        self._data_tab._browse_folder()
+    
     def _on_export_csv(self) -> None:
         # export forecasts to csv
         self._forecast_tab._export_csv()
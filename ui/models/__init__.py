@@ -6,9 +6,11 @@ contains qt model classes for data display
 from .session_model import SessionModel
 from .sku_table_model import SKUTableModel
 from .forecast_model import ForecastTableModel
+from .anomaly_table_model import AnomalyTableModel
 
 __all__ = [
     "SessionModel",
     "SKUTableModel",
-    "ForecastTableModel"
+    "ForecastTableModel",
+    "AnomalyTableModel"
 ]
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+anomaly table model module
+qt model over columnar anomaly data
+cells are formatted on demand so only visible rows cost anything
+"""
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QColor, QBrush
+from typing import Dict, Optional, Any
+import pandas as pd
+import numpy as np
+
+import config
+from core.anomaly_store import AnomalyStore, AnomalyView
+
+
+# ============================================================================
+#                         ANOMALY TABLE MODEL
+# ============================================================================
+
+class AnomalyTableModel(QAbstractTableModel):
+    # virtual table of anomalies with vectorized filter sort and actions
+    
+    COLUMNS = ["Item", "Date", "Value", "Expected", "Type", "Severity", "Action"]
+    ACTIONS = ["Pending", "Keep", "Flag", "Auto-correct", "Remove"]
+    ACTION_COLUMN = 6
+    
+    def __init__(self, parent=None):
+        # initialize empty model
+        super().__init__(parent)
+        
+        self._anomalies = AnomalyStore().view()
+        self._data = pd.DataFrame()
+        self._actions = np.zeros(0, dtype=np.int8)
+        
+        # visible anomaly positions in display order
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        self._date_text: Optional[np.ndarray] = None
+    
+    # ---------- DATA MANAGEMENT ----------
+    
+    def set_anomalies(self, anomalies: AnomalyView) -> None:
+        # set anomalies and reset actions filter and sort
+        self.beginResetModel()
+        
+        self._anomalies = anomalies
+        self._data = anomalies.to_frame()
+        frame = self._data
+        
+        self._sku_codes, self._sku_labels = pd.factorize(frame["sku"], sort=True)
+        self._date = frame["date"].to_numpy(dtype="datetime64[ns]")
+        self._value = frame["value"].to_numpy(dtype=float)
+        self._expected = frame["expected_value"].to_numpy(dtype=float)
+        self._severity = frame["severity"].to_numpy(dtype=float)
+        self._type_codes = frame["type"].cat.codes.to_numpy()
+        self._type_labels = np.array(
+            [config.ANOMALY_TYPES.get(t, t) for t in frame["type"].cat.categories], dtype=object
+        )
+        self._colors = np.select(
+            [self._severity >= 0.7, self._severity >= 0.4], [0, 1], 2
+        )
+        self._brushes = [QBrush(QColor(c)) for c in ("#E57373", "#FFD54F", "#81C784")]
+        
+        self._actions = np.zeros(len(frame), dtype=np.int8)
+        self._rows = np.arange(len(frame))
+        self._sort_column = -1
+        self._date_text = None
+        
+        self.endResetModel()
+    
+    def get_data(self) -> pd.DataFrame:
+        # anomaly rows as a dataframe in original order
+        return self._data
+    
+    def anomaly_index(self, row: int) -> int:
+        # anomaly position shown in a table row
+        return int(self._rows[row])
+    
+    def anomaly_indices(self, rows: np.ndarray) -> np.ndarray:
+        # anomaly positions shown in several table rows
+        return self._rows[np.asarray(rows, dtype=np.int64)]
+    
+    def visible_count(self) -> int:
+        # number of rows passing the filter
+        return len(self._rows)
+    
+    # ---------- QT MODEL INTERFACE ----------
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        # return number of visible rows
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        # return number of columns
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> QVariant:
+        # return data for cell formatted from the column arrays
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return QVariant()
+        
+        i = self._rows[index.row()]
+        col = index.column()
+        
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 0:
+                return str(self._sku_labels[self._sku_codes[i]])
+            elif col == 1:
+                return self._dates_as_text()[i]
+            elif col == 2:
+                return f"{self._value[i]:,.0f}"
+            elif col == 3:
+                return f"{self._expected[i]:,.0f}"
+            elif col == 4:
+                return self._type_labels[self._type_codes[i]]
+            elif col == 5:
+                return f"{int(self._severity[i] * 100)}%"
+            return self.ACTIONS[self._actions[i]]
+        
+        elif role == Qt.TextAlignmentRole:
+            if col in (2, 3):
+                return Qt.AlignRight | Qt.AlignVCenter
+            if col == 5:
+                return Qt.AlignCenter
+            return Qt.AlignLeft | Qt.AlignVCenter
+        
+        elif role == Qt.BackgroundRole and col == 5:
+            return self._brushes[self._colors[i]]
+        
+        elif role == Qt.UserRole:
+            return int(i)
+        
+        return QVariant()
+    
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        # set the action of one row from its label
+        if not index.isValid() or index.column() != self.ACTION_COLUMN or value not in self.ACTIONS:
+            return False
+        self._actions[self._rows[index.row()]] = self.ACTIONS.index(value)
+        self.dataChanged.emit(index, index)
+        return True
+    
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        # only the action column is editable
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.ACTION_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> QVariant:
+        # return header data
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.COLUMNS):
+            return self.COLUMNS[section]
+        return QVariant()
+    
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder) -> None:
+        # sort visible rows by one column with a single argsort
+        if column < 0 or column >= len(self.COLUMNS):
+            return
+        
+        self.beginResetModel()
+        self._sort_column = column
+        self._sort_order = order
+        self._sort_rows()
+        self.endResetModel()
+    
+    def _sort_rows(self) -> None:
+        # reorder visible rows by the current sort column
+        if self._sort_column < 0 or not len(self._rows):
+            return
+        
+        keys = self._sort_keys(self._sort_column)[self._rows]
+        if self._sort_order == Qt.DescendingOrder:
+            keys = -keys
+        self._rows = self._rows[np.argsort(keys, kind="stable")]
+    
+    def _sort_keys(self, column: int) -> np.ndarray:
+        # numeric sort key per anomaly for a column
+        if column == 0:
+            return self._sku_codes.astype(np.int64)
+        elif column == 1:
+            return self._date.astype(np.int64)
+        elif column == 2:
+            return self._value
+        elif column == 3:
+            return self._expected
+        elif column == 4:
+            # display labels decide type order
+            return np.argsort(np.argsort(self._type_labels, kind="stable"))[self._type_codes]
+        elif column == 5:
+            return self._severity
+        return self._actions.astype(np.int64)
+    
+    # ---------- FILTERING ----------
+    
+    def set_filter(self,
+                   anomaly_type: Optional[str] = None,
+                   min_severity: float = 0.0,
+                   search: str = "") -> None:
+        # keep rows matching type severity and item date or type text
+        self.beginResetModel()
+        
+        visible = self._severity >= min_severity
+        if anomaly_type:
+            visible &= (self._data["type"] == anomaly_type).to_numpy()
+        
+        search = search.lower().strip()
+        if search:
+            # item and type text are matched once per label then spread to rows
+            skus = pd.Series(self._sku_labels.astype(str)).str.lower().str.contains(search, regex=False)
+            types = pd.Series(self._type_labels.astype(str)).str.lower().str.contains(search, regex=False)
+            dates = pd.Series(self._dates_as_text()).str.contains(search, regex=False)
+            visible &= (
+                skus.to_numpy()[self._sku_codes]
+                | types.to_numpy()[self._type_codes]
+                | dates.to_numpy()
+            )
+        
+        self._rows = np.flatnonzero(visible)
+        self._sort_rows()
+        self.endResetModel()
+    
+    def _dates_as_text(self) -> np.ndarray:
+        # date display text built once on first use
+        if self._date_text is None:
+            self._date_text = pd.DatetimeIndex(self._date).astype(str).to_numpy(dtype=object)
+        return self._date_text
+    
+    # ---------- ACTIONS ----------
+    
+    def set_actions(self, rows: np.ndarray, action: str) -> int:
+        # set one action on several table rows at once
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows) or action not in self.ACTIONS:
+            return 0
+        
+        self._actions[self._rows[rows]] = self.ACTIONS.index(action)
+        self.dataChanged.emit(
+            self.index(int(rows.min()), self.ACTION_COLUMN),
+            self.index(int(rows.max()), self.ACTION_COLUMN)
+        )
+        return len(rows)
+    
+    def get_actions(self) -> np.ndarray:
+        # action label of every anomaly in original order
+        return np.array(self.ACTIONS, dtype=object)[self._actions]
+    
+    def actioned(self) -> np.ndarray:
+        # anomaly positions with an action other than pending
+        return np.flatnonzero(self._actions)
+    
+    def action_counts(self) -> Dict[str, int]:
+        # number of anomalies per action excluding pending
+        counts = np.bincount(self._actions, minlength=len(self.ACTIONS))
+        return {self.ACTIONS[i]: int(c) for i, c in enumerate(counts) if i and c}
@@ -5,11 +5,12 @@ tracks workflow progress and data
 """
 
 from PyQt5.QtCore import QObject, pyqtSignal
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
 import config
+from core.anomaly_store import AnomalyStore
 
 
 # ============================================================================
@@ -61,9 +62,11 @@ class SessionModel(QObject):
         self._data = None
         self._column_mapping = {}
         self._clusters = {}
+        self._clustering = None
         self._features = {}
         self._forecasts = {}
-        self._anomalies = {}
+        self._anomalies = AnomalyStore()
+        self._versions = {}
         self._bookmarks = []
     
     # ---------- STATE MANAGEMENT ----------
@@ -74,9 +77,11 @@ class SessionModel(QObject):
         self._data = None
         self._column_mapping = {}
         self._clusters = {}
+        self._clustering = None
         self._features = {}
         self._forecasts = {}
-        self._anomalies = {}
+        self._anomalies = AnomalyStore()
+        self._versions = {}
         self._bookmarks = []
         self.state_changed.emit("reset")
     
@@ -144,9 +149,11 @@ class SessionModel(QObject):
         # get column mapping
         return self._column_mapping.copy()
     
-    def set_clusters(self, clusters: Dict) -> None:
-        # set clustering results
+    def set_clusters(self, clusters: Dict, clustering=None, version: Optional[int] = None) -> None:
+        # set clustering results with the clustering that indexes them
         self._clusters = clusters
+        self._clustering = clustering
+        self._versions["clusters"] = version
         self.state.clusters_created = True
         self.state_changed.emit("clusters")
     
@@ -154,6 +161,32 @@ class SessionModel(QObject):
         # get clustering results
         return self._clusters
     
+    def get_clustering(self):
+        # get clustering holding the tier pattern and cell indexes
+        return self._clustering
+    
+    def get_tier_mapping(self) -> Dict[str, str]:
+        # shared sku to volume tier mapping of the current clusters
+        if self._clustering is not None:
+            return self._clustering.get_tier_mapping()
+        return {sku: cluster.volume_tier for sku, cluster in self._clusters.items()}
+    
+    def get_stale_skus(self, kind: str, processor) -> set:
+        # items whose clusters or forecasts predate a data change
+        results = self._clusters if kind == "clusters" else self._forecasts
+        version = self._versions.get(kind)
+        if version is None or not results:
+            return set()
+        
+        changes = processor.changes_since(version)
+        return set(results) if changes["full"] else set(changes["skus"])
+    
+    def get_skus_by_tier(self, tier: str) -> Tuple[str, ...]:
+        # skus of one volume tier
+        if self._clustering is not None:
+            return self._clustering.get_skus_by_tier(tier)
+        return tuple(sku for sku, cluster in self._clusters.items() if cluster.volume_tier == tier)
+    
     def set_features(self, features: Dict) -> None:
         # set feature engineering results
         self._features = features
@@ -164,9 +197,10 @@ class SessionModel(QObject):
         # get feature results
         return self._features
     
-    def set_forecasts(self, forecasts: Dict) -> None:
-        # set forecast results
+    def set_forecasts(self, forecasts: Dict, version: Optional[int] = None) -> None:
+        # set forecast results with the data version they were computed from
         self._forecasts = forecasts
+        self._versions["forecasts"] = version
         self.state.forecasts_generated = True
         self.state_changed.emit("forecasts")
     
@@ -174,12 +208,13 @@ class SessionModel(QObject):
         # get forecast results
         return self._forecasts
     
-    def set_anomalies(self, anomalies: Dict) -> None:
+    def set_anomalies(self, anomalies: Any) -> None:
         # set anomaly detection results
-        self._anomalies = anomalies
+        # sessions saved before the columnar store hold sku -> anomaly lists
+        self._anomalies = AnomalyStore.from_records(anomalies or {})
         self.state_changed.emit("anomalies")
     
-    def get_anomalies(self) -> Dict:
+    def get_anomalies(self) -> AnomalyStore:
         # get anomaly results
         return self._anomalies
     
@@ -229,7 +264,7 @@ class SessionModel(QObject):
             "quality_score": self.state.data_quality_score,
             "workflow_step": self.get_workflow_step(),
             "forecasts_count": len(self._forecasts),
-            "anomalies_count": sum(len(a) for a in self._anomalies.values()),
+            "anomalies_count": self._anomalies.n_rows,
             "bookmarks_count": len(self._bookmarks),
             "duration_minutes": duration.total_seconds() / 60
         }
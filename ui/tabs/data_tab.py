@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QDragEnterEvent, QDropEvent
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Union
 import os
 
 import config
@@ -21,9 +21,12 @@ from core.column_detector import ColumnDetector
 from ui.widgets.virtual_data_table import VirtualDataTable
 from ui.dialogs.column_mapping_dialog import ColumnMappingDialog
 from ui.dialogs.sheet_selection_dialog import SheetSelectionDialog
+from ui.dialogs.dataset_filter_dialog import DatasetFilterDialog
+from ui.dialogs.database_source_dialog import DatabaseSourceDialog
 from ui.dialogs.abnormal_data_dialog import AbnormalDataDialog
 from utils.worker_threads import WorkerThread
 from utils.file_handlers import FileHandler
+from utils.database_source import DatabaseSource
 
 
 # ============================================================================
@@ -36,6 +39,7 @@ class DataTab(QWidget):
     # signals
     data_loaded = pyqtSignal(dict)
     data_processed = pyqtSignal()
+    data_appended = pyqtSignal(dict)
     proceed_requested = pyqtSignal()
     
     def __init__(self, session_model, parent=None):
@@ -141,7 +145,9 @@ class DataTab(QWidget):
         text.setAlignment(Qt.AlignCenter)
         dz_layout.addWidget(text)
         
-        self._file_types_label = QLabel("Supports: CSV, Excel (with multiple sheets), Parquet")
+        self._file_types_label = QLabel(
+            "Supports: CSV (also .gz / .bz2 / .zst / .zip), Excel (with multiple sheets), Parquet - or several files / a folder"
+        )
         self._file_types_label.setAlignment(Qt.AlignCenter)
         self._file_types_label.setStyleSheet("font-size: 10px; color: #666;")
         dz_layout.addWidget(self._file_types_label)
@@ -156,6 +162,12 @@ class DataTab(QWidget):
         self._mapping_btn.setEnabled(False)
         self._mapping_btn.clicked.connect(self._show_mapping_dialog)
         map_layout.addWidget(self._mapping_btn)
+        
+        self._append_btn = QPushButton("➕ Append New Data")
+        self._append_btn.setToolTip("Add a new period of sales to the processed history")
+        self._append_btn.setEnabled(False)
+        self._append_btn.clicked.connect(self._append_data)
+        map_layout.addWidget(self._append_btn)
         map_layout.addStretch()
         layout.addLayout(map_layout)
         
@@ -188,6 +200,11 @@ class DataTab(QWidget):
         self._total_cols_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
         layout.addWidget(self._total_cols_label, 3, 1)
         
+        layout.addWidget(QLabel("Memory:"), 4, 0)
+        self._memory_label = QLabel("--")
+        self._memory_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        layout.addWidget(self._memory_label, 4, 1)
+        
         return group
     
     def _create_mapping_display_section(self) -> QGroupBox:
@@ -266,6 +283,16 @@ class DataTab(QWidget):
         self._view_abnormal_btn.clicked.connect(self._view_abnormal_data)
         btn_layout.addWidget(self._view_abnormal_btn)
         
+        self._undo_fix_btn = QPushButton("↶ Undo Fix")
+        self._undo_fix_btn.setEnabled(False)
+        self._undo_fix_btn.clicked.connect(self._undo_fix)
+        btn_layout.addWidget(self._undo_fix_btn)
+        
+        self._redo_fix_btn = QPushButton("↷ Redo Fix")
+        self._redo_fix_btn.setEnabled(False)
+        self._redo_fix_btn.clicked.connect(self._redo_fix)
+        btn_layout.addWidget(self._redo_fix_btn)
+        
         btn_layout.addStretch()
         layout.addLayout(btn_layout)
         
@@ -339,7 +366,9 @@ class DataTab(QWidget):
     def dropEvent(self, event: QDropEvent) -> None:
         # handle drop
         urls = event.mimeData().urls()
-        if urls:
+        if len(urls) > 1:
+            self._load_file([url.toLocalFile() for url in urls])
+        elif urls:
             file_path = urls[0].toLocalFile()
             self._load_file(file_path)
     
@@ -349,20 +378,98 @@ class DataTab(QWidget):
         # open file picker
         start_dir = str(config.BASE_DIR)
         
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Open Data File",
             start_dir,
             self._file_handler.get_open_filter()
         )
         
-        if file_path:
-            self._load_file(file_path)
+        if len(file_paths) > 1:
+            self._load_file(file_paths)
+        elif file_paths:
+            self._load_file(file_paths[0])
+    
+    def _browse_folder(self) -> None:
+        # open folder picker for multi file load
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Open Data Folder",
+            str(config.BASE_DIR)
+        )
+        
+        if folder:
+            self._load_file(folder)
+    
+    def _append_data(self) -> None:
+        # merge a new period file into processed history
+        if self._processor.processed_data is None:
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Append Data File",
+            str(config.BASE_DIR),
+            self._file_handler.get_open_filter()
+        )
+        if not file_path:
+            return
+        
+        # merging runs off the ui thread like a regular load
+        self._append_btn.setEnabled(False)
+        self._file_info_label.setText(f"Appending: {os.path.basename(file_path)}...")
+        self._worker = WorkerThread(self._processor.append_data, file_path)
+        self._worker.result_signal.connect(self._on_data_appended)
+        self._worker.error_signal.connect(self._on_append_error)
+        self._worker.progress_text_signal.connect(
+            lambda text: self._file_info_label.setText(f"Appending: {text}...")
+        )
+        self._worker.start()
+    
+    def _on_data_appended(self, result: Tuple[bool, str]) -> None:
+        # new period merged
+        success, message = result
+        self._append_btn.setEnabled(True)
+        
+        if not success:
+            self._file_info_label.setText(f"✗ {message}")
+            QMessageBox.warning(self, "Append Error", message)
+            return
+        
+        self._refresh_after_fix()
+        self._classify_skus()
+        self._session.update_state(
+            total_skus=len(self._processor.sku_list),
+            total_categories=len(self._processor.category_list),
+            total_rows=len(self._processor.processed_data)
+        )
+        self._file_info_label.setText(f"✓ {message}")
+        
+        self.data_appended.emit(self._processor.delta_report)
     
-    def _load_file(self, file_path: str) -> None:
+    def _load_file(self, file_path: Union[str, List[str]]) -> None:
         # start load with sheet detection
         self._pending_file_path = file_path
         self._pending_sheet_name = None
+        self._processor.clear_load_filters()
+        
+        if DatabaseSource.is_database(file_path):
+            if not self._choose_database_source(file_path):
+                self._pending_file_path = None
+                return
+            self._do_load_file()
+            return
+        
+        if self._processor.is_parquet_dataset(file_path):
+            if not self._choose_dataset_filters(file_path):
+                self._pending_file_path = None
+                return
+            self._do_load_file()
+            return
+        
+        if self._processor.is_multi_source(file_path):
+            self._do_load_file()
+            return
         
         if file_path.lower().endswith((".xlsx", ".xls")):
             sheet_info = self._processor.get_excel_sheet_info(file_path)
@@ -377,6 +484,67 @@ class DataTab(QWidget):
         
         self._do_load_file()
     
+    def _choose_dataset_filters(self, source: str) -> bool:
+        # detect columns on a preview and ask which slice to load
+        try:
+            info = self._processor.get_dataset_info(source)
+            detections = self._detector.detect_columns(
+                info["preview"], ColumnDetector.source_fingerprint(source)
+            )
+            mapping = self._detector.get_best_mapping(detections)
+            if mapping.get("date"):
+                info = self._processor.get_dataset_info(source, date_column=mapping["date"])
+        except Exception as e:
+            QMessageBox.warning(self, "Load Error", f"could not read dataset: {str(e)}")
+            return False
+        
+        self._processor.set_column_mapping(mapping)
+        
+        dialog = DatasetFilterDialog(source, info, mapping, self)
+        dialog.filters_selected.connect(
+            lambda filters: self._processor.set_load_filters(**filters)
+        )
+        return dialog.exec_() == dialog.Accepted
+    
+    def _choose_database_source(self, file_path: str) -> bool:
+        # pick table or query then filters pushed into sql
+        tables = self._processor.get_database_tables(file_path)
+        
+        dialog = DatabaseSourceDialog(file_path, tables, self)
+        dialog.source_selected.connect(
+            lambda source: self._processor.set_database_options(**source)
+        )
+        if dialog.exec_() != dialog.Accepted:
+            return False
+        
+        options = self._processor.database_options
+        try:
+            info = self._processor.get_database_info(file_path, options["table"], options["query"])
+            detections = self._detector.detect_columns(
+                info["preview"],
+                ColumnDetector.source_fingerprint(file_path, f"{options['table']}|{options['query']}")
+            )
+            mapping = self._detector.get_best_mapping(detections)
+            if mapping.get("date"):
+                info = self._processor.get_database_info(
+                    file_path, options["table"], options["query"], date_column=mapping["date"]
+                )
+        except Exception as e:
+            QMessageBox.warning(self, "Load Error", f"could not read database: {str(e)}")
+            return False
+        
+        self._processor.set_column_mapping(mapping)
+        info["summary"] = (
+            f"🗄 {options['table'] or 'SQL query'} • {info['rows']:,} rows • "
+            f"{len(info['columns'])} columns"
+        )
+        
+        filter_dialog = DatasetFilterDialog(file_path, info, mapping, self)
+        filter_dialog.filters_selected.connect(
+            lambda filters: self._processor.set_load_filters(**filters)
+        )
+        return filter_dialog.exec_() == filter_dialog.Accepted
+    
     def _on_sheet_selected(self, sheet_name: str) -> None:
         # store sheet name
         self._pending_sheet_name = sheet_name
@@ -389,7 +557,9 @@ class DataTab(QWidget):
         file_path = self._pending_file_path
         sheet_name = self._pending_sheet_name
         
-        if sheet_name:
+        if self._processor.is_multi_source(file_path):
+            self._file_info_label.setText(f"Loading: {self._describe_source(file_path)}...")
+        elif sheet_name:
             self._file_info_label.setText(
                 f"Loading: {os.path.basename(file_path)} (sheet: {sheet_name})..."
             )
@@ -403,8 +573,17 @@ class DataTab(QWidget):
         )
         self._worker.result_signal.connect(self._on_file_loaded)
         self._worker.error_signal.connect(self._on_load_error)
+        self._worker.progress_text_signal.connect(
+            lambda text: self._file_info_label.setText(f"Loading: {text}...")
+        )
         self._worker.start()
     
+    def _describe_source(self, source: Union[str, List[str]]) -> str:
+        # short label for file folder or file list
+        if isinstance(source, (list, tuple)):
+            return f"{len(source)} files"
+        return os.path.basename(os.path.normpath(source))
+    
     def _on_file_loaded(self, result: Tuple[bool, str]) -> None:
         # file loaded
         success, message = result
@@ -416,15 +595,27 @@ class DataTab(QWidget):
         
         stats = self._processor.get_summary_stats()
         sheet_info = f" (sheet: {self._pending_sheet_name})" if self._pending_sheet_name else ""
+        report = self._processor.load_report
+        if "row_groups_read" in report:
+            sheet_info = f" ({report['row_groups_read']} of {report['row_groups_total']} row groups read)"
         self._file_info_label.setText(
             f"✓ Loaded {stats.get('total_rows', 0):,} rows{sheet_info}"
         )
         
         self._update_statistics()
         
-        detections = self._detector.detect_columns(self._processor.raw_data)
+        # reopening an unchanged source reuses its cached detection
+        fingerprint = ColumnDetector.source_fingerprint(
+            self._pending_file_path, str(self._pending_sheet_name or "")
+        )
+        detections = self._detector.detect_columns(self._processor.raw_data, fingerprint)
         mapping = self._detector.get_best_mapping(detections)
         self._processor.set_column_mapping(mapping)
+        
+        # mapped columns are only known once the new file's mapping is detected
+        if report.get("schema_mismatches") or report.get("errors"):
+            self._show_load_report(report, mapping)
+        
         self._update_mapping_display(mapping)
         
         self._mapping_btn.setEnabled(True)
@@ -437,6 +628,40 @@ class DataTab(QWidget):
         
         self._show_mapping_dialog()
     
+    def _show_load_report(self, report: Dict, mapping: Dict[str, str]) -> None:
+        # warn about files that did not match the first file
+        mapped = {c for c in mapping.values() if c}
+        lines: List[str] = []
+        for name, info in report.get("schema_mismatches", {}).items():
+            parts = []
+            if info["missing_columns"]:
+                parts.append(f"missing {', '.join(info['missing_columns'])}")
+            if info["extra_columns"]:
+                parts.append(f"extra {', '.join(info['extra_columns'])}")
+            unmapped = [c for c in info["missing_columns"] if c in mapped]
+            if unmapped:
+                parts.append(f"no values for mapped {', '.join(unmapped)}")
+            lines.append(f"• {name}: {'; '.join(parts)}")
+        for name, error in report.get("errors", {}).items():
+            lines.append(f"• {name}: failed to read ({error})")
+        
+        dialog = QMessageBox(self)
+        dialog.setWindowTitle("Files Combined With Differences")
+        dialog.setText(
+            f"{len(lines)} file(s) differ from the first file. "
+            "Missing columns were left empty and extra columns were dropped."
+        )
+        dialog.setDetailedText("\n".join(lines))
+        dialog.setIcon(QMessageBox.Warning)
+        dialog.setStandardButtons(QMessageBox.Ok)
+        dialog.exec_()
+    
+    def _on_append_error(self, error: str) -> None:
+        # append error
+        self._append_btn.setEnabled(True)
+        self._file_info_label.setText(f"✗ Error: {error}")
+        QMessageBox.critical(self, "Error", f"Failed to append data:\n{error}")
+    
     def _on_load_error(self, error: str) -> None:
         # loader error
         self._file_info_label.setText(f"✗ Error: {error}")
@@ -456,11 +681,33 @@ class DataTab(QWidget):
         
         self._total_rows_label.setText(f"{total_rows:,}")
         self._total_cols_label.setText(f"{total_cols:,}")
+        self._update_memory_display(df)
         if self._processor.sku_list:
             self._sku_count_label.setText(f"{len(self._processor.sku_list):,}")
         else:
             self._sku_count_label.setText("--")
     
+    def _update_memory_display(self, df) -> None:
+        # frame size with bytes saved per column in the tooltip
+        mb = df.memory_usage(index=True, deep=False).sum() / (1024 * 1024)
+        report = self._processor.dtype_report if df is self._processor.processed_data else {}
+        saved = {col: entry for col, entry in report.items() if entry["saved"] > 0}
+        
+        if not saved:
+            self._memory_label.setText(f"{mb:,.1f} MB")
+            self._memory_label.setToolTip("")
+            return
+        
+        total = sum(entry["saved"] for entry in saved.values()) / (1024 * 1024)
+        self._memory_label.setText(f"{mb:,.1f} MB (saved {total:,.1f} MB)")
+        lines = [
+            f"{col}: {entry['from']} → {entry['to']}, saved {entry['saved'] / (1024 * 1024):,.2f} MB"
+            for col, entry in sorted(saved.items(), key=lambda item: -item[1]["saved"])
+        ]
+        kept = [f"{col}: kept {entry['to']} ({entry['note']})"
+                for col, entry in report.items() if not entry["saved"] and entry["note"]]
+        self._memory_label.setToolTip("\n".join(lines + kept))
+    
     def _update_mapping_display(self, mapping: Dict[str, str]) -> None:
         # mapping labels update
         for key, label in self._mapping_labels.items():
@@ -476,10 +723,13 @@ class DataTab(QWidget):
     
     def _show_mapping_dialog(self) -> None:
         # open mapping dialog
-        if self._processor.raw_data is None:
+        source = self._processor.raw_data
+        if source is None:
+            source = self._processor.processed_data
+        if source is None:
             return
         
-        columns = list(self._processor.raw_data.columns)
+        columns = list(source.columns)
         detections = getattr(self, "_detections", {})
         
         dialog = ColumnMappingDialog(columns, detections, self)
@@ -491,15 +741,27 @@ class DataTab(QWidget):
         self._processor.set_column_mapping(mapping)
         self._update_mapping_display(mapping)
         
-        success, message = self._processor.process_data()
+        success, message = self._processor.process_data(
+            release_raw=config.PERFORMANCE.get("release_raw_after_processing", False)
+        )
         if not success:
             QMessageBox.warning(self, "Processing Error", message)
             return
         
+        report = self._processor.process_report
+        self._file_info_label.setText(
+            f"✓ {message} • peak {report.get('peak_mb', 0):,.0f} MB measured "
+            f"({report.get('peak_ratio', 0):.1f}× data)"
+        )
+        
         self._session.set_data(self._processor.processed_data)
         self._session.set_column_mapping(mapping)
         self._session.update_state(
-            file_path=self._pending_file_path or "",
+            file_path=(
+                self._describe_source(self._pending_file_path)
+                if isinstance(self._pending_file_path, (list, tuple))
+                else self._pending_file_path or ""
+            ),
             total_skus=len(self._processor.sku_list),
             total_categories=len(self._processor.category_list),
             total_rows=len(self._processor.processed_data)
@@ -510,6 +772,10 @@ class DataTab(QWidget):
         self._calculate_quality()
         self._classify_skus()
         
+        self._undo_fix_btn.setEnabled(False)
+        self._redo_fix_btn.setEnabled(False)
+        self._append_btn.setEnabled(True)
+        
         preview_rows = min(1000, len(self._processor.processed_data))
         self._data_table.set_data(self._processor.processed_data.head(preview_rows))
         self._displayed_rows_label.setText(f"{preview_rows:,}")
@@ -577,9 +843,32 @@ class DataTab(QWidget):
         dialog.exec_()
         
         # recalc after dialog to reflect changes
+        self._refresh_after_fix()
+    
+    def _undo_fix(self) -> None:
+        # revert last data fix
+        success, message = self._processor.undo_fix()
+        if success:
+            self._refresh_after_fix()
+        else:
+            QMessageBox.information(self, "Undo Fix", message)
+    
+    def _redo_fix(self) -> None:
+        # apply last undone data fix again
+        success, message = self._processor.redo_fix()
+        if success:
+            self._refresh_after_fix()
+        else:
+            QMessageBox.information(self, "Redo Fix", message)
+    
+    def _refresh_after_fix(self) -> None:
+        # update quality preview and undo buttons after data changed
         self._calculate_quality()
         self._update_statistics()
         
+        self._undo_fix_btn.setEnabled(bool(self._processor.fix_history))
+        self._redo_fix_btn.setEnabled(bool(self._processor.redo_history))
+        
         if self._processor.processed_data is not None:
             preview_rows = min(1000, len(self._processor.processed_data))
             self._data_table.set_data(self._processor.processed_data.head(preview_rows))
@@ -590,10 +879,10 @@ class DataTab(QWidget):
     
     def _classify_skus(self) -> None:
         # classify skus into abc tiers
-        classification = self._processor.classify_skus()
+        counts = self._processor.get_tier_index().counts()
         
         for tier in ["A", "B", "C"]:
-            count = len(classification.get(tier, []))
+            count = counts.get(tier, 0)
             total = len(self._processor.sku_list)
             pct = (count / total * 100) if total > 0 else 0
             label = self.findChild(QLabel, f"tier_{tier}_count")
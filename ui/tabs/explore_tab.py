@@ -7,7 +7,7 @@ handles sku browsing clustering and anomaly detection
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QGroupBox, QFrame, QSplitter,
-    QTabWidget, QMessageBox
+    QTabWidget, QMessageBox, QComboBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
@@ -16,6 +16,8 @@ from typing import Optional, Dict, List
 import config
 from core.rule_clustering import RuleClustering
 from core.anomaly_detector import AnomalyDetector
+from core.anomaly_store import AnomalyStore
+from core.identifiers import iter_groups
 from ui.widgets.sku_navigator import SKUNavigator
 from ui.widgets.time_series_chart import TimeSeriesChart
 from ui.widgets.heatmap_widget import HeatmapWidget
@@ -24,6 +26,7 @@ from ui.dialogs.clustering_config_dialog import ClusteringConfigDialog
 from ui.dialogs.anomaly_review_dialog import AnomalyReviewDialog
 from ui.dialogs.help_dialog import ClusterHelpDialog
 from utils.worker_threads import WorkerThread, SimpleWorker
+from utils.date_utils import DateUtils
 from ui.widgets.progress_dialog import ProgressDialog
 
 
@@ -49,6 +52,7 @@ class ExploreTab(QWidget):
         self._processor = None
         self._worker = None
         self._current_sku = None
+        self._cluster_version = None
         
         self._setup_ui()
         self._connect_signals()
@@ -85,6 +89,18 @@ class ExploreTab(QWidget):
         self._run_clustering_btn.clicked.connect(self._run_clustering)
         header_layout.addWidget(self._run_clustering_btn)
         
+        # anomaly method selector
+        self._anomaly_method_combo = QComboBox()
+        for key, method in config.ANOMALY_DETECTION["methods"].items():
+            self._anomaly_method_combo.addItem(method["name"], key)
+            self._anomaly_method_combo.setItemData(
+                self._anomaly_method_combo.count() - 1, method["description"], Qt.ToolTipRole
+            )
+        self._anomaly_method_combo.setCurrentIndex(
+            self._anomaly_method_combo.findData(config.ANOMALY_DETECTION["default_method"])
+        )
+        header_layout.addWidget(self._anomaly_method_combo)
+        
         # detect anomalies button
         self._detect_anomalies_btn = QPushButton("🔍 Detect Anomalies")
         self._detect_anomalies_btn.clicked.connect(self._detect_anomalies)
@@ -284,11 +300,8 @@ class ExploreTab(QWidget):
         
         skus = self._processor.sku_list
         
-        sku_data: Dict[str, Dict[str, str]] = {}
-        classification = self._processor.classify_skus()
-        for tier, tier_skus in classification.items():
-            for sku in tier_skus:
-                sku_data[sku] = {"tier": tier}
+        # tier metadata is built once per data version and shared
+        sku_data = self._processor.get_tier_index().get_metadata()
         
         self._navigator.set_skus(skus, sku_data)
         
@@ -296,10 +309,11 @@ class ExploreTab(QWidget):
         if cat_col:
             df = self._processor.processed_data
             sku_col = self._processor.get_mapped_column("sku")
-            categories: Dict[str, List[str]] = {}
-            for cat in df[cat_col].unique():
-                cat_skus = df[df[cat_col] == cat][sku_col].unique().tolist()
-                categories[cat] = cat_skus
+            # category item pairs deduplicated on integer codes in one pass
+            pairs = df[[cat_col, sku_col]].drop_duplicates()
+            categories: Dict[str, List[str]] = {
+                cat: group[sku_col].tolist() for cat, group in iter_groups(pairs, cat_col)
+            }
             self._navigator.set_categories(categories)
         
         self._status_label.setText(
@@ -325,10 +339,10 @@ class ExploreTab(QWidget):
         self._sparklines.set_data_from_dataframe(df, sku_col, date_col, qty_col, skus)
         
         if self._clustering.sku_clusters:
-            tier_mapping = {
-                sku: c.volume_tier for sku, c in self._clustering.sku_clusters.items()
-            }
-            self._sparklines.set_colors_by_tier(tier_mapping)
+            tier_mapping = self._clustering.get_tier_mapping()
+        else:
+            tier_mapping = self._processor.get_tier_mapping()
+        self._sparklines.set_colors_by_tier(tier_mapping)
     
     def _on_navigator_selection_changed(self, selected_skus: List[str]) -> None:
         # handle selection change
@@ -338,15 +352,20 @@ class ExploreTab(QWidget):
     # ---------- CLUSTERING ----------
     
     def _show_clustering_config(self) -> None:
-        # open clustering config dialog
-        dialog = ClusteringConfigDialog(self._clustering.config, self)
+        # open clustering config dialog with live cluster sizes on the heatmap
+        dialog = ClusteringConfigDialog(self._clustering.config, self, clustering=self._clustering)
+        dialog.preview_changed.connect(self._heatmap.set_cluster_matrix)
         dialog.config_changed.connect(self._on_clustering_config_changed)
-        dialog.exec_()
+        if not dialog.exec_() and self._clustering.cluster_summary:
+            self._heatmap.set_cluster_matrix(self._clustering.cluster_summary)
     
     def _on_clustering_config_changed(self, new_config: Dict) -> None:
-        # update config
+        # update config and reassign clusters from cached metrics
         self._clustering.config = new_config
         self._clustering.use_percentiles = new_config.get("use_percentiles", True)
+        
+        if self._clustering.sku_clusters:
+            self._show_clusters(self._clustering.assign_clusters())
     
     def _run_clustering(self) -> None:
         # execute clustering
@@ -363,13 +382,17 @@ class ExploreTab(QWidget):
         date_col = self._processor.get_mapped_column("date")
         qty_col = self._processor.get_mapped_column("quantity")
         
-        data = self._processor.processed_data.copy()
+        processor = self._processor
         clustering = self._clustering
+        self._cluster_version = processor.data_version
         
-        worker = SimpleWorker(
-            clustering.cluster_skus,
-            data, sku_col, date_col, qty_col
-        )
+        # workers read on disk item shards instead of copying the frame
+        def do_clustering():
+            return clustering.cluster_skus(
+                processor.get_shard_store(), sku_col, date_col, qty_col
+            )
+        
+        worker = SimpleWorker(do_clustering)
         self._worker = worker
         worker.result_signal.connect(lambda r: self._on_clustering_complete(r, progress))
         worker.error_signal.connect(lambda e: self._on_clustering_error(e, progress))
@@ -378,19 +401,20 @@ class ExploreTab(QWidget):
     def _on_clustering_complete(self, clusters: Dict, progress: ProgressDialog) -> None:
         # handle clustering complete
         progress.finish("Clustering complete")
-        
-        self._navigator.set_clusters(clusters)
+        self._show_clusters(clusters)
+    
+    def _show_clusters(self, clusters: Dict) -> None:
+        # refresh views and session with cluster assignments
+        self._navigator.set_clusters(clusters, self._clustering)
         self._heatmap.set_cluster_matrix(self._clustering.cluster_summary)
-        
-        tier_mapping = {sku: c.volume_tier for sku, c in clusters.items()}
-        self._sparklines.set_colors_by_tier(tier_mapping)
+        self._sparklines.set_colors_by_tier(self._clustering.get_tier_mapping())
         
         summary = self._clustering.get_cluster_summary()
         text = self._format_cluster_summary(summary)
         self._cluster_summary_label.setText(text)
         self._cluster_summary_label.setStyleSheet("color: #333;")
         
-        self._session.set_clusters(clusters)
+        self._session.set_clusters(clusters, self._clustering, self._cluster_version)
         self.clusters_created.emit(clusters)
         
         self._proceed_btn.setEnabled(True)
@@ -429,53 +453,82 @@ class ExploreTab(QWidget):
         date_col = self._processor.get_mapped_column("date")
         qty_col = self._processor.get_mapped_column("quantity")
         
-        data = self._processor.processed_data.copy()
+        processor = self._processor
         detector = self._anomaly_detector
+        method = self._anomaly_method_combo.currentData()
         
-        def do_detection(progress_callback=None):
+        # gaps are measured on the grid the dates follow
+        gap_freq = DateUtils.detect_offset(processor.processed_data[date_col])
+        
+        # the shard store is a read only snapshot so no copy of the data is needed
+        def do_detection(progress_callback=None, partial_callback=None):
             return detector.detect_batch(
-                data, sku_col, date_col, qty_col,
-                progress_callback=progress_callback
+                processor.get_shard_store(), sku_col, date_col, qty_col,
+                method=method,
+                progress_callback=progress_callback,
+                partial_callback=partial_callback,
+                include_runs=True,
+                gap_freq=gap_freq
             )
         
         worker = WorkerThread(do_detection)
         self._worker = worker
         worker.progress_signal.connect(progress.set_progress)
+        worker.progress_text_signal.connect(progress.set_status)
+        worker.partial_signal.connect(self._on_detection_partial)
         worker.result_signal.connect(lambda r: self._on_detection_complete(r, progress))
         worker.error_signal.connect(lambda e: self._on_detection_error(e, progress))
+        progress.cancelled.connect(worker.cancel)
         worker.start()
     
-    def _on_detection_complete(self, anomalies: Dict, progress: ProgressDialog) -> None:
+    def _on_detection_partial(self, anomalies: AnomalyStore, state: str = "Scanning") -> None:
+        # show results for the items scanned so far
+        self._session.set_anomalies(anomalies)
+        self._show_anomaly_summary(anomalies.summary(), state)
+        
+        if self._current_sku is not None and self._current_sku in anomalies:
+            self._update_sku_chart(self._current_sku)
+    
+    def _on_detection_complete(self, anomalies: AnomalyStore, progress: ProgressDialog) -> None:
         # handle detection complete
         progress.finish("Detection complete")
         
         self._session.set_anomalies(anomalies)
-        
-        summary = self._anomaly_detector.get_summary()
+        self._show_anomaly_summary(self._anomaly_detector.get_summary())
+    
+    def _show_anomaly_summary(self, summary: Dict, state: str = "") -> None:
+        # update anomaly counts with the scan state when results are partial
         total = summary.get("total_anomalies", 0)
         sku_count = summary.get("skus_with_anomalies", 0)
+        prefix = f"{state}... " if state else ""
         
         if total > 0:
             by_type = summary.get("by_type", {})
             type_text = ", ".join([f"{v} {k}s" for k, v in by_type.items()])
             self._anomaly_summary_label.setText(
-                f"Found {total:,} anomalies\n"
+                f"{prefix}Found {total:,} anomalies\n"
                 f"in {sku_count:,} items\n\n"
                 f"{type_text}"
             )
             self._anomaly_summary_label.setStyleSheet("color: #c00;")
             self._review_anomalies_btn.setEnabled(True)
         else:
-            self._anomaly_summary_label.setText("No anomalies detected ✓")
+            self._anomaly_summary_label.setText(f"{prefix}No anomalies detected ✓")
             self._anomaly_summary_label.setStyleSheet("color: green;")
             self._review_anomalies_btn.setEnabled(False)
         
         self._status_label.setText(
-            f"Found {total:,} anomalies in {sku_count:,} items"
+            f"{prefix}Found {total:,} anomalies in {sku_count:,} items"
         )
     
     def _on_detection_error(self, error: str, progress: ProgressDialog) -> None:
         # handle detection error
+        if error == "operation cancelled":
+            # items scanned before cancelling stay available for review
+            progress.finish("Cancelled - showing results for the items scanned")
+            self._on_detection_partial(self._anomaly_detector.anomalies, "Partial scan")
+            return
+        
         progress.finish(f"Error: {error}", auto_close=False)
         QMessageBox.critical(self, "Detection Error", f"Failed to detect anomalies:\n{error}")
     
@@ -510,16 +563,26 @@ class ExploreTab(QWidget):
             )
     
     def _on_anomalies_corrected(self, corrections: List[Dict]) -> None:
-        # handle corrected anomalies
-        if not corrections:
+        # rescan only the items whose series changed
+        if not corrections or self._processor is None:
             return
         
-        QMessageBox.information(
-            self,
-            "Data Updated",
-            "Some values were auto-corrected using expected patterns.\n"
-            "Re-run anomaly detection to see updated anomalies."
-        )
+        progress = ProgressDialog("Updating Anomalies", self)
+        progress.set_status(f"Rescanning {len({c['sku'] for c in corrections}):,} corrected items...")
+        progress.start()
+        
+        processor = self._processor
+        detector = self._anomaly_detector
+        
+        def do_redetection(progress_callback=None):
+            return detector.redetect(processor, progress_callback=progress_callback)
+        
+        worker = WorkerThread(do_redetection)
+        self._worker = worker
+        worker.progress_signal.connect(progress.set_progress)
+        worker.result_signal.connect(lambda r: self._on_detection_complete(r, progress))
+        worker.error_signal.connect(lambda e: self._on_detection_error(e, progress))
+        worker.start()
     
     def _on_flag_for_correction(self, sku: str) -> None:
         # forward sku to data tab
@@ -592,12 +655,8 @@ class ExploreTab(QWidget):
         
         self._chart.set_data(dates, values, label=sku)
         
-        anomalies = self._session.get_anomalies().get(sku, [])
-        if anomalies:
-            pts = [
-                {"date": a.date, "value": a.value, "type": a.anomaly_type}
-                for a in anomalies
-            ]
+        pts = self._session.get_anomalies().points(sku)
+        if pts:
             self._chart.set_anomalies(pts)
     
     # ---------- ACTIONS ----------
@@ -659,6 +718,24 @@ class ExploreTab(QWidget):
         # return clustering object
         return self._clustering
     
+    def on_data_appended(self, report: Dict, stale_clusters: set) -> None:
+        # redraw only views showing appended items and flag clusters that are out of date
+        if report.get("new_skus"):
+            self._refresh_navigator()
+        
+        affected = set(report.get("affected_skus", []))
+        shown = self._sparklines.get_skus()
+        if affected.intersection(shown):
+            self._refresh_sparklines(shown)
+        if self._current_sku in affected:
+            self._update_sku_chart(self._current_sku)
+        
+        if stale_clusters:
+            self._cluster_summary_label.setText(
+                f"{self._cluster_summary_label.text()}\n\n"
+                f"⚠ {len(stale_clusters):,} items changed since clustering - run clustering to update"
+            )
+    
     def refresh(self) -> None:
         # refresh tab visuals
         if self._processor:
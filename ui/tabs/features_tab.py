@@ -455,11 +455,8 @@ class FeaturesTab(QWidget):
         progress.set_status("Generating features for all items...")
         progress.start()
         
-        # get tier mapping
-        tier_mapping = {}
-        clusters = self._session.get_clusters()
-        for sku, cluster in clusters.items():
-            tier_mapping[sku] = cluster.volume_tier
+        # get shared tier mapping
+        tier_mapping = self._session.get_tier_mapping()
         
         # get column names
         sku_col = self._processor.get_mapped_column("sku")
@@ -471,7 +468,7 @@ class FeaturesTab(QWidget):
         # run in background
         def do_feature_creation(progress_callback=None):
             return self._engineer.create_features_batch(
-                self._processor.processed_data,
+                self._processor.get_shard_store(),
                 sku_col, date_col, qty_col,
                 tier_mapping,
                 price_col, promo_col,
@@ -17,6 +17,7 @@ from typing import Optional, Dict, List
 
 import config
 from core.forecaster import Forecaster
+from core.identifiers import group_count
 from ui.widgets.virtual_data_table import VirtualDataTable
 from ui.widgets.time_series_chart import TimeSeriesChart
 from ui.models.forecast_model import ForecastTableModel
@@ -51,6 +52,8 @@ class ForecastTab(QWidget):
         self._current_frequency = "D"
         self._comparison_results = None
         self._current_forecast_result = None
+        self._forecast_version = None
+        self._stale_skus = set()
         
         self._setup_ui()
         self._connect_signals()
@@ -335,8 +338,7 @@ class ForecastTab(QWidget):
         sku_count = self._session.state.total_skus or 0
         
         # get cluster info for advanced strategy
-        clusters = self._session.get_clusters()
-        a_item_count = sum(1 for c in clusters.values() if c.volume_tier == "A") if clusters else 0
+        a_item_count = len(self._session.get_skus_by_tier("A"))
         
         dialog = ForecastSettingsDialog(sku_count, a_item_count, self)
         dialog.settings_confirmed.connect(self._on_settings_confirmed)
@@ -392,21 +394,20 @@ class ForecastTab(QWidget):
         date_col = self._processor.get_mapped_column("date")
         qty_col = self._processor.get_mapped_column("quantity")
         
-        # get tier mapping
-        tier_mapping = {}
-        clusters = self._session.get_clusters()
-        for sku, cluster in clusters.items():
-            tier_mapping[sku] = cluster.volume_tier
+        # get tier mapping from clusters or the shared abc tier index
+        if self._session.get_clusters():
+            tier_mapping = self._session.get_tier_mapping()
+            a_items = self._session.get_skus_by_tier("A")
+        else:
+            tiers = self._processor.get_tier_index()
+            tier_mapping = tiers.get_mapping()
+            a_items = tiers.get_skus("A").tolist()
         
         # for advanced strategy, filter to A-items only
-        data_to_forecast = self._processor.processed_data
-        if strategy == "advanced":
-            a_items = [sku for sku, tier in tier_mapping.items() if tier == "A"]
-            if a_items:
-                data_to_forecast = self._processor.processed_data[
-                    self._processor.processed_data[sku_col].isin(a_items)
-                ]
-                progress.set_status(f"Forecasting {len(a_items)} A-items with advanced models...")
+        processor = self._processor
+        advanced_items = a_items if strategy == "advanced" else []
+        if advanced_items:
+            progress.set_status(f"Forecasting {len(a_items)} A-items with advanced models...")
         
         # get features
         features_data = self._session.get_features()
@@ -414,6 +415,11 @@ class ForecastTab(QWidget):
         
         # run in background
         def do_forecasting(progress_callback=None):
+            # items come from on disk shards hydrated a few at a time
+            data_to_forecast = processor.get_shard_store()
+            if advanced_items:
+                data_to_forecast = data_to_forecast.subset(advanced_items)
+            
             # generate main forecasts
             forecasts = self._forecaster.forecast_batch(
                 data_to_forecast,
@@ -434,11 +440,12 @@ class ForecastTab(QWidget):
                     sku_col, date_col, qty_col,
                     horizon=settings.get("horizon", 30),
                     frequency=settings.get("frequency", "D"),
-                    sample_size=min(50, len(data_to_forecast[sku_col].unique()))
+                    sample_size=min(50, group_count(data_to_forecast, sku_col))
                 )
             
             return forecasts, comparison
         
+        self._forecast_version = processor.data_version
         self._worker = WorkerThread(do_forecasting)
         self._worker.progress_signal.connect(progress.set_progress)
         self._worker.progress_text_signal.connect(lambda t: progress.set_status(f"Forecasting: {t}"))
@@ -462,7 +469,8 @@ class ForecastTab(QWidget):
         self._results_table.resizeColumnsToContents()
         
         # update session
-        self._session.set_forecasts(forecasts)
+        self._session.set_forecasts(forecasts, self._forecast_version)
+        self._stale_skus = set()
         
         # update summary
         self._update_summary()
@@ -708,18 +716,10 @@ class ForecastTab(QWidget):
         filtered = forecasts.copy()
         
         # apply item filter
-        if item_filter == "A-Items":
-            clusters = self._session.get_clusters()
-            filtered = {k: v for k, v in filtered.items() 
-                       if clusters.get(k) and clusters[k].volume_tier == "A"}
-        elif item_filter == "B-Items":
-            clusters = self._session.get_clusters()
-            filtered = {k: v for k, v in filtered.items() 
-                       if clusters.get(k) and clusters[k].volume_tier == "B"}
-        elif item_filter == "C-Items":
-            clusters = self._session.get_clusters()
+        if item_filter in ("A-Items", "B-Items", "C-Items"):
+            tier_mapping = self._session.get_tier_mapping()
             filtered = {k: v for k, v in filtered.items() 
-                       if clusters.get(k) and clusters[k].volume_tier == "C"}
+                       if tier_mapping.get(k) == item_filter[0]}
         elif item_filter == "Bookmarked":
             bookmarks = [b["sku"] for b in self._session.get_bookmarks()]
             filtered = {k: v for k, v in filtered.items() if k in bookmarks}
@@ -882,6 +882,14 @@ class ForecastTab(QWidget):
         # set data processor
         self._processor = processor
     
+    def mark_stale(self, skus: set) -> None:
+        # note forecasts of items whose history changed after forecasting
+        self._stale_skus = set(skus)
+        if self._stale_skus:
+            self._status_label.setText(
+                f"{len(self._stale_skus):,} items changed since forecasting - generate forecasts to update"
+            )
+    
     def refresh(self) -> None:
         # refresh tab
         forecasts = self._session.get_forecasts()
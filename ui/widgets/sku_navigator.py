@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QColor
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 import config
 
@@ -37,6 +37,7 @@ class SKUNavigator(QWidget):
         self._skus = []
         self._sku_data = {}
         self._clusters = {}
+        self._clustering = None
         self._categories = {}
         self._bookmarks = set()
         self._current_view = "all"
@@ -133,9 +134,10 @@ class SKUNavigator(QWidget):
         self._sku_data = sku_data or {}
         self._refresh_tree()
     
-    def set_clusters(self, clusters: Dict[str, Any]) -> None:
-        # set cluster assignments
+    def set_clusters(self, clusters: Dict[str, Any], clustering=None) -> None:
+        # set cluster assignments with the clustering that indexes them
         self._clusters = clusters
+        self._clustering = clustering
         if self._view_combo.currentText() in ["By Cluster", "By Volume Tier", "By Pattern"]:
             self._refresh_tree()
     
@@ -505,10 +507,14 @@ class SKUNavigator(QWidget):
         # get all skus in a category
         return self._categories.get(category, [])
     
-    def get_skus_in_tier(self, tier: str) -> List[str]:
+    def get_skus_in_tier(self, tier: str) -> Tuple[str, ...]:
         # get all skus in a tier
-        return [sku for sku, cluster in self._clusters.items() if cluster.volume_tier == tier]
+        if self._clustering is not None:
+            return self._clustering.get_skus_by_tier(tier)
+        return tuple(sku for sku, cluster in self._clusters.items() if cluster.volume_tier == tier)
     
-    def get_skus_in_pattern(self, pattern: str) -> List[str]:
+    def get_skus_in_pattern(self, pattern: str) -> Tuple[str, ...]:
         # get all skus with a pattern
-        return [sku for sku, cluster in self._clusters.items() if cluster.pattern_type == pattern]
\ No newline at end of file
+        if self._clustering is not None:
+            return self._clustering.get_skus_by_pattern(pattern)
+        return tuple(sku for sku, cluster in self._clusters.items() if cluster.pattern_type == pattern)
\ No newline at end of file
@@ -11,7 +11,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QPainter, QPen, QColor, QPainterPath, QBrush
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Mapping, Optional, Any
 import pandas as pd
 import numpy as np
 
@@ -229,6 +229,7 @@ class SparklinesWidget(QWidget):
         self._selected_sku = None
         self._data = {}
         self._tier_colors = {}
+        self._tier_mapping = {}
         
         self._setup_ui()
     
@@ -330,7 +331,7 @@ class SparklinesWidget(QWidget):
             df = df[df[sku_col].isin(skus)]
         
         # group by sku and get values sorted by date
-        for sku, group in df.groupby(sku_col):
+        for sku, group in df.groupby(sku_col, observed=True):
             sorted_group = group.sort_values(date_col)
             values = sorted_group[value_col].tolist()
             
@@ -392,8 +393,9 @@ class SparklinesWidget(QWidget):
             item.clicked.connect(self._on_sparkline_clicked)
             
             # apply tier color if set
-            if sku in self._tier_colors:
-                item.set_color(self._tier_colors[sku])
+            color = self._color_for(sku)
+            if color:
+                item.set_color(color)
             
             # insert before stretch
             self._container_layout.insertWidget(self._container_layout.count() - 1, item)
@@ -445,6 +447,10 @@ class SparklinesWidget(QWidget):
             # scroll to item
             self._scroll.ensureWidgetVisible(self._sparklines[sku])
     
+    def get_skus(self) -> List[str]:
+        # skus with a sparkline shown
+        return list(self._data)
+    
     def get_selected_sku(self) -> Optional[str]:
         # get selected sku
         return self._selected_sku
@@ -468,20 +474,28 @@ class SparklinesWidget(QWidget):
         if sku in self._sparklines:
             self._sparklines[sku].set_color(color)
     
-    def set_colors_by_tier(self, tier_mapping: Dict[str, str]) -> None:
-        # set colors based on tier
+    def set_colors_by_tier(self, tier_mapping: Mapping[str, str]) -> None:
+        # color sparklines by tier looked up only for the skus shown
+        self._tier_colors = {}
+        self._tier_mapping = tier_mapping
+        
+        # update existing sparklines
+        for sku, item in self._sparklines.items():
+            color = self._color_for(sku)
+            if color:
+                item.set_color(color)
+    
+    def _color_for(self, sku: str) -> Optional[str]:
+        # explicit color or the color of the sku tier
         tier_colors = {
             "A": "#4CAF50",  # green
             "B": "#FF9800",  # orange
             "C": "#F44336"   # red
         }
         
-        self._tier_colors = {}
-        for sku, tier in tier_mapping.items():
-            color = tier_colors.get(tier, config.UI_COLORS["primary"])
-            self._tier_colors[sku] = color
-        
-        # update existing sparklines
-        for sku, item in self._sparklines.items():
-            if sku in self._tier_colors:
-                item.set_color(self._tier_colors[sku])
\ No newline at end of file
+        if sku in self._tier_colors:
+            return self._tier_colors[sku]
+        tier = self._tier_mapping.get(sku)
+        if tier is None:
+            return None
+        return tier_colors.get(tier, config.UI_COLORS["primary"])
\ No newline at end of file
@@ -6,6 +6,8 @@ contains helper functions and classes
 from .worker_threads import WorkerThread, WorkerSignals, SimpleWorker, BatchWorker
 from .file_handlers import FileHandler
 from .date_utils import DateUtils
+from .compression import CompressionUtils, DecompressingReader
+from .database_source import DatabaseSource
 from .export_formatter import ExportFormatter
 from .memory_manager import MemoryManager
 from .logging_config import setup_logging
@@ -17,6 +19,9 @@ __all__ = [
     "BatchWorker",
     "FileHandler",
     "DateUtils",
+    "CompressionUtils",
+    "DecompressingReader",
+    "DatabaseSource",
     "ExportFormatter",
     "MemoryManager",
     "setup_logging"
@@ -0,0 +1,285 @@
+"""
+compression module
+streams compressed csv files without temp files
+decompresses on a background thread while pandas parses
+"""
+
+import io
+import bz2
+import gzip
+import queue
+import struct
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+# ============================================================================
+#                           COMPRESSION UTILS
+# ============================================================================
+
+class CompressionUtils:
+    # helpers for detecting and sizing compressed inputs
+    
+    # compressed suffix to codec name
+    COMPRESSED_SUFFIXES = {
+        ".gz": "gzip",
+        ".gzip": "gzip",
+        ".bz2": "bz2",
+        ".zst": "zstd",
+        ".zstd": "zstd",
+        ".zip": "zip"
+    }
+    
+    # compressed bytes decompressed to estimate ratio when size is unknown
+    SAMPLE_BYTES = 256 * 1024
+    
+    # compressed bytes fed per step so partial blocks skew the ratio little
+    FEED_BYTES = 4 * 1024
+    
+    # compressibility drifts along a file so sampled estimates are padded
+    SAMPLE_MARGIN = 1.1
+    
+    @classmethod
+    def get_compression(cls, path: Path) -> Optional[str]:
+        # get codec name from file suffix
+        return cls.COMPRESSED_SUFFIXES.get(Path(path).suffix.lower())
+    
+    @classmethod
+    def data_suffix(cls, path: Path) -> str:
+        # get suffix of the data inside compressed file
+        path = Path(path)
+        compression = cls.get_compression(path)
+        
+        if compression is None:
+            return path.suffix.lower()
+        
+        if compression == "zip":
+            member = cls.get_zip_member(path)
+            return Path(member).suffix.lower() if member else ""
+        
+        return Path(path.stem).suffix.lower()
+    
+    @classmethod
+    def get_zip_member(cls, path: Path) -> Optional[str]:
+        # get first csv member of zip archive
+        try:
+            with zipfile.ZipFile(path) as zf:
+                names = [i.filename for i in zf.infolist() if not i.is_dir()]
+        except (zipfile.BadZipFile, OSError):
+            return None
+        
+        for name in names:
+            if name.lower().endswith(".csv"):
+                return name
+        return names[0] if names else None
+    
+    @classmethod
+    def estimate_uncompressed_size(cls, path: Path) -> int:
+        # estimate decompressed size in bytes
+        path = Path(path)
+        compressed_size = path.stat().st_size
+        compression = cls.get_compression(path)
+        
+        if compression is None or compressed_size == 0:
+            return compressed_size
+        
+        try:
+            if compression == "zip":
+                member = cls.get_zip_member(path)
+                with zipfile.ZipFile(path) as zf:
+                    return zf.getinfo(member).file_size
+            
+            if compression == "gzip":
+                # isize trailer holds size modulo 4gb
+                with open(path, "rb") as f:
+                    f.seek(-4, 2)
+                    isize = struct.unpack("<I", f.read(4))[0]
+                if isize >= compressed_size:
+                    return isize
+            
+            if compression == "zstd":
+                import zstandard
+                with open(path, "rb") as f:
+                    content_size = zstandard.frame_content_size(f.read(18))
+                if content_size > 0:
+                    return content_size
+            
+            return cls._estimate_from_sample(path, compression, compressed_size)
+        
+        except Exception:
+            return compressed_size
+    
+    @classmethod
+    def _estimate_from_sample(cls, path: Path, compression: str, compressed_size: int) -> int:
+        # extrapolate size from ratio of compressed input fully decoded so far
+        new_decompressor = lambda: _open_decompressor(compression)
+        decompressor = new_decompressor()
+        fed = produced = 0
+        marked_fed = marked_produced = 0
+        
+        with open(path, "rb") as raw:
+            while fed < cls.SAMPLE_BYTES or marked_produced == 0:
+                chunk = raw.read(cls.FEED_BYTES)
+                if not chunk:
+                    # whole file decoded within the sample
+                    return produced
+                fed += len(chunk)
+                
+                # a finished stream leaves input of the next one in unused data
+                while chunk:
+                    output = decompressor.decompress(chunk)
+                    produced += len(output)
+                    chunk = decompressor.unused_data if decompressor.eof else b""
+                    if chunk:
+                        decompressor = new_decompressor()
+                
+                # codecs hold partial blocks so only count input that produced output
+                if produced > marked_produced:
+                    marked_fed, marked_produced = fed, produced
+        
+        ratio = marked_produced / max(1, marked_fed) * cls.SAMPLE_MARGIN
+        return int(compressed_size * max(1.0, ratio))
+
+
+# ============================================================================
+#                         DECOMPRESSING READER
+# ============================================================================
+
+class DecompressingReader(io.RawIOBase):
+    # file like reader fed by a decompression thread
+    
+    CHUNK_SIZE = 1024 * 1024
+    QUEUE_CHUNKS = 8
+    
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        # open source and start decompression thread
+        super().__init__()
+        self.path = Path(path)
+        self.compression = compression or CompressionUtils.get_compression(self.path)
+        self.total_compressed_bytes = self.path.stat().st_size
+        self.compressed_bytes_read = 0
+        
+        self._raw, self._stream, self._position = self._open_source()
+        self._queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_CHUNKS)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._stop = threading.Event()
+        
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+    
+    def _open_source(self) -> Tuple[object, object, callable]:
+        # open raw file and codec stream
+        if self.compression == "zip":
+            zf = zipfile.ZipFile(self.path)
+            member = CompressionUtils.get_zip_member(self.path)
+            info = zf.getinfo(member)
+            stream = zf.open(info)
+            ratio = info.compress_size / max(1, info.file_size)
+            self.total_compressed_bytes = info.compress_size
+            
+            # zip members do not expose raw offsets so scale output bytes
+            position = lambda: int(stream.tell() * ratio)
+            return zf, stream, position
+        
+        raw = open(self.path, "rb")
+        return raw, _open_codec(raw, self.compression), raw.tell
+    
+    def _pump(self) -> None:
+        # decompress chunks into queue until done or closed
+        try:
+            while not self._stop.is_set():
+                data = self._stream.read(self.CHUNK_SIZE)
+                self.compressed_bytes_read = self._position()
+                if not data:
+                    break
+                self._put(data)
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._put(None)
+    
+    def _put(self, item) -> None:
+        # enqueue without blocking forever after close
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    # ---------- RAW IO INTERFACE ----------
+    
+    def readable(self) -> bool:
+        # reader supports read
+        return True
+    
+    def readinto(self, b) -> int:
+        # copy decompressed bytes into buffer
+        while not self._buffer:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+                return 0
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._buffer = memoryview(item)
+        
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+    
+    @property
+    def progress(self) -> float:
+        # fraction of compressed input consumed
+        return min(1.0, self.compressed_bytes_read / max(1, self.total_compressed_bytes))
+    
+    def close(self) -> None:
+        # stop thread and release file handles
+        if self.closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        try:
+            self._stream.close()
+        finally:
+            self._raw.close()
+            super().close()
+
+
+# ============================================================================
+#                               HELPERS
+# ============================================================================
+
+def _open_decompressor(compression: str):
+    # incremental decompressor exposing eof and unused data
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    if compression == "bz2":
+        return bz2.BZ2Decompressor()
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"unsupported compression: {compression}")
+
+
+def _open_codec(raw, compression: str):
+    # wrap raw file in decompressing stream
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(raw, mode="rb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd files need the optional zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    raise ValueError(f"unsupported compression: {compression}")
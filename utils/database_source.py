@@ -0,0 +1,327 @@
+"""
+database source module
+reads sales history from local sqlite or duckdb files
+pushes projection filtering and aggregation into sql
+"""
+
+import re
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+# ============================================================================
+#                            DATABASE SOURCE
+# ============================================================================
+
+class DatabaseSource:
+    # local database file opened read only
+    
+    # file suffix to engine name
+    ENGINE_SUFFIXES = {
+        ".db": None,
+        ".sqlite": "sqlite",
+        ".sqlite3": "sqlite",
+        ".duckdb": "duckdb"
+    }
+    
+    # how mapped columns collapse when aggregating to sku x date
+    AGGREGATES = {
+        "quantity": "SUM",
+        "price": "AVG",
+        "promo": "MAX"
+    }
+    
+    # group keys kept when aggregating
+    GROUP_KEYS = ["date", "sku", "category"]
+    
+    # text dates that sort like the date parameters
+    ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+    
+    def __init__(self, path: Path):
+        # detect engine and open connection
+        self.path = Path(path)
+        self.engine = self.detect_engine(self.path)
+        self._conn = self._connect()
+    
+    @classmethod
+    def is_database(cls, path: Any) -> bool:
+        # check if path is a database file
+        if isinstance(path, (list, tuple)):
+            return False
+        return Path(path).suffix.lower() in cls.ENGINE_SUFFIXES
+    
+    @classmethod
+    def detect_engine(cls, path: Path) -> str:
+        # get engine from suffix or sqlite file header
+        engine = cls.ENGINE_SUFFIXES.get(Path(path).suffix.lower())
+        if engine:
+            return engine
+        
+        with open(path, "rb") as f:
+            header = f.read(16)
+        return "sqlite" if header == b"SQLite format 3\x00" else "duckdb"
+    
+    def _connect(self):
+        # open read only connection
+        if self.engine == "sqlite":
+            return sqlite3.connect(f"file:{self.path.as_posix()}?mode=ro", uri=True)
+        
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("duckdb files need the optional duckdb package")
+        return duckdb.connect(str(self.path), read_only=True)
+    
+    def close(self) -> None:
+        # close connection
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    # ---------- SCHEMA ----------
+    
+    def list_tables(self) -> Dict[str, int]:
+        # get tables and views with row counts
+        if self.engine == "sqlite":
+            sql = (
+                "SELECT name FROM sqlite_master "
+                "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        else:
+            sql = (
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' ORDER BY table_name"
+            )
+        
+        names = [row[0] for row in self._conn.execute(sql).fetchall()]
+        return {
+            name: self._conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(name)}").fetchone()[0]
+            for name in names
+        }
+    
+    def get_columns(self, table: Optional[str] = None, query: Optional[str] = None) -> List[str]:
+        # get column names of table or query without reading rows
+        cursor = self._conn.execute(f"SELECT * FROM {self._from_clause(table, query)} LIMIT 0")
+        return [d[0] for d in cursor.description]
+    
+    def preview(self,
+                table: Optional[str] = None,
+                query: Optional[str] = None,
+                n: int = 1000) -> pd.DataFrame:
+        # read first rows for column detection
+        sql = f"SELECT * FROM {self._from_clause(table, query)} LIMIT {int(n)}"
+        return self.read_table(sql).to_pandas()
+    
+    def count_rows(self, table: Optional[str] = None, query: Optional[str] = None) -> int:
+        # count rows in the engine
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self._from_clause(table, query)}").fetchone()[0]
+    
+    def value_span(self,
+                   column: str,
+                   table: Optional[str] = None,
+                   query: Optional[str] = None) -> Tuple[Any, Any]:
+        # min and max of a column computed in the engine
+        name = quote_identifier(column)
+        return tuple(self._conn.execute(
+            f"SELECT MIN({name}), MAX({name}) FROM {self._from_clause(table, query)}"
+        ).fetchone())
+    
+    def is_date_comparable(self,
+                           column: str,
+                           table: Optional[str] = None,
+                           query: Optional[str] = None,
+                           n: int = 1000) -> bool:
+        # check a sample of stored dates compares correctly with date parameters
+        name = quote_identifier(column)
+        rows = self._conn.execute(
+            f"SELECT {name} FROM {self._from_clause(table, query)} WHERE {name} IS NOT NULL LIMIT {int(n)}"
+        ).fetchall()
+        
+        # native dates or iso text only so integers and day first text filter after fetch
+        return all(
+            isinstance(value, date) or (isinstance(value, str) and self.ISO_DATE.match(value))
+            for value, in rows
+        )
+    
+    def _from_clause(self, table: Optional[str], query: Optional[str]) -> str:
+        # table name or wrapped query for from clause
+        if query:
+            return f"({query.strip().rstrip(';')}) AS src"
+        if table:
+            return quote_identifier(table)
+        raise ValueError("choose a table or enter a query")
+    
+    # ---------- QUERY BUILDING ----------
+    
+    def build_query(self,
+                    mapping: Dict[str, str],
+                    table: Optional[str] = None,
+                    query: Optional[str] = None,
+                    filters: Optional[Dict[str, Any]] = None,
+                    aggregate: bool = True) -> Tuple[str, List[Any], bool]:
+        # build select with mapped columns filters and sku x date rollup and say if it rolled up
+        filters = filters or {}
+        available = set(self.get_columns(table, query))
+        
+        # only mapped columns that exist in the source are read
+        roles = {role: col for role, col in mapping.items() if col and col in available}
+        if not roles:
+            return f"SELECT * FROM {self._from_clause(table, query)}", [], False
+        
+        grouped = aggregate and "date" in roles and "sku" in roles
+        select, group_by = [], []
+        for role, col in roles.items():
+            name = quote_identifier(col)
+            if not grouped or role in self.GROUP_KEYS:
+                select.append(name)
+                if grouped:
+                    group_by.append(name)
+            elif self.AGGREGATES.get(role) in ("SUM", "AVG"):
+                # double keeps duckdb sums out of 128 bit decimals
+                select.append(f"CAST({self.AGGREGATES[role]}({name}) AS DOUBLE) AS {name}")
+            elif role in self.AGGREGATES:
+                select.append(f"{self.AGGREGATES[role]}({name}) AS {name}")
+            else:
+                select.append(f"MIN({name}) AS {name}")
+        
+        where, params = self._build_where(roles, filters)
+        
+        sql = f"SELECT {', '.join(dict.fromkeys(select))} FROM {self._from_clause(table, query)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by:
+            sql += " GROUP BY " + ", ".join(dict.fromkeys(group_by))
+        return sql, params, grouped
+    
+    def _build_where(self,
+                     roles: Dict[str, str],
+                     filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        # turn load filters into where clauses with parameters
+        where, params = [], []
+        
+        date_range = filters.get("date_range")
+        if date_range and "date" in roles:
+            start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+            if end == end.normalize():
+                end = end + pd.Timedelta(days=1)
+                where.append(f"{quote_identifier(roles['date'])} >= ? AND {quote_identifier(roles['date'])} < ?")
+            else:
+                where.append(f"{quote_identifier(roles['date'])} BETWEEN ? AND ?")
+            params.extend([self._date_param(start), self._date_param(end)])
+        
+        for key, role in [("categories", "category"), ("skus", "sku")]:
+            values = filters.get(key)
+            if values and role in roles:
+                placeholders = ", ".join("?" for _ in values)
+                where.append(f"{quote_identifier(roles[role])} IN ({placeholders})")
+                params.extend(values)
+        
+        return where, params
+    
+    def _date_param(self, value: pd.Timestamp) -> Any:
+        # date parameter comparable with text or native dates
+        if self.engine == "sqlite":
+            # iso text sorts like dates in sqlite
+            return value.strftime("%Y-%m-%d") if value == value.normalize() else value.isoformat(sep=" ")
+        return value.to_pydatetime()
+    
+    # ---------- FETCHING ----------
+    
+    def iter_batches(self,
+                     sql: str,
+                     params: Optional[List[Any]] = None,
+                     batch_size: int = 100000) -> Iterator[Any]:
+        # run query and yield arrow record batches
+        import pyarrow as pa
+        
+        params = params or []
+        
+        if self.engine == "duckdb":
+            reader = self._conn.execute(sql, params).fetch_record_batch(batch_size)
+            for batch in reader:
+                yield batch
+            return
+        
+        cursor = self._conn.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [_to_arrow(values) for values in columns], names=names
+            )
+    
+    def read_table(self,
+                   sql: str,
+                   params: Optional[List[Any]] = None,
+                   batch_size: int = 100000,
+                   progress_callback: Optional[callable] = None):
+        # collect arrow batches into one table
+        import pyarrow as pa
+        
+        batches = []
+        rows = 0
+        for batch in self.iter_batches(sql, params, batch_size):
+            batches.append(pa.Table.from_batches([batch]))
+            rows += batch.num_rows
+            if progress_callback:
+                progress_callback(len(batches), rows)
+        
+        if not batches:
+            cursor = self._conn.execute(f"SELECT * FROM ({sql}) AS q LIMIT 0", params or [])
+            return pa.table({d[0]: pa.array([], type=pa.null()) for d in cursor.description})
+        
+        return _concat_tables(batches)
+
+
+# ============================================================================
+#                               HELPERS
+# ============================================================================
+
+def quote_identifier(name: str) -> str:
+    # quote table or column name for sql
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _concat_tables(tables: List[Any]):
+    # concat batch tables whose column types drifted between batches
+    import pyarrow as pa
+    
+    try:
+        return pa.concat_tables(tables, promote_options="default")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    
+    # sqlite columns can mix ints floats and text so settle each column
+    schema = []
+    for i, name in enumerate(tables[0].column_names):
+        types = {t.schema.field(i).type for t in tables} - {pa.null()}
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+            schema.append(pa.field(name, pa.float64()))
+        else:
+            schema.append(pa.field(name, pa.string()))
+    schema = pa.schema(schema)
+    
+    return pa.concat_tables([t.cast(schema) for t in tables])
+
+
+def _to_arrow(values: Tuple[Any, ...]):
+    # build arrow array from a sqlite column falling back to text
+    import pyarrow as pa
+    
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
@@ -57,25 +57,20 @@ class DateUtils:
             return None
     
     @classmethod
-    def detect_date_format(cls, date_series: pd.Series) -> Optional[str]:
+    def detect_date_format(cls, date_series: pd.Series, sample_size: int = 100) -> Optional[str]:
         # detect date format from series of date strings
-        sample = date_series.dropna().head(100)
+        sample = date_series.dropna().head(sample_size)
         
         if len(sample) == 0:
             return None
         
+        sample = sample.astype(str).str.strip()
         format_scores = {}
         
+        # score each format with one vectorized parse of the sample
         for fmt in cls.DATE_FORMATS:
-            valid_count = 0
-            for date_str in sample:
-                try:
-                    datetime.strptime(str(date_str).strip(), fmt)
-                    valid_count += 1
-                except ValueError:
-                    pass
-            
-            format_scores[fmt] = valid_count / len(sample)
+            parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+            format_scores[fmt] = parsed.notna().sum() / len(sample)
         
         # return format with highest score
         best_format = max(format_scores, key=format_scores.get)
@@ -86,24 +81,49 @@ class DateUtils:
         return None
     
     @classmethod
-    def standardize_dates(cls, df: pd.DataFrame, date_col: str) -> pd.DataFrame:
-        # standardize date column to datetime
-        result = df.copy()
+    def parse_dates(cls, 
+                    date_series: pd.Series, 
+                    date_format: Optional[str] = None) -> Tuple[pd.Series, Optional[str]]:
+        # parse date column once per distinct value with explicit format
+        if pd.api.types.is_datetime64_any_dtype(date_series):
+            return date_series, date_format
         
-        # try pandas parser first
-        try:
-            result[date_col] = pd.to_datetime(result[date_col], errors="coerce")
-            return result
-        except Exception:
-            pass
+        is_text = (
+            pd.api.types.is_object_dtype(date_series)
+            or pd.api.types.is_string_dtype(date_series)
+            or isinstance(date_series.dtype, pd.CategoricalDtype)
+        )
+        if not is_text:
+            return pd.to_datetime(date_series, errors="coerce"), date_format
+        
+        # factorize so each distinct string is parsed only once
+        codes, uniques = pd.factorize(date_series)
+        unique_strings = pd.Series(uniques, dtype=object).astype(str).str.strip()
+        
+        if date_format is None:
+            date_format = cls.detect_date_format(unique_strings)
         
-        # detect and apply format
-        fmt = cls.detect_date_format(result[date_col])
-        if fmt:
-            result[date_col] = pd.to_datetime(result[date_col], format=fmt, errors="coerce")
+        if date_format:
+            parsed = pd.to_datetime(unique_strings, format=date_format, errors="coerce")
+            
+            # strings outside the detected format fall back to inference
+            failed = parsed.isna() & (unique_strings != "")
+            if failed.any():
+                parsed[failed] = pd.to_datetime(unique_strings[failed], errors="coerce")
         else:
-            result[date_col] = pd.to_datetime(result[date_col], errors="coerce")
+            parsed = pd.to_datetime(unique_strings, errors="coerce")
+        
+        # broadcast back through codes with missing mapped to nat
+        lookup = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+        values = lookup[codes]
         
+        return pd.Series(values, index=date_series.index, name=date_series.name), date_format
+    
+    @classmethod
+    def standardize_dates(cls, df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+        # standardize date column to datetime
+        result = df.copy()
+        result[date_col], _ = cls.parse_dates(result[date_col])
         return result
     
     @classmethod
@@ -155,6 +175,22 @@ class DateUtils:
         else:
             return "irregular"
     
+    @classmethod
+    def detect_offset(cls, dates: pd.Series) -> Optional[str]:
+        # pandas offset alias of the series grid or none when it has no regular grid
+        dates = pd.Series(pd.to_datetime(pd.unique(dates), errors="coerce")).dropna()
+        freq = cls.detect_frequency(dates)
+        
+        if freq == "daily":
+            return "D"
+        elif freq == "weekly":
+            return "7D"
+        elif freq == "monthly" and (dates.dt.day == 1).all():
+            return "MS"
+        elif freq == "monthly" and dates.dt.is_month_end.all():
+            return "M"
+        return None
+    
     @classmethod
     def fill_date_gaps(cls, 
                        df: pd.DataFrame, 
@@ -11,6 +11,7 @@ import json
 import pickle
 
 import config
+from utils.compression import CompressionUtils
 
 
 # ============================================================================
@@ -40,6 +41,10 @@ class FileHandler:
                 all_extensions.extend(["*.xlsx", "*.xls"])
             elif ext == "parquet":
                 all_extensions.append("*.parquet")
+            elif ext == "compressed":
+                all_extensions.extend(["*.csv.gz", "*.csv.bz2", "*.csv.zst", "*.zip"])
+            elif ext == "database":
+                all_extensions.extend(["*.db", "*.sqlite", "*.sqlite3", "*.duckdb"])
         
         # add all files option
         all_files = "All Supported Files ({})".format(" ".join(all_extensions))
@@ -70,7 +75,7 @@ class FileHandler:
         self.last_directory = str(path.parent)
         
         try:
-            suffix = path.suffix.lower()
+            suffix = CompressionUtils.data_suffix(path)
             
             if suffix == ".csv":
                 df = self._read_csv(path)
@@ -247,16 +252,20 @@ class FileHandler:
         if not path.exists():
             return False, "file not found"
         
-        # check file size
-        size_mb = path.stat().st_size / (1024 * 1024)
-        if size_mb > config.MAX_FILE_SIZE_MB:
-            return False, f"file too large: {size_mb:.0f}mb"
-        
-        # check extension
-        suffix = path.suffix.lower()
+        # check extension of data inside any compression
+        suffix = CompressionUtils.data_suffix(path)
         valid_extensions = [".csv", ".xlsx", ".xls", ".parquet"]
         if suffix not in valid_extensions:
-            return False, f"unsupported file type: {suffix}"
+            return False, f"unsupported file type: {suffix or path.suffix.lower()}"
+        
+        compression = CompressionUtils.get_compression(path)
+        if compression and suffix != ".csv":
+            return False, "only csv files can be read compressed"
+        
+        # check file size against uncompressed estimate
+        size_mb = CompressionUtils.estimate_uncompressed_size(path) / (1024 * 1024)
+        if size_mb > config.MAX_FILE_SIZE_MB:
+            return False, f"file too large: {size_mb:.0f}mb"
         
         return True, "file valid"
     
@@ -271,6 +280,8 @@ class FileHandler:
             "name": path.name,
             "extension": path.suffix,
             "size_mb": path.stat().st_size / (1024 * 1024),
+            "compression": CompressionUtils.get_compression(path),
+            "uncompressed_size_mb": CompressionUtils.estimate_uncompressed_size(path) / (1024 * 1024),
             "directory": str(path.parent),
             "modified": path.stat().st_mtime
         }
@@ -6,7 +6,9 @@ handles cleanup for large datasets
 
 import gc
 import sys
-from typing import Dict, List, Optional, Any
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any
 from functools import wraps
 import weakref
 
@@ -164,45 +166,11 @@ class MemoryManager:
     # ---------- DATAFRAME OPTIMIZATION ----------
     
     def optimize_dataframe(self, df) -> Any:
-        # reduce dataframe memory usage
-        import pandas as pd
-        import numpy as np
+        # reduce dataframe memory usage in place with the shared dtype stage
+        from core.dtype_optimizer import DtypeOptimizer
         
-        result = df.copy()
-        
-        for col in result.columns:
-            col_type = result[col].dtype
-            
-            if col_type == np.int64:
-                # downcast integers
-                c_min = result[col].min()
-                c_max = result[col].max()
-                
-                if c_min >= 0:
-                    if c_max < 255:
-                        result[col] = result[col].astype(np.uint8)
-                    elif c_max < 65535:
-                        result[col] = result[col].astype(np.uint16)
-                    elif c_max < 4294967295:
-                        result[col] = result[col].astype(np.uint32)
-                else:
-                    if c_min > -128 and c_max < 127:
-                        result[col] = result[col].astype(np.int8)
-                    elif c_min > -32768 and c_max < 32767:
-                        result[col] = result[col].astype(np.int16)
-                    elif c_min > -2147483648 and c_max < 2147483647:
-                        result[col] = result[col].astype(np.int32)
-            
-            elif col_type == np.float64:
-                result[col] = result[col].astype(np.float32)
-            
-            elif col_type == object:
-                num_unique = result[col].nunique()
-                num_total = len(result[col])
-                if num_unique / num_total < 0.5:
-                    result[col] = result[col].astype("category")
-        
-        return result
+        DtypeOptimizer().optimize(df)
+        return df
     
     def get_dataframe_memory(self, df) -> float:
         # get dataframe memory usage in mb
@@ -247,4 +215,23 @@ def cached_result(cache_key: str):
             
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+@contextmanager
+def traced_peak() -> Iterator[Dict[str, int]]:
+    # measure peak bytes allocated inside the block with tracemalloc
+    result = {"peak_bytes": 0}
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    
+    # numpy and pandas buffers are traced along with python objects
+    try:
+        yield result
+    finally:
+        result["peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - base)
+        if started:
+            tracemalloc.stop()
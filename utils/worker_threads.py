@@ -98,6 +98,7 @@ class WorkerThread(QThread):
     result_signal = pyqtSignal(object)
     progress_signal = pyqtSignal(int)
     progress_text_signal = pyqtSignal(str)
+    partial_signal = pyqtSignal(object)
     
     def __init__(self, fn: Callable, *args, **kwargs):
         # initialize with function and arguments
@@ -117,6 +118,10 @@ class WorkerThread(QThread):
             if self._accepts_progress_callback():
                 self.kwargs["progress_callback"] = self._progress_callback
             
+            # results so far go to the ui while the rest is computed
+            if self._accepts_argument("partial_callback"):
+                self.kwargs["partial_callback"] = self.partial_signal.emit
+            
             self.result = self.fn(*self.args, **self.kwargs)
             self.result_signal.emit(self.result)
             
@@ -129,9 +134,13 @@ class WorkerThread(QThread):
     
     def _accepts_progress_callback(self) -> bool:
         # check if function accepts progress callback parameter
+        return self._accepts_argument("progress_callback")
+    
+    def _accepts_argument(self, name: str) -> bool:
+        # check if function accepts a keyword parameter
         try:
             sig = inspect.signature(self.fn)
-            return "progress_callback" in sig.parameters
+            return name in sig.parameters
         except (ValueError, TypeError):
             # some built-in functions don't support signature inspection
             return False